@@ -0,0 +1,85 @@
+"""
+asyncio engine for the detail-fetch stage.
+Runs blocking detail fetches concurrently under a per-host rate limit and hands the
+results to the consumer in input order, never more than `max_in_flight` ahead of it
+(or the current limit of an AdaptiveConcurrency controller, if one is given).
+"""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+
+class AsyncDetailEngine:
+    """Fetches facility detail pages concurrently with bounded in-flight requests."""
+
+    def __init__(self, fetch, rate_limiter, max_in_flight=4, controller=None):
+        """fetch(url) is a blocking callable returning a facility record.
+
+        controller (an AdaptiveConcurrency) lowers the number of requests in
+        flight below max_in_flight while the site struggles.
+        """
+        self.fetch = fetch
+        self.rate_limiter = rate_limiter
+        self.max_in_flight = max_in_flight
+        self.controller = controller
+        self.executor = ThreadPoolExecutor(max_workers=max_in_flight, thread_name_prefix='detail-fetch')
+
+    def slot_limit(self):
+        if self.controller:
+            return min(self.max_in_flight, self.controller.limit)
+        return self.max_in_flight
+
+    async def stream(self, urls):
+        """Asynchronously yield (url, record) pairs in input order.
+
+        A slot is only released once the consumer has taken a result, so a slow
+        consumer (e.g. the CSV writer) stops new requests from being issued.
+        """
+        loop = asyncio.get_running_loop()
+        # Slots taken, checked against the limit whenever one is released
+        slots = asyncio.Condition()
+        taken = 0
+        pending = asyncio.Queue()
+
+        async def produce():
+            nonlocal taken
+            for url in urls:
+                async with slots:
+                    await slots.wait_for(lambda: taken < self.slot_limit())
+                    taken += 1
+                await self.rate_limiter.acquire_async(url)
+                await pending.put((url, loop.run_in_executor(self.executor, self.fetch, url)))
+            await pending.put(None)
+
+        producer = asyncio.ensure_future(produce())
+        try:
+            while True:
+                item = await pending.get()
+                if item is None:
+                    break
+                url, future = item
+                record = await future
+                yield url, record
+                async with slots:
+                    taken -= 1
+                    slots.notify()
+        finally:
+            producer.cancel()
+
+    def iter_results(self, urls):
+        """Synchronous wrapper around stream(); the loop only runs while the caller waits for the next result."""
+        loop = asyncio.new_event_loop()
+        results = self.stream(urls)
+        try:
+            while True:
+                try:
+                    yield loop.run_until_complete(results.__anext__())
+                except StopAsyncIteration:
+                    break
+        finally:
+            loop.run_until_complete(results.aclose())
+            loop.close()
+
+    def close(self):
+        """Stop the fetch threads."""
+        self.executor.shutdown(wait=False)
@@ -0,0 +1,122 @@
+"""
+Multi-city batch scraping.
+Runs many city searches through one browser session and one detail-fetch pool, fetching
+each facility only once even when several city searches return it.
+"""
+
+import os
+from collections import OrderedDict
+
+from extraction import FIELDNAMES, facility_id_from_url
+from sinks import SINKS, open_sink
+
+
+COMBINED_FILENAME = 'combined-elderly-facilities'
+
+
+def read_cities_file(path):
+    """Read one city per line, ignoring blank lines and # comments."""
+    cities = []
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            city = line.split('#', 1)[0].strip()
+            if city and city not in cities:
+                cities.append(city)
+    return cities
+
+
+class BatchScraper:
+    """Drives one ElderlyFacilityScraper through a list of cities."""
+
+    def __init__(self, scraper, cities, log=print, should_stop=lambda: False):
+        """scraper provides the shared browser, worker pool, cache and rate limiter."""
+        self.scraper = scraper
+        self.cities = cities
+        self.log = log
+        self.should_stop = should_stop
+        # facility number -> record, in first-seen order
+        self.records = OrderedDict()
+        # facility number -> cities whose search returned it
+        self.cities_by_id = {}
+        self.failed_cities = []
+        # The output format's extension follows the base name
+        self.combined_filename = os.path.join(scraper.output_dir,
+                                              COMBINED_FILENAME + SINKS[scraper.output_format].extension)
+
+    def scrape_city(self, city):
+        """Search one city, fetch the facilities not seen yet and write the city's CSV.
+
+        When should_stop() turns true the CSV gets the facilities fetched so far.
+        """
+        scraper = self.scraper
+        scraper.set_city(city)
+        scraper.navigate_to_search()
+        scraper.search_city()
+
+        # Unique facility numbers for this city, in results order
+        city_urls = OrderedDict()
+        for url in scraper.collect_facility_urls():
+            city_urls.setdefault(facility_id_from_url(url) or url, url)
+
+        new_urls = [url for facility_id, url in city_urls.items() if facility_id not in self.records]
+        self.log(f"{city}: {len(city_urls)} facilities, {len(new_urls)} new, "
+                 f"{len(city_urls) - len(new_urls)} already fetched for other cities")
+
+        stopped = False
+        for url, facility_data in zip(new_urls, scraper.facility_records(new_urls)):
+            if self.should_stop():
+                stopped = True
+                break
+            self.records[facility_id_from_url(url) or url] = facility_data
+            scraper.count_facility(facility_data)
+            self.log(f"✓ Added: {facility_data['Name'] or url}")
+
+        # A stopped city still gets a file with the facilities scraped so far
+        saved = [facility_id for facility_id in city_urls if facility_id in self.records]
+        for facility_id in saved:
+            self.cities_by_id.setdefault(facility_id, []).append(city)
+        scraper.write_facilities([self.records[facility_id] for facility_id in saved], is_first_page=True)
+        scraper.close_sinks()
+        if stopped:
+            # Not a complete crawl, so the database run stays unfinished
+            self.log(f"⚠ {city} stopped: {len(saved)} of {len(city_urls)} facilities saved to {scraper.filename}")
+            return
+        scraper.finish_store_run()
+
+    def write_combined(self):
+        """Write every facility once, with the cities whose search returned it."""
+        self.log(f"Writing {len(self.records)} unique facilities to {self.combined_filename}...")
+        sink = open_sink(self.scraper.output_format, self.combined_filename, FIELDNAMES + ['Cities'])
+        try:
+            sink.write(dict(facility_data, Cities='; '.join(self.cities_by_id.get(facility_id, [])))
+                       for facility_id, facility_data in self.records.items())
+        finally:
+            sink.close()
+
+    def run(self):
+        """Scrape every city, then write the combined file."""
+        try:
+            for index, city in enumerate(self.cities, 1):
+                if self.should_stop():
+                    self.log("\n⚠ Batch stopped by user")
+                    break
+                self.log(f"\n=== City {index}/{len(self.cities)}: {city} ===")
+                try:
+                    self.scrape_city(city)
+                except Exception as e:
+                    self.log(f"✗ ERROR: Failed to scrape {city}: {e}")
+                    self.failed_cities.append(city)
+
+            if self.records:
+                self.write_combined()
+            self.log(f"\n✓ Batch finished: {len(self.records)} unique facilities from "
+                     f"{len(self.cities) - len(self.failed_cities)}/{len(self.cities)} cities")
+            if self.failed_cities:
+                self.log(f"Failed cities: {', '.join(self.failed_cities)}")
+            if self.scraper.cache:
+                self.log(self.scraper.cache.stats())
+        finally:
+            if self.scraper.profile:
+                self.log(self.scraper.metrics.format_profile())
+            self.log("\nClosing browser...")
+            self.scraper.close()
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+End-to-end throughput benchmark.
+Starts the local stand-in site (mock_ccld.py), runs ElderlyFacilityScraper against it
+from the search form to the last detail page, and reports facilities per minute, the
+p50/p95 detail-page latency and the total wall time, so performance changes can be
+compared offline. Requires Chrome, like a real crawl.
+
+    python bench_e2e.py --facilities 200 --latency 0.1 --jitter 0.05
+    python bench_e2e.py --engine http --concurrency 8 --json
+    python bench_e2e.py --engine http --concurrency 16 --adaptive --capacity 6 \
+        --latency 0.05 --slowdown 10:0.5:0.1 --slowdown 25:0.05:0
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+
+from http_fetcher import summarize_latencies
+from mock_ccld import MockCCLDServer, add_server_arguments
+from scraper import ElderlyFacilityScraper
+
+
+def run_crawl(base_url, args, output_dir):
+    """Crawl the stand-in site once; returns the scraper and (seconds to first facility, total seconds)."""
+    scraper = ElderlyFacilityScraper('Roseville', output_dir, engine=args.engine, base_url=base_url,
+                                     workers=args.workers, rate=args.rate, concurrency=args.concurrency,
+                                     use_cache=False, listing_only=args.listing_only,
+                                     parse_workers=args.parse_workers, output_format=args.format,
+                                     lean=args.lean, adaptive=args.adaptive,
+                                     min_concurrency=args.min_concurrency)
+    first_facility = None
+    start = time.perf_counter()
+    try:
+        for facility_data in scraper.iter_facilities():
+            if first_facility is None:
+                first_facility = time.perf_counter() - start
+    finally:
+        scraper.close()
+    return scraper, first_facility, time.perf_counter() - start
+
+
+def parse_slowdown(text):
+    """AT:LATENCY[:ERROR_RATE] -> (seconds into the crawl, latency, error rate or None)."""
+    parts = text.split(':')
+    if len(parts) not in (2, 3):
+        raise argparse.ArgumentTypeError(f"expected AT:LATENCY[:ERROR_RATE], got {text!r}")
+    try:
+        return float(parts[0]), float(parts[1]), float(parts[2]) if len(parts) == 3 else None
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected numbers in {text!r}")
+
+
+def schedule_slowdowns(server, slowdowns):
+    """Change the site's latency (and error rate) at the given seconds from now; returns the timers."""
+    timers = []
+    for at, latency, error_rate in slowdowns:
+        def slow_down(latency=latency, error_rate=error_rate):
+            server.latency = latency
+            if error_rate is not None:
+                server.error_rate = error_rate
+        timer = threading.Timer(at, slow_down)
+        timer.daemon = True
+        timer.start()
+        timers.append(timer)
+    return timers
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark a whole crawl against the local stand-in site.')
+    add_server_arguments(parser)
+    parser.add_argument('--engine', choices=['selenium', 'http'], default='selenium',
+                        help='Detail engine of the scraper (default: selenium)')
+    parser.add_argument('--workers', type=int, default=1, help='Chrome instances for detail pages (default: 1)')
+    parser.add_argument('--concurrency', type=int, default=None, help='Detail pages fetched at once')
+    parser.add_argument('--adaptive', action='store_true',
+                        help='Let the AIMD controller adjust the concurrency, up to --concurrency')
+    parser.add_argument('--min-concurrency', type=int, default=1, help='Lower bound with --adaptive (default: 1)')
+    parser.add_argument('--slowdown', type=parse_slowdown, action='append', default=[],
+                        metavar='AT:LATENCY[:ERROR_RATE]',
+                        help='AT seconds into the crawl, change the site latency (and detail error rate); '
+                             'may be repeated')
+    parser.add_argument('--rate', type=float, default=1000.0,
+                        help='Requests per second allowed by the rate limiter (default: 1000, i.e. unthrottled)')
+    parser.add_argument('--parse-workers', type=int, default=2, help='HTML parse processes (default: 2)')
+    parser.add_argument('--format', default='csv', help='Output format (default: csv)')
+    parser.add_argument('--listing-only', action='store_true', help='Read the results table only')
+    parser.add_argument('--lean', action='store_true', help='Use the lean Chrome profile')
+    parser.add_argument('--json', action='store_true', help='Print the results as one JSON object')
+    parser.add_argument('--verbose', action='store_true', help="Show the scraper's own output")
+    args = parser.parse_args()
+
+    server = MockCCLDServer(0, args.facilities, args.page_size, args.latency, args.jitter,
+                            args.error_rate, args.seed, args.capacity)
+    base_url = server.start()
+    timers = schedule_slowdowns(server, args.slowdown)
+    try:
+        with tempfile.TemporaryDirectory() as output_dir:
+            with open(os.devnull, 'w') as quiet, \
+                    contextlib.redirect_stdout(sys.stdout if args.verbose else quiet):
+                scraper, first_facility, seconds = run_crawl(base_url, args, output_dir)
+    finally:
+        for timer in timers:
+            timer.cancel()
+        server.stop()
+
+    latencies = scraper.detail_latencies['http'] + scraper.detail_latencies['selenium']
+    detail = summarize_latencies(latencies) or {'count': 0, 'mean': 0.0, 'median': 0.0, 'p95': 0.0}
+    results = {
+        'facilities': scraper.facility_count,
+        'completed': scraper.scraping_completed,
+        'wall_seconds': seconds,
+        'first_facility_seconds': first_facility,
+        'facilities_per_minute': scraper.facility_count / seconds * 60 if seconds else 0.0,
+        'detail_p50_seconds': detail['median'],
+        'detail_p95_seconds': detail['p95'],
+        'detail_pages': detail['count'],
+        'site_responses': dict(server.stats),
+        'concurrency_changes': scraper.concurrency_controller.changes if scraper.concurrency_controller else [],
+        'settings': {key: value for key, value in vars(args).items() if key not in ('json', 'verbose')},
+    }
+    if args.json:
+        print(json.dumps(results))
+        return
+
+    print(f"Mock site: {args.facilities} facilities, {args.page_size} per page, "
+          f"latency {args.latency:.3f}s ±{args.jitter:.3f}s, {args.error_rate:.0%} detail errors")
+    print(f"Scraper: engine={args.engine} workers={args.workers} concurrency={args.concurrency or 'default'} "
+          f"rate={args.rate:g}/s parse_workers={args.parse_workers}{' lean' if args.lean else ''}"
+          f"{' listing-only' if args.listing_only else ''}")
+    print(f"  {results['facilities']} facilities in {seconds:.1f}s wall time "
+          f"({results['facilities_per_minute']:.1f} facilities/min)"
+          f"{'' if results['completed'] else ' - crawl did not complete'}")
+    if first_facility is not None:
+        print(f"  first facility after {first_facility:.2f}s")
+    print(f"  detail latency p50 {detail['median']:.3f}s  p95 {detail['p95']:.3f}s  (n={detail['count']})")
+    print(f"  site responses: {results['site_responses']}")
+    if scraper.concurrency_controller:
+        print(f"  concurrency adjustments ({len(results['concurrency_changes'])}):")
+        for at, old, new, reason in results['concurrency_changes']:
+            print(f"    {at:7.1f}s  {old:>3} -> {new:<3} {reason}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark of facility field extraction.
+Runs the registry's extractor (one precompiled search per field) over the visible text of
+facility_detail.html many times, and compares it with the original five uncompiled re.search
+calls and with a single scan for all labels.
+"""
+
+import argparse
+import os
+import re
+import time
+
+from extraction import FIELDS, extract_facility_fields, html_to_text
+
+DETAIL_PAGE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'facility_detail.html')
+
+
+def legacy_extract(body_text):
+    """The original extraction: one uncompiled re.search per field over the whole text."""
+    facility_data = {'Name': '', 'Status': '', 'Address': '', 'Phone Number': '', 'Facility Capacity': ''}
+    name_match = re.search(r'Facility Detail\s+([^\n]+?)\s+Status:', body_text, re.DOTALL)
+    if name_match:
+        facility_data['Name'] = name_match.group(1).strip()
+    status_match = re.search(r'Status:\s*([^\n]+)', body_text)
+    if status_match:
+        facility_data['Status'] = status_match.group(1).strip()
+    address_match = re.search(r'Address:\s*\n([^\n]+)\n([^\n]+)', body_text)
+    if address_match:
+        facility_data['Address'] = f"{address_match.group(1).strip()}, {address_match.group(2).strip()}"
+    phone_match = re.search(r'Phone:\s*([^\n]+)', body_text)
+    if phone_match:
+        facility_data['Phone Number'] = phone_match.group(1).strip()
+    capacity_match = re.search(r'Facility Capacity:\s*(\d+)', body_text)
+    if capacity_match:
+        facility_data['Facility Capacity'] = capacity_match.group(1).strip()
+    return facility_data
+
+
+def single_pass_extract(body_text):
+    """One scan for every field label, trying each value regex where its label occurs."""
+    facility_data = dict.fromkeys((field.column for field in FIELDS), '')
+    remaining = len(FIELDS)
+    for label_match in LABELS.finditer(body_text):
+        for field, value in FIELDS_BY_LABEL[label_match.group()]:
+            if facility_data[field.column]:
+                continue
+            value_match = value.match(body_text, label_match.end())
+            if value_match:
+                facility_data[field.column] = field.build(value_match.groups())
+                remaining -= 1
+        if not remaining:
+            break
+    return facility_data
+
+
+FIELDS_BY_LABEL = {}
+for _field in FIELDS:
+    FIELDS_BY_LABEL.setdefault(_field.label, []).append((_field, re.compile(_field.value)))
+# Longest first, so a label is never cut short by another label that is its prefix
+LABELS = re.compile('|'.join(re.escape(label) for label in sorted(FIELDS_BY_LABEL, key=len, reverse=True)))
+
+
+def time_per_call(func, arg, iterations):
+    """Return the mean seconds per call of func(arg)."""
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func(arg)
+    return (time.perf_counter() - start) / iterations
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark facility field extraction.')
+    parser.add_argument('-n', '--iterations', type=int, default=5000, help='Extractions per measurement')
+    args = parser.parse_args()
+
+    with open(DETAIL_PAGE, encoding='utf-8') as f:
+        html = f.read()
+    body_text = html_to_text(html)
+
+    record = extract_facility_fields(body_text)
+    legacy = legacy_extract(body_text)
+    mismatched = [field for field in legacy if legacy[field] != record[field]]
+    print(f"Record ({len(FIELDS)} registered fields): {record}")
+    if mismatched:
+        print(f"WARNING: differs from the original extraction in {', '.join(mismatched)}")
+
+    # A page lacking a field is the worst case: the scan runs to the end of the text
+    texts = [('all fields present', body_text),
+             ('capacity missing', body_text.replace('Facility Capacity:', 'Capacity'))]
+    extractors = [(f'{len(FIELDS)} x compiled re.search', extract_facility_fields),
+                  (f'single pass ({len(FIELDS)} labels)', single_pass_extract),
+                  ('5 x re.search (original)', legacy_extract)]
+
+    print(f"Text: {len(body_text)} chars, {args.iterations} iterations")
+    for text_name, text in texts:
+        print(f"{text_name}:")
+        for name, extractor in extractors:
+            print(f"  {name:<28} {time_per_call(extractor, text, args.iterations) * 1e6:8.1f} us/page")
+    parse = time_per_call(html_to_text, html, max(1, args.iterations // 50))
+    print(f"html_to_text (HTTP engine):    {parse * 1e6:8.1f} us/page")
+
+
+if __name__ == "__main__":
+    main()
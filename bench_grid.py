@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Benchmark the GUI's results grid.
+Streams synthetic records into a ResultStore and ResultView, as the GUI does while a crawl
+runs, then times every grid interaction - filtering by status and capacity, sorting and
+scrolling - at that size. With a display, each interaction also redraws a real VirtualGrid.
+
+    python bench_grid.py --rows 100000
+"""
+
+import argparse
+import random
+import statistics
+import time
+import tkinter as tk
+
+from results_grid import ResultStore, ResultView, VirtualGrid
+
+STATUSES = ['Licensed', 'Pending', 'Closed', 'On Probation']
+BUDGET_MS = 50
+
+
+def synthetic_record(number, rng):
+    capacity = '' if rng.random() < 0.05 else str(rng.randint(1, 200))
+    return {
+        'Facility Number': str(300000000 + number),
+        'Name': f'SYNTHETIC CARE HOME {number}',
+        'Address': f'{number} MAIN ST, ROSEVILLE, CA 95747',
+        'Phone Number': '(916) 555-0100',
+        'Status': rng.choice(STATUSES),
+        'Facility Capacity': capacity,
+    }
+
+
+def open_grid(view):
+    """A VirtualGrid on screen, or None without a display."""
+    try:
+        root = tk.Tk()
+    except tk.TclError:
+        return None
+    grid = VirtualGrid(root, view, height=30)
+    grid.pack(fill=tk.BOTH, expand=True)
+    root.update()
+    return grid
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark filtering, sorting and scrolling the results grid.')
+    parser.add_argument('--rows', type=int, default=100000, help='Records streamed into the grid (default: 100000)')
+    parser.add_argument('--batch', type=int, default=50, help='Records per GUI poll while streaming (default: 50)')
+    parser.add_argument('--seed', type=int, default=1, help='Seed of the synthetic records')
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    records = [synthetic_record(number, rng) for number in range(args.rows)]
+    store = ResultStore()
+    view = ResultView(store)
+    # Streaming into a sorted, filtered view is the expensive case
+    view.configure(sort='capacity', status='Licensed')
+
+    batches = []
+    for first in range(0, args.rows, args.batch):
+        start = time.perf_counter()
+        for record in records[first:first + args.batch]:
+            view.add(store.add(record))
+        batches.append(time.perf_counter() - start)
+    print(f"Streamed {args.rows} records in batches of {args.batch}: "
+          f"median {statistics.median(batches) * 1000:.2f} ms, max {max(batches) * 1000:.2f} ms per batch")
+
+    grid = open_grid(view)
+    if grid is None:
+        print("No display: timing the view only, without redrawing a grid")
+
+    interactions = [
+        ('all, scraped order', dict(status=None, min_capacity=None, max_capacity=None, sort=None, descending=False)),
+        ('newest first', dict(descending=True)),
+        ('status = Pending', dict(status='Pending', descending=False)),
+        ('capacity 6..50', dict(status=None, min_capacity=6, max_capacity=50)),
+        ('Pending, capacity >= 100', dict(status='Pending', min_capacity=100, max_capacity=None)),
+        ('sort by capacity', dict(status=None, min_capacity=None, sort='capacity')),
+        ('sort by capacity, descending', dict(descending=True)),
+        ('Closed by capacity, 10..20', dict(status='Closed', min_capacity=10, max_capacity=20)),
+        ('sort by status', dict(status=None, min_capacity=None, max_capacity=None, sort='status', descending=False)),
+        ('status, capacity <= 6', dict(max_capacity=6)),
+    ]
+    slowest = 0.0
+    print(f"{'interaction':<32} {'rows':>8} {'ms':>8}")
+    for name, settings in interactions:
+        start = time.perf_counter()
+        view.configure(**settings)
+        if grid:
+            grid.offset = 0
+            grid.refresh()
+            grid.update_idletasks()
+        else:
+            [store.row_values(view.row_at(index)) for index in range(min(30, len(view)))]
+        seconds = time.perf_counter() - start
+        slowest = max(slowest, seconds)
+        print(f"{name:<32} {len(view):>8} {seconds * 1000:>8.1f}")
+
+    scrolls = []
+    for _ in range(200):
+        start = time.perf_counter()
+        if grid:
+            grid.scroll('moveto', rng.random())
+            grid.update_idletasks()
+        else:
+            offset = rng.randrange(max(1, len(view) - 30))
+            [store.row_values(view.row_at(index)) for index in range(offset, min(offset + 30, len(view)))]
+        scrolls.append(time.perf_counter() - start)
+    slowest = max(slowest, max(scrolls))
+    print(f"{'scroll to a random position':<32} {len(view):>8} {max(scrolls) * 1000:>8.1f}  (max of 200)")
+    print(f"Slowest interaction: {slowest * 1000:.1f} ms "
+          f"({'within' if slowest * 1000 < BUDGET_MS else 'over'} the {BUDGET_MS} ms budget)")
+    if grid:
+        grid.winfo_toplevel().destroy()
+
+
+if __name__ == "__main__":
+    main()
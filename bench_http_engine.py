@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Benchmark the browserless HTTP detail engine against a local server.
+Serves facility_detail.html for every /carefacilitysearch/FacDetail/<id> URL and
+reports per-facility latency for the HTTP path (and optionally the Selenium path).
+"""
+
+import argparse
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from extraction import facility_id_from_url
+from http_fetcher import HttpDetailFetcher, format_latency_report
+
+DETAIL_PAGE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'facility_detail.html')
+
+
+def make_handler(body):
+    """Build a request handler that serves the saved detail page."""
+
+    class DetailHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'  # keep-alive
+
+        def do_GET(self):
+            if not facility_id_from_url(self.path):
+                self.send_error(404)
+                return
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/html; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return DetailHandler
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the HTTP detail engine against a local server.')
+    parser.add_argument('-n', '--requests', type=int, default=200, help='Number of detail pages to fetch')
+    parser.add_argument('--compare-selenium', action='store_true',
+                        help='Also fetch pages through Chrome for comparison (requires Chrome)')
+    args = parser.parse_args()
+
+    with open(DETAIL_PAGE, 'rb') as f:
+        body = f.read()
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), make_handler(body))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    urls = [f"{base_url}/carefacilitysearch/FacDetail/{315920000 + i}" for i in range(args.requests)]
+    print(f"Serving {DETAIL_PAGE} at {base_url}")
+
+    latencies = {'http': [], 'selenium': []}
+
+    fetcher = HttpDetailFetcher()
+    record = None
+    for url in urls:
+        start = time.perf_counter()
+        record = fetcher.fetch_facility(url)
+        latencies['http'].append(time.perf_counter() - start)
+    fetcher.close()
+    print(f"HTTP record: {record}")
+
+    if args.compare_selenium:
+        from scraper import ElderlyFacilityScraper
+        scraper = ElderlyFacilityScraper("Benchmark", base_url=base_url)
+        try:
+            scraper.driver.get(base_url + "/carefacilitysearch/FacDetail/0")
+            for url in urls[:min(len(urls), 10)]:
+                start = time.perf_counter()
+                record = scraper.scrape_facility_details_browser(url)
+                latencies['selenium'].append(time.perf_counter() - start)
+            print(f"Selenium record: {record}")
+        finally:
+            scraper.driver.quit()
+
+    print(format_latency_report(latencies))
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Benchmark the lean browser profile.
+Loads the search page and some facility detail pages in headless Chrome, once with the
+default profile and once with the lean one, and reports the bytes transferred (from
+Chrome's network events), the requests blocked and the load times. Requires Chrome.
+"""
+
+import argparse
+import json
+import time
+
+from selenium.common.exceptions import TimeoutException
+
+from lean_profile import LeanProfile
+from scraper import ElderlyFacilityScraper, create_chrome_driver
+from waits import PageWaits, angular_idle, detail_rendered
+
+# The facility saved in facility_detail.html
+DEFAULT_FACILITY = '315920367'
+
+
+def network_totals(driver):
+    """Return (bytes received, requests finished, requests blocked or failed) since the last call."""
+    received = finished = failed = 0
+    for entry in driver.get_log('performance'):
+        message = json.loads(entry['message'])['message']
+        if message['method'] == 'Network.loadingFinished':
+            received += message['params']['encodedDataLength']
+            finished += 1
+        elif message['method'] == 'Network.loadingFailed':
+            failed += 1
+    return received, finished, failed
+
+
+def load_pages(driver, lean, urls, repeat):
+    """Load every URL repeat times in a fresh tab; returns {url: [(seconds, bytes, finished, failed)]}."""
+    waits = PageWaits(driver, timeout=30)
+    results = {url: [] for url in urls}
+    for _ in range(repeat):
+        for url in urls:
+            # A new tab per load, as the scraper does, so nothing comes from the memory cache
+            driver.execute_script("window.open('');")
+            driver.switch_to.window(driver.window_handles[-1])
+            if lean:
+                lean.apply(driver)
+            network_totals(driver)
+            start = time.perf_counter()
+            driver.get(url)
+            try:
+                waits.until('page', detail_rendered if '/FacDetail/' in url else angular_idle)
+            except TimeoutException:
+                print(f"Warning: {url} did not finish rendering")
+            seconds = time.perf_counter() - start
+            results[url].append((seconds,) + network_totals(driver))
+            driver.close()
+            driver.switch_to.window(driver.window_handles[0])
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare page loads with and without the lean profile.')
+    parser.add_argument('--base-url', default=ElderlyFacilityScraper.DEFAULT_BASE_URL,
+                        help='Site to load (default: the live CCLD site)')
+    parser.add_argument('--facility', action='append', default=[],
+                        help=f'Facility number of a detail page to load; may be repeated (default: {DEFAULT_FACILITY})')
+    parser.add_argument('--repeat', type=int, default=3, help='Loads of each page per profile (default: 3)')
+    parser.add_argument('--lean-allow', action='append', default=[], metavar='KIND_OR_HOST',
+                        help='Allowlist entry for the lean profile; may be repeated')
+    args = parser.parse_args()
+
+    base_url = args.base_url.rstrip('/')
+    urls = [base_url + '/carefacilitysearch'] + [
+        f"{base_url}/carefacilitysearch/FacDetail/{number}" for number in args.facility or [DEFAULT_FACILITY]
+    ]
+    lean = LeanProfile(base_url, args.lean_allow)
+    print(lean.describe())
+
+    totals = {}
+    for name, profile in [('default', None), ('lean', lean)]:
+        driver = create_chrome_driver(profile, network_log=True)
+        try:
+            results = load_pages(driver, profile, urls, args.repeat)
+        finally:
+            driver.quit()
+        print(f"{name} profile:")
+        for url, loads in results.items():
+            seconds = sorted(load[0] for load in loads)[len(loads) // 2]
+            received = sum(load[1] for load in loads) / len(loads)
+            finished = sum(load[2] for load in loads) / len(loads)
+            failed = sum(load[3] for load in loads) / len(loads)
+            print(f"  {url}\n    median load {seconds * 1000:7.0f} ms   {received / 1024:8.1f} KiB   "
+                  f"{finished:5.1f} requests   {failed:5.1f} blocked/failed")
+        totals[name] = (sum(load[0] for loads in results.values() for load in loads),
+                        sum(load[1] for loads in results.values() for load in loads))
+
+    (default_seconds, default_bytes), (lean_seconds, lean_bytes) = totals['default'], totals['lean']
+    print(f"Lean profile: {1 - lean_bytes / max(default_bytes, 1):.0%} fewer bytes, "
+          f"{1 - lean_seconds / max(default_seconds, 1e-9):.0%} less load time")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Benchmark off-driver parsing of facility detail pages.
+Measures the parse cost of facility_detail.html and how much time the browser thread
+spends per page when the parse runs inline versus in a process pool. With
+--compare-selenium it also times body.text against page_source in Chrome.
+"""
+
+import argparse
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from extraction import extract_facility_fields, parse_facility_html
+
+DETAIL_PAGE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'facility_detail.html')
+
+
+def run_pipeline(html, pages, submit):
+    """Feed pages through submit() the way the scraper does and return
+    (seconds spent in the browser thread, total seconds)."""
+    thread_time = 0.0
+    start = time.perf_counter()
+    parsing = deque()
+    for _ in range(pages):
+        step = time.perf_counter()
+        parsing.append(submit(html))
+        thread_time += time.perf_counter() - step
+        if len(parsing) > 1:
+            parsing.popleft().result()
+    while parsing:
+        parsing.popleft().result()
+    return thread_time, time.perf_counter() - start
+
+
+class InlineResult:
+    """Stand-in for a Future when parsing on the browser thread."""
+
+    def __init__(self, value):
+        self.value = value
+
+    def result(self):
+        return self.value
+
+
+def compare_selenium(iterations):
+    """Time reading a rendered page's body text versus its page source in Chrome."""
+    from selenium.webdriver.common.by import By
+    from scraper import create_chrome_driver
+    driver = create_chrome_driver()
+    try:
+        driver.get('file://' + DETAIL_PAGE)
+        timings = {}
+        for name, read in [('body.text + parse', lambda: extract_facility_fields(
+                               driver.find_element(By.TAG_NAME, 'body').text)),
+                           ('page_source', lambda: driver.page_source)]:
+            start = time.perf_counter()
+            for _ in range(iterations):
+                read()
+            timings[name] = (time.perf_counter() - start) / iterations
+        return timings
+    finally:
+        driver.quit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark parsing detail pages off the browser thread.')
+    parser.add_argument('-n', '--pages', type=int, default=200, help='Number of detail pages to parse')
+    parser.add_argument('--workers', type=int, default=2, help='Parse pool processes (default: 2)')
+    parser.add_argument('--compare-selenium', action='store_true',
+                        help='Also time body.text against page_source in Chrome (requires Chrome)')
+    args = parser.parse_args()
+
+    with open(DETAIL_PAGE, encoding='utf-8') as f:
+        html = f.read()
+    print(f"Record: {parse_facility_html(html)}")
+
+    start = time.perf_counter()
+    for _ in range(args.pages):
+        parse_facility_html(html)
+    parse_cost = (time.perf_counter() - start) / args.pages
+    print(f"Parse cost: {parse_cost * 1000:.2f} ms/page ({len(html)} bytes of HTML)")
+
+    inline_thread, inline_total = run_pipeline(html, args.pages, lambda page: InlineResult(parse_facility_html(page)))
+    with ProcessPoolExecutor(args.workers) as pool:
+        pool.submit(parse_facility_html, html).result()  # start the workers before timing
+        pool_thread, pool_total = run_pipeline(html, args.pages, lambda page: pool.submit(parse_facility_html, page))
+
+    print(f"Browser thread time per page over {args.pages} pages:")
+    print(f"  inline parse          {inline_thread / args.pages * 1000:8.3f} ms  (total {inline_total:.2f}s)")
+    print(f"  {args.workers}-process parse pool  {pool_thread / args.pages * 1000:8.3f} ms  (total {pool_total:.2f}s)")
+    print(f"  reduction: {inline_thread / max(pool_thread, 1e-9):.1f}x less time in the browser thread")
+
+    if args.compare_selenium:
+        timings = compare_selenium(min(args.pages, 50))
+        print("Chrome round trips per page:")
+        for name, seconds in timings.items():
+            print(f"  {name:<20} {seconds * 1000:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
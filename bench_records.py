@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Memory benchmark of facility records.
+Builds 10^5 and 10^6 synthetic facilities as plain dicts and as slotted FacilityRecords,
+each in a fresh process, and reports the RSS they take plus the time to turn them into
+CSV rows.
+"""
+
+import argparse
+import gc
+import subprocess
+import sys
+import time
+
+from bench_stream import rss_mb
+from extraction import FIELDNAMES, FacilityRecord
+from sinks import row_values
+
+STATUSES = ['Licensed', 'Pending', 'Closed', 'On Probation']
+TYPES = ['RESIDENTIAL CARE ELDERLY', 'ADULT RESIDENTIAL']
+
+
+def fresh(text):
+    """Return a new string object equal to text, as parsing each page would produce."""
+    return (text + ' ')[:-1]
+
+
+def synthetic_values(number):
+    """The column values of one facility, in FIELDNAMES order."""
+    return [
+        f'SYNTHETIC CARE HOME {number}',
+        fresh(STATUSES[number % len(STATUSES)]),
+        f'{number} MAIN ST, ROSEVILLE, CA 95747',
+        f'(916) 555-{number % 10000:04d}',
+        str(6 + number % 100),
+        str(300000000 + number),
+        f'LICENSEE {number}',
+        fresh(TYPES[number % len(TYPES)]),
+        f'{1 + number % 12:02d}/{1 + number % 28:02d}/20{10 + number % 15}',
+    ]
+
+
+def build(kind, count):
+    """Build count records of one kind."""
+    records = []
+    for number in range(count):
+        values = synthetic_values(number)
+        if kind == 'dict':
+            # What the extractor used to return
+            records.append({field: value for field, value in zip(FIELDNAMES, values)})
+        else:
+            facility_data = FacilityRecord()
+            for field, value in zip(FIELDNAMES, values):
+                facility_data[field] = value
+            records.append(facility_data)
+    return records
+
+
+def measure(kind, count):
+    """Build the records in this process and print 'MB seconds_to_build seconds_to_rows'."""
+    gc.collect()
+    before = rss_mb()
+    start = time.perf_counter()
+    records = build(kind, count)
+    built = time.perf_counter() - start
+    gc.collect()
+    used = rss_mb() - before
+    fieldnames = tuple(FIELDNAMES)
+    start = time.perf_counter()
+    for facility_data in records:
+        row_values(facility_data, fieldnames)
+    to_rows = time.perf_counter() - start
+    print(f"{used} {built} {to_rows}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the memory of facility records.')
+    parser.add_argument('-n', '--counts', type=int, nargs='+', default=[10 ** 5, 10 ** 6],
+                        help='Numbers of records to build (default: 100000 1000000)')
+    parser.add_argument('--child', nargs=2, metavar=('KIND', 'COUNT'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        measure(args.child[0], int(args.child[1]))
+        return
+
+    print(f"{len(FIELDNAMES)} columns per record; each measurement runs in a fresh process")
+    for count in args.counts:
+        print(f"{count:,} records:")
+        results = {}
+        for kind, name in [('dict', 'dict'), ('record', 'FacilityRecord')]:
+            output = subprocess.run([sys.executable, __file__, '--child', kind, str(count)],
+                                    capture_output=True, text=True, check=True).stdout
+            used, built, to_rows = (float(value) for value in output.split()[-3:])
+            results[kind] = used
+            print(f"  {name:<15} {used:8.1f} MB  {used * 2 ** 20 / count:6.0f} B/record  "
+                  f"build {built:6.2f}s  rows {to_rows * 1e9 / count:5.0f} ns/record")
+        print(f"  FacilityRecord uses {1 - results['record'] / results['dict']:.0%} less memory")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Benchmark start-up time.
+Times `python scraper.py --help` and how long the GUI takes until its window is on
+screen, each in fresh processes, plus the import time of the scraper module alone.
+Pass --executable to time a frozen GUI built by build.py instead of scraper_gui.py.
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def time_command(command, runs):
+    """Run command runs times; returns the wall-clock seconds of each run."""
+    durations = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(command, cwd=HERE, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+        durations.append(time.perf_counter() - start)
+    return durations
+
+
+def time_gui_window(command, runs, timeout=60):
+    """Launch the GUI runs times; returns the seconds until its window was drawn, or None without a display.
+
+    The GUI writes the time its window appeared to SCRAPER_STARTUP_FILE and quits.
+    """
+    durations = []
+    with tempfile.TemporaryDirectory() as scratch:
+        startup_file = os.path.join(scratch, 'startup')
+        environment = dict(os.environ, SCRAPER_STARTUP_FILE=startup_file)
+        for _ in range(runs):
+            if os.path.exists(startup_file):
+                os.remove(startup_file)
+            launched = time.time()
+            process = subprocess.run(command, cwd=HERE, env=environment, stdout=subprocess.DEVNULL,
+                                     stderr=subprocess.PIPE, text=True, timeout=timeout)
+            if process.returncode != 0 or not os.path.exists(startup_file):
+                print(f"  The GUI did not open a window: {process.stderr.strip().splitlines()[-1:]}")
+                return None
+            with open(startup_file) as f:
+                durations.append(float(f.read()) - launched)
+    return durations
+
+
+def report(name, durations):
+    print(f"  {name:<28} median {statistics.median(durations) * 1000:7.0f} ms   "
+          f"min {min(durations) * 1000:7.0f} ms   ({len(durations)} runs)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the start-up time of the CLI and the GUI.')
+    parser.add_argument('--runs', type=int, default=5, help='Runs of each measurement (default: 5)')
+    parser.add_argument('--executable', help='Frozen GUI to time instead of scraper_gui.py, e.g. dist/ElderlyCareScraper')
+    args = parser.parse_args()
+
+    print("Start-up times (fresh process each run):")
+    report('python -c "import scraper"', time_command([sys.executable, '-c', 'import scraper'], args.runs))
+    report('python scraper.py --help', time_command([sys.executable, 'scraper.py', '--help'], args.runs))
+    gui = [os.path.abspath(args.executable)] if args.executable else [sys.executable, 'scraper_gui.py']
+    durations = time_gui_window(gui, args.runs)
+    if durations:
+        report('GUI window on screen', durations)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Benchmark the memory use of streaming facility records.
+Feeds synthetic results pages through ElderlyFacilityScraper.iter_facilities() and the
+output sinks, without a browser, and reports the process RSS as the records go by: once
+streaming and once keeping every record in scraper.facilities.
+"""
+
+import argparse
+import gc
+import os
+import resource
+import sys
+import tempfile
+import time
+
+from extraction import empty_facility_record
+from scraper import ElderlyFacilityScraper
+
+
+def rss_mb():
+    """Return the resident set size of this process in MB."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 2 ** 20
+    except OSError:
+        # Peak RSS where /proc is missing; kilobytes on Linux, bytes on macOS
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 2 ** 20 if sys.platform == 'darwin' else peak / 2 ** 10
+
+
+def synthetic_record(number):
+    """A detail record the size of a real one, with a little history."""
+    facility_data = empty_facility_record()
+    facility_data.update({
+        'Name': f'SYNTHETIC CARE HOME {number}',
+        'Status': 'Licensed',
+        'Address': f'{number} MAIN ST, ROSEVILLE, CA 95747',
+        'Phone Number': '(916) 555-0100',
+        'Facility Capacity': str(6 + number % 100),
+        'Facility Number': str(300000000 + number),
+        'Licensee Name': f'LICENSEE {number}',
+        'Facility Type': 'RESIDENTIAL CARE ELDERLY',
+        'License Date': '01/01/2020',
+    })
+    facility_data['History'] = {
+        'visits': [{'Facility Number': facility_data['Facility Number'], 'Visit Type': 'Inspection',
+                    'Visit Date': f'0{month}/01/2024', 'Complaint Completed': '', 'Report Available': 'Yes'}
+                   for month in range(1, 4)],
+        'complaints': [],
+        'citations': [],
+    }
+    return facility_data
+
+
+class SyntheticScraper(ElderlyFacilityScraper):
+    """Serves generated results pages instead of the site, without a browser."""
+
+    def __init__(self, output_dir, facilities, page_size, keep_facilities):
+        self.total = facilities
+        self.page_size = page_size
+        self.page = 0
+        super().__init__('Synthetic', output_dir, use_cache=False, parse_workers=0,
+                         keep_facilities=keep_facilities)
+
+    def create_driver(self):
+        return None
+
+    def navigate_to_search(self):
+        pass
+
+    def search_city(self):
+        self.page = 0
+
+    def facility_urls_on_page(self):
+        first = self.page * self.page_size
+        return [f"{self.base_url}/FacDetail/{300000000 + number}"
+                for number in range(first, min(first + self.page_size, self.total))]
+
+    def has_next_page(self):
+        return (self.page + 1) * self.page_size < self.total
+
+    def go_to_next_page(self):
+        self.page += 1
+
+    def facility_records(self, facility_urls):
+        for url in facility_urls:
+            yield synthetic_record(int(url.rsplit('/', 1)[1]) - 300000000)
+
+    def log(self, message):
+        pass
+
+
+def measure(facilities, page_size, keep_facilities, samples):
+    """Run one synthetic crawl; returns [(records so far, RSS in MB)] and the seconds taken."""
+    gc.collect()
+    with tempfile.TemporaryDirectory() as output_dir:
+        scraper = SyntheticScraper(output_dir, facilities, page_size, keep_facilities)
+        every = max(1, facilities // samples)
+        readings = [(0, rss_mb())]
+        start = time.perf_counter()
+        try:
+            for count, facility_data in enumerate(scraper.iter_facilities(), 1):
+                if count % every == 0:
+                    readings.append((count, rss_mb()))
+        finally:
+            scraper.close()
+        return readings, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the RSS of streaming facility records.')
+    parser.add_argument('-n', '--facilities', type=int, default=100000, help='Synthetic facilities to stream')
+    parser.add_argument('--page-size', type=int, default=50, help='Facilities per results page (default: 50)')
+    parser.add_argument('--samples', type=int, default=10, help='RSS readings per run (default: 10)')
+    args = parser.parse_args()
+
+    for name, keep_facilities in [('streaming (default)', False), ('keep_facilities=True', True)]:
+        readings, seconds = measure(args.facilities, args.page_size, keep_facilities, args.samples)
+        print(f"{name}: {args.facilities} records in {seconds:.1f}s "
+              f"({args.facilities / seconds:,.0f} records/s)")
+        for count, rss in readings:
+            print(f"  {count:>8} records  {rss:8.1f} MB")
+        growth = readings[-1][1] - readings[1][1]
+        print(f"  growth after the first sample: {growth:+.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
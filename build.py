@@ -33,10 +33,14 @@ def build_executable():
         print(f"✓ Found chromedriver: {chromedriver_path}")
         print()
     
+    # A single-file executable unpacks itself on every launch; --onedir leaves
+    # a folder instead, which opens noticeably faster
+    onedir = '--onedir' in sys.argv[1:]
+    
     # PyInstaller command
     cmd = [
         "pyinstaller",
-        "--onefile",  # Create a single executable file
+        "--onedir" if onedir else "--onefile",  # Create a folder or a single executable file
         "--windowed",  # No console window (GUI only)
         "--name=ElderlyCareScraper",  # Name of the executable
         "--add-data=scraper.py:.",  # Include the scraper module
@@ -67,7 +71,8 @@ def build_executable():
         print("✓ Build completed successfully!")
         print("=" * 60)
         print()
-        print(f"Executable location: ./dist/ElderlyCareScraper{'.exe' if platform.system() == 'Windows' else ''}")
+        executable = f"ElderlyCareScraper{'.exe' if platform.system() == 'Windows' else ''}"
+        print(f"Executable location: ./dist/{'ElderlyCareScraper/' if onedir else ''}{executable}")
         print()
         print("You can now distribute the executable file from the 'dist' folder.")
         print("Users can double-click it to run the application.")
@@ -0,0 +1,76 @@
+"""
+Crash-safe checkpoint journal for long city crawls.
+Records each finished results page, the facility numbers written for it and the CSV
+size afterwards, so an interrupted crawl can resume where it stopped.
+"""
+
+import json
+import os
+
+
+class CheckpointJournal:
+    """Append-only JSON-lines journal stored next to the CSV file."""
+
+    def __init__(self, csv_filename):
+        self.path = csv_filename + '.checkpoint.jsonl'
+        # Facilities saved by the crawl being resumed (those of the current run
+        # are only in the file, so memory does not grow with the crawl)
+        self.completed_ids = set()
+        self.last_page = 0
+        self.csv_bytes = 0
+        # Child table file -> size, like csv_bytes
+        self.history_bytes = {}
+        self.complete = False
+
+    def load(self):
+        """Read the journal left by a previous run; returns True if it can be resumed."""
+        if not os.path.exists(self.path):
+            return False
+        valid_bytes = 0
+        with open(self.path, 'rb') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    break  # Torn write from a crash - everything before it is valid
+                valid_bytes += len(line)
+                if entry.get('complete'):
+                    self.complete = True
+                    continue
+                self.completed_ids.update(entry['ids'])
+                self.last_page = entry['page']
+                self.csv_bytes = entry['csv_bytes']
+                self.history_bytes = entry.get('history_bytes', {})
+        # Cut off a torn last line so new entries are not appended after it
+        if valid_bytes < os.path.getsize(self.path):
+            with open(self.path, 'r+b') as f:
+                f.truncate(valid_bytes)
+        return bool(self.last_page or self.completed_ids) and not self.complete
+
+    def reset(self):
+        """Start a fresh journal, discarding any previous one."""
+        self.completed_ids = set()
+        self.last_page = 0
+        self.csv_bytes = 0
+        self.history_bytes = {}
+        self.complete = False
+        open(self.path, 'w').close()
+
+    def _append(self, entry):
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(entry) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+
+    def record_page(self, page_num, facility_ids, csv_bytes, history_bytes=None):
+        """Record that a results page and its facilities are safely in the CSV."""
+        self.last_page = page_num
+        self.csv_bytes = csv_bytes
+        self.history_bytes = history_bytes or {}
+        self._append({'page': page_num, 'ids': list(facility_ids), 'csv_bytes': csv_bytes,
+                      'history_bytes': self.history_bytes})
+
+    def mark_complete(self):
+        """Record that the crawl finished, so it is not resumed."""
+        self.complete = True
+        self._append({'complete': True})
@@ -0,0 +1,81 @@
+"""
+Adaptive concurrency for detail-page fetches.
+AdaptiveConcurrency raises and lowers the number of detail pages fetched at once the way
+TCP congestion control does (additive increase, multiplicative decrease): one more page
+in flight after every round of healthy responses, half as many as soon as the site times
+out, answers with an error or slows down well beyond its best observed latency.
+"""
+
+import statistics
+import threading
+import time
+
+
+class AdaptiveConcurrency:
+    """AIMD controller of the detail fetches in flight, between minimum and maximum.
+
+    Fetches report back with success(seconds) or failure(reason). A round is
+    as many completed fetches as the current limit. After a round whose
+    median latency stays under slow_factor times the best round so far, the
+    limit grows by one; a timeout or error, or a slow round, multiplies it by
+    backoff. A slow round at the minimum limit is the site's own pace, not
+    the load we put on it, so it becomes the new best latency to compare
+    with. Fetches that were in flight at a change belong to the old limit,
+    so failures only lower the limit again once a full round has completed
+    since the last change. Every change is logged and kept in self.changes.
+    """
+
+    def __init__(self, minimum=1, maximum=8, backoff=0.5, slow_factor=2.0, log=print):
+        if not 1 <= minimum <= maximum:
+            raise ValueError("Concurrency bounds need 1 <= minimum <= maximum")
+        self.minimum = minimum
+        self.maximum = maximum
+        self.backoff = backoff
+        self.slow_factor = slow_factor
+        self.log = log
+        self.limit = minimum
+        # Latencies of the round in progress and the lowest round median seen
+        self.round = []
+        self.completed_since_change = 0
+        self.baseline = None
+        # (seconds since start, old limit, new limit, reason)
+        self.changes = []
+        self.started = time.perf_counter()
+        self.lock = threading.Lock()
+
+    def success(self, seconds):
+        """A fetch returned a usable page after seconds."""
+        with self.lock:
+            self.completed_since_change += 1
+            self.round.append(seconds)
+            if len(self.round) < self.limit:
+                return
+            median = statistics.median(self.round)
+            self.round = []
+            if self.baseline is None or median < self.baseline or self.limit == self.minimum:
+                self.baseline = median
+            if median > self.baseline * self.slow_factor:
+                self.decrease(f"median latency {median:.2f}s is over {self.slow_factor:g}x the best "
+                              f"{self.baseline:.2f}s")
+            elif self.limit < self.maximum:
+                self.change(self.limit + 1, f"round of {self.limit} healthy, median {median:.2f}s")
+
+    def failure(self, reason):
+        """A fetch timed out or got an error response; reason says which."""
+        with self.lock:
+            self.completed_since_change += 1
+            if self.completed_since_change >= self.limit:
+                self.decrease(reason)
+
+    def decrease(self, reason):
+        self.round = []
+        if self.limit > self.minimum:
+            self.change(max(self.minimum, int(self.limit * self.backoff)), reason)
+        else:
+            self.completed_since_change = 0
+
+    def change(self, limit, reason):
+        self.changes.append((time.perf_counter() - self.started, self.limit, limit, reason))
+        self.log(f"Concurrency {self.limit} -> {limit}: {reason}")
+        self.limit = limit
+        self.completed_since_change = 0
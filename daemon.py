@@ -0,0 +1,409 @@
+#!/usr/bin/env python3
+"""
+Warm browser daemon.
+Keeps headless Chrome sessions running and parked on the Elderly Assisted Living search
+form, and runs the scrape jobs that the CLI (--daemon) and the GUI submit over a local
+socket with them, so a job starts searching right away instead of paying Chrome's cold
+start and the trip to the search form. Only clients that present this user's daemon token
+get a job run.
+"""
+
+import argparse
+import hmac
+import json
+import multiprocessing
+import os
+import queue
+import secrets
+import socket
+import socketserver
+import threading
+import time
+
+from batch import BatchScraper
+from extraction import FIELDNAMES
+from lean_profile import LeanProfile
+from scraper import ElderlyFacilityScraper, create_chrome_driver, open_search_form, options_error
+from waits import PageWaits
+
+DEFAULT_PORT = 8765
+# Sent in the hello that opens every connection; bumped when jobs or events change shape
+PROTOCOL_VERSION = 1
+# Seconds a client waits for the daemon's hello before giving up on it
+HANDSHAKE_TIMEOUT = 5
+
+# Secret a client must present before the daemon runs its job; only this user can read it
+TOKEN_FILE = os.path.join(
+    os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache'),
+    'elderly-facility-scraper', 'daemon-token'
+)
+
+# Scraper options a job may set; the browsers themselves are configured by the daemon
+JOB_OPTIONS = {'engine', 'rate', 'use_cache', 'cache_ttl_hours', 'cache_max_mb', 'resume',
+               'listing_only', 'enrich', 'parse_workers', 'output_format', 'db_path', 'delta',
+               'stale_after_hours'}
+
+
+def read_token():
+    """Return this user's daemon token, or '' if no daemon has created one yet."""
+    try:
+        with open(TOKEN_FILE, encoding='ascii') as f:
+            return f.read().strip()
+    except (OSError, ValueError):
+        return ''
+
+
+def create_token():
+    """Return this user's daemon token, creating the token file (mode 0600) on first use."""
+    token = read_token()
+    if not token:
+        os.makedirs(os.path.dirname(TOKEN_FILE), exist_ok=True)
+        token = secrets.token_hex(32)
+        fd = os.open(TOKEN_FILE, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, 'w', encoding='ascii') as f:
+            f.write(token)
+    try:
+        os.chmod(TOKEN_FILE, 0o600)
+    except OSError:
+        pass  # e.g. permissions the file system does not support
+    return token
+
+
+def job_error(job):
+    """Return why a job cannot run, or None: its shape, then the option checks the CLI makes."""
+    cities = job.get('cities')
+    if not isinstance(cities, list) or not cities or not all(isinstance(city, str) and city.strip()
+                                                              for city in cities):
+        return "A job needs 'cities', a non-empty list of city names"
+    if not isinstance(job.get('output_dir'), (str, type(None))):
+        return "'output_dir' must be a path"
+    options = job.get('options') or {}
+    if not isinstance(options, dict):
+        return "'options' must be an object of scraper options"
+    unknown = sorted(set(options) - JOB_OPTIONS)
+    if unknown:
+        return f"Options a job cannot set: {', '.join(unknown)}"
+    return options_error(cities, options)
+
+
+class JobEvents:
+    """Events queue of a job's scraper that sends its log and facility events on to the client."""
+
+    def __init__(self, report):
+        self.report = report
+
+    def put(self, event):
+        if 'facility' in event:
+            facility_data = event['facility']
+            self.report({'facility': {field: facility_data[field] for field in FIELDNAMES}})
+        elif 'log' in event:
+            self.report(event)
+        # Progress events only drive the GUI's status line
+
+
+class WarmSessions:
+    """Browsers waiting on the search form for the next job."""
+
+    def __init__(self, size, base_url, lean=None, log=print):
+        self.base_url = base_url
+        self.lean = lean
+        self.log = log
+        self.available = queue.Queue()
+        self.drivers = set()
+        self.lock = threading.Lock()
+        for _ in range(size):
+            threading.Thread(target=self.warm, daemon=True).start()
+
+    def warm(self, driver=None):
+        """Put a browser on the search form and make it available, replacing it if it broke."""
+        for attempt in range(3):
+            try:
+                if driver is None:
+                    driver = create_chrome_driver(self.lean)
+                    with self.lock:
+                        self.drivers.add(driver)
+                start = time.perf_counter()
+                open_search_form(driver, self.base_url, PageWaits(driver), log=lambda message: None)
+                self.log(f"Browser ready on the search form ({time.perf_counter() - start:.1f}s)")
+                self.available.put(driver)
+                return
+            except Exception as e:
+                self.log(f"Could not warm a browser (attempt {attempt + 1}): {e}")
+                self.discard(driver)
+                driver = None
+        self.log("Giving up on a browser session; jobs will wait for the others")
+
+    def checkout(self, timeout=300):
+        """Take a warm browser, waiting for one if every session is busy."""
+        try:
+            return self.available.get(timeout=timeout)
+        except queue.Empty:
+            raise RuntimeError(f"No warm browser became available within {timeout}s")
+
+    def release(self, driver):
+        """Send a browser back to the search form in the background once its job is done."""
+        threading.Thread(target=self.warm, args=(driver,), daemon=True).start()
+
+    def discard(self, driver):
+        if driver is None:
+            return
+        with self.lock:
+            self.drivers.discard(driver)
+        try:
+            driver.quit()
+        except Exception:
+            pass  # Browser may already be closed
+
+    def close(self):
+        """Quit every browser."""
+        with self.lock:
+            drivers = list(self.drivers)
+        for driver in drivers:
+            self.discard(driver)
+
+
+class ScraperDaemon(socketserver.ThreadingTCPServer):
+    """Local server that runs one scrape job per connection with a warm browser.
+
+    Every connection opens with a hello line, {"hello": PROTOCOL_VERSION,
+    "token": ...}, answered with {"hello": PROTOCOL_VERSION}, or with
+    {"error": ...} and a hang-up when the version or the token is wrong.
+    A job is then one JSON line, {"cities": [...], "output_dir": ..., "options": {...}};
+    the reply is a JSON line per event: {"log": message}, {"facility": record}
+    and finally {"done": {...}}. A client that disconnects stops its job,
+    which keeps what it already saved, like the GUI's Stop button.
+    token defaults to this user's token file, created if needed.
+    """
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, port=DEFAULT_PORT, sessions=1, base_url=None, lean=False, lean_allow=(), token=None):
+        self.token = token or create_token()
+        self.base_url = (base_url or ElderlyFacilityScraper.DEFAULT_BASE_URL).rstrip('/')
+        self.lean_options = {'lean': lean, 'lean_allow': lean_allow}
+        self.sessions = WarmSessions(sessions, self.base_url,
+                                     LeanProfile(self.base_url, lean_allow) if lean else None)
+        super().__init__(('127.0.0.1', port), JobHandler)
+
+    def run_job(self, job, send):
+        """Run a job with a warm browser, reporting its progress through send(event).
+
+        A job that is malformed or asks for options the CLI would refuse is
+        answered with {"error": ...} alone.
+        """
+        error = job_error(job)
+        if error:
+            send({'error': error})
+            return
+        received = time.perf_counter()
+        cities = job['cities']
+        options = {key: value for key, value in (job.get('options') or {}).items() if key in JOB_OPTIONS}
+        summary = {'facilities': 0, 'completed': False, 'filename': None, 'error': None,
+                   'first_facility_seconds': None}
+        print(f"Job: {', '.join(cities)}")
+        disconnected = threading.Event()
+        # The scraper's threads (parse pool, detail workers) report too
+        lock = threading.Lock()
+
+        def report(event):
+            with lock:
+                if disconnected.is_set():
+                    return
+                if 'facility' in event and summary['first_facility_seconds'] is None:
+                    summary['first_facility_seconds'] = time.perf_counter() - received
+                try:
+                    send(event)
+                except OSError:
+                    disconnected.set()
+
+        driver = scraper = None
+        try:
+            driver = self.sessions.checkout()
+            scraper = ElderlyFacilityScraper(cities[0], job.get('output_dir'), base_url=self.base_url,
+                                             driver=driver, events=JobEvents(report), **self.lean_options,
+                                             **options)
+            scraper.search_form_ready = True
+            if len(cities) > 1:
+                batch = BatchScraper(scraper, cities, log=scraper.log, should_stop=disconnected.is_set)
+                batch.run()
+                summary.update(facilities=len(batch.records), completed=not batch.failed_cities,
+                               filename=batch.combined_filename)
+            else:
+                # Each record reaches the client as a facility event
+                records = scraper.iter_facilities()
+                try:
+                    for facility_data in records:
+                        if disconnected.is_set():
+                            break
+                finally:
+                    # Saves the current page when the client went away
+                    records.close()
+                summary.update(facilities=scraper.facility_count, completed=scraper.scraping_completed,
+                               filename=scraper.filename)
+        except Exception as e:
+            summary['error'] = str(e)
+        finally:
+            if scraper:
+                scraper.close()  # Leaves the warm browser running
+            if driver:
+                self.sessions.release(driver)
+        if disconnected.is_set():
+            print(f"Client disconnected; stopped the job for {', '.join(cities)}")
+        report({'done': summary})
+
+    def server_close(self):
+        super().server_close()
+        self.sessions.close()
+
+
+class JobHandler(socketserver.StreamRequestHandler):
+    """Checks the client's hello, then reads a job from the connection and streams its events back."""
+
+    def handle(self):
+        hello = self.read_message()
+        if hello is None:
+            return
+        if hello.get('hello') != PROTOCOL_VERSION:
+            self.send({'error': f"Unsupported protocol version {hello.get('hello')!r}, "
+                                f"the daemon speaks version {PROTOCOL_VERSION}"})
+            return
+        token = str(hello.get('token') or '').encode('utf-8')
+        if not hmac.compare_digest(token, self.server.token.encode('utf-8')):
+            print("Rejected a client without the daemon token")
+            self.send({'error': f"Wrong daemon token (the daemon's is in {TOKEN_FILE})"})
+            return
+        self.send({'hello': PROTOCOL_VERSION})
+
+        job = self.read_message()
+        if job is None:
+            return  # daemon_running() only checks the handshake
+        self.server.run_job(job, self.send)
+
+    def read_message(self):
+        """Read one JSON object line; None when the client hung up or sent something else."""
+        line = self.rfile.readline()
+        try:
+            message = json.loads(line) if line else None
+        except ValueError:
+            return None
+        return message if isinstance(message, dict) else None
+
+    def send(self, event):
+        self.wfile.write(json.dumps(event).encode('utf-8') + b'\n')
+        self.wfile.flush()
+
+
+def connect(port=DEFAULT_PORT, timeout=HANDSHAKE_TIMEOUT):
+    """Connect to the daemon and exchange hellos; returns (socket, line reader).
+
+    Raises OSError if nothing listens on port, and ConnectionError if what
+    listens is not a daemon of this version or refuses this user's token.
+    """
+    sock = socket.create_connection(('127.0.0.1', port), timeout=timeout)
+    try:
+        sock.sendall(json.dumps({'hello': PROTOCOL_VERSION, 'token': read_token()}).encode('utf-8') + b'\n')
+        reader = sock.makefile('r', encoding='utf-8')
+        try:
+            reply = json.loads(reader.readline() or 'null')
+        except ValueError:
+            reply = None
+        if not isinstance(reply, dict) or reply.get('hello') != PROTOCOL_VERSION:
+            reader.close()
+            raise ConnectionError(reply.get('error') if isinstance(reply, dict) and reply.get('error')
+                                  else f"No scraper daemon handshake on port {port}")
+        # Jobs stream events for as long as the crawl takes
+        sock.settimeout(None)
+        return sock, reader
+    except BaseException:
+        sock.close()
+        raise
+
+
+def daemon_running(port=DEFAULT_PORT):
+    """Tell whether a daemon of this version listens on port and accepts this user's token."""
+    try:
+        sock, reader = connect(port, timeout=0.5)
+    except OSError:
+        return False
+    reader.close()
+    sock.close()
+    return True
+
+
+def submit_job(cities, output_dir, options=None, port=DEFAULT_PORT):
+    """Send a job to the daemon and yield its events as they arrive.
+
+    output_dir should be absolute, since the daemon runs in its own directory.
+    Closing the generator disconnects, which stops the job.
+    """
+    sock, events = connect(port)
+    with sock, events:
+        job = {'cities': cities, 'output_dir': output_dir, 'options': options or {}}
+        sock.sendall(json.dumps(job).encode('utf-8') + b'\n')
+        for line in events:
+            yield json.loads(line)
+
+
+def run_in_daemon(cities, output_dir, options=None, port=DEFAULT_PORT, log=print, should_stop=lambda: False,
+                  on_facility=None):
+    """Run a job in the daemon, logging its progress and passing each record to on_facility.
+
+    Returns the job summary of the 'done' event (with only 'error' set if
+    the daemon refused the job), or None if the job was stopped
+    (should_stop() turned true) or the daemon went away.
+    """
+    submitted = time.perf_counter()
+    events = submit_job(cities, os.path.abspath(output_dir or os.getcwd()), options, port)
+    first_facility = True
+    try:
+        for event in events:
+            if 'log' in event:
+                log(event['log'])
+            elif 'facility' in event:
+                if first_facility:
+                    log(f"First facility after {time.perf_counter() - submitted:.1f}s")
+                    first_facility = False
+                log(f"✓ Added facility: {event['facility']['Name']}")
+                if on_facility:
+                    on_facility(event['facility'])
+            elif 'done' in event:
+                return event['done']
+            elif 'error' in event:
+                return {'facilities': 0, 'completed': False, 'filename': None, 'error': event['error'],
+                        'first_facility_seconds': None}
+            if should_stop():
+                log("\n⚠ Stopping the daemon job...")
+                break
+    finally:
+        events.close()
+    return None
+
+
+def main():
+    """Run the daemon until interrupted."""
+    # Needed by the HTML parse pool in frozen (PyInstaller) builds
+    multiprocessing.freeze_support()
+    parser = argparse.ArgumentParser(description='Keep warm browsers on the search form for scrape jobs.')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help=f'Local port (default: {DEFAULT_PORT})')
+    parser.add_argument('--sessions', type=int, default=1,
+                        help='Browsers kept warm, i.e. jobs that can run at once (default: 1)')
+    parser.add_argument('--base-url', type=str, default=None, help='Site to scrape (default: the CCLD site)')
+    parser.add_argument('--lean', action='store_true',
+                        help='Keep the browsers from loading images, fonts, stylesheets and third-party hosts')
+    parser.add_argument('--lean-allow', action='append', default=[], metavar='KIND_OR_HOST',
+                        help='With --lean, still load this resource kind or host; may be repeated')
+    args = parser.parse_args()
+
+    server = ScraperDaemon(args.port, args.sessions, args.base_url, args.lean, args.lean_allow)
+    print(f"Scraper daemon listening on 127.0.0.1:{args.port} with {args.sessions} warm browser(s)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nStopping daemon...")
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
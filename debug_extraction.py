@@ -9,6 +9,8 @@ from webdriver_manager.chrome import ChromeDriverManager
 import time
 import re
 
+from extraction import FIELDS, extract_facility_fields
+
 chrome_options = Options()
 chrome_options.add_argument("--headless")
 chrome_options.add_argument("--no-sandbox")
@@ -38,8 +40,9 @@ try:
     print("\n\n=== TESTING PATTERNS ===")
     
     # Try different patterns
+    name_field = next(field for field in FIELDS if field.column == 'Name')
     patterns = [
-        (r'Facility Detail\s+([^\n]+?)\s+Status:', "Original pattern"),
+        (re.escape(name_field.label) + name_field.value, "Registered pattern"),
         (r'Facility Detail\s*\n\s*([^\n]+)\s+Status:', "With explicit newline"),
         (r'Facility Detail[^\n]*\n\s*([^S]+?)\s+Status:', "Different approach"),
         (r'Facility Detail.*?\n\s*(.+?)\s{2,}Status:', "More flexible"),
@@ -52,6 +55,10 @@ try:
         else:
             print(f"\n✗ {desc}: No match")
     
+    print("\n\n=== REGISTERED FIELDS ===")
+    for field, value in extract_facility_fields(body_text).items():
+        print(f"{field}: {value!r}")
+    
 except Exception as e:
     print(f"Error: {e}")
     import traceback
@@ -0,0 +1,105 @@
+"""
+Incremental (delta) crawls.
+Compares the full results listing of a city with the facilities stored by earlier runs and
+picks the detail pages worth fetching: new, changed, previously missing, stale or incomplete
+facilities.
+Everything else is written from its stored record, so a refresh costs time in proportion to
+churn rather than to the number of facilities.
+"""
+
+import time
+from collections import namedtuple
+
+from extraction import FIELDNAMES, detail_only_columns
+
+
+# urls: detail pages to fetch, stalest first; reused: stored records kept as they are;
+# reasons: why each facility number is fetched ('new', 'changed', 'reappeared', 'stale'
+# or 'incomplete')
+DeltaPlan = namedtuple('DeltaPlan', 'urls reused reasons')
+
+
+def _normalize(value):
+    return ' '.join(str(value or '').split()).casefold()
+
+
+def listing_changed(listing, stored):
+    """Tell whether the results table row differs from the stored record.
+
+    The table shows the street and zip but not the city, so addresses are
+    compared on their street part only. Blank cells are not a difference.
+    """
+    for field in ('Name', 'Status'):
+        if listing[field] and _normalize(listing[field]) != _normalize(stored.get(field)):
+            return True
+    street = listing['Address'].split(',', 1)[0]
+    return bool(street) and _normalize(street) != _normalize(stored.get('Address', '').split(',', 1)[0])
+
+
+def lacks_details(stored):
+    """Tell whether a stored record has none of the columns only a detail page has.
+
+    Such a record came from the results table alone (e.g. --listing-only), so
+    reusing it would write blanks where the site has values. A facility whose
+    page lacks one or two of the fields is still complete.
+    """
+    return not any(stored.get(column) for column in detail_only_columns())
+
+
+def plan_delta(listings, stored, stale_after_hours, now=None):
+    """Split a city's listings into detail pages to fetch and stored records to reuse.
+
+    listings is [(url, record from the results table)] in results order and
+    stored the FacilityStore.stored_facilities() of their facility numbers.
+    Stored records without any detail-page column are fetched again however
+    recently they were stored.
+    """
+    now = time.time() if now is None else now
+    stale_before = now - stale_after_hours * 3600
+    fetch = []
+    reused = []
+    reasons = {}
+    for url, listing in listings:
+        facility_id = listing['Facility Number']
+        if facility_id not in stored:
+            reason, fetched_at = 'new', None
+        else:
+            record, fetched_at, missing = stored[facility_id]
+            if missing:
+                reason = 'reappeared'
+            elif listing_changed(listing, record):
+                reason = 'changed'
+            elif fetched_at is None or fetched_at < stale_before:
+                reason = 'stale'
+            elif lacks_details(record):
+                reason = 'incomplete'
+            else:
+                reused.append(record)
+                continue
+        reasons[facility_id] = reason
+        # Never-fetched facilities sort before everything else
+        fetch.append((fetched_at or 0, url))
+    fetch.sort(key=lambda item: item[0])
+    return DeltaPlan([url for fetched_at, url in fetch], reused, reasons)
+
+
+def summarize_plan(plan):
+    """Return a one-line summary of a delta plan."""
+    counts = {}
+    for reason in plan.reasons.values():
+        counts[reason] = counts.get(reason, 0) + 1
+    details = ', '.join(f"{count} {reason}" for reason, count in sorted(counts.items()))
+    return (f"Delta: fetching {len(plan.urls)} of {len(plan.urls) + len(plan.reused)} facilities"
+            f" ({details or 'nothing changed'}), reusing {len(plan.reused)} stored records")
+
+
+def merge_listing(listing, detail):
+    """Return a freshly fetched detail record with its blank columns filled from the table row.
+
+    The detail page wins wherever it has a value (its address includes the
+    city the table lacks); the listing only fills in what the page left blank.
+    """
+    merged = detail.copy()
+    for field in FIELDNAMES:
+        merged[field] = detail.get(field) or listing[field]
+    return merged
@@ -0,0 +1,48 @@
+"""
+Pool of headless Chrome drivers for fetching facility detail pages in parallel.
+"""
+
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+class DriverPool:
+    """A fixed set of WebDriver instances shared by detail-page worker threads."""
+
+    def __init__(self, size, driver_factory):
+        """Prepare size drivers made with driver_factory(); they are launched on first use."""
+        self.size = size
+        self.driver_factory = driver_factory
+        self.drivers = []
+        self.available = queue.Queue()
+        self.lock = threading.Lock()
+        self.started = False
+
+    def start(self):
+        """Launch the drivers (concurrently), unless that already happened."""
+        with self.lock:
+            if self.started:
+                return
+            with ThreadPoolExecutor(max_workers=self.size) as executor:
+                self.drivers = list(executor.map(lambda _: self.driver_factory(), range(self.size)))
+            for driver in self.drivers:
+                self.available.put(driver)
+            self.started = True
+
+    def run(self, func, item):
+        """Call func(item, driver) with a driver checked out of the pool, waiting for one if needed."""
+        self.start()
+        driver = self.available.get()
+        try:
+            return func(item, driver)
+        finally:
+            self.available.put(driver)
+
+    def close(self):
+        """Quit every driver."""
+        for driver in self.drivers:
+            try:
+                driver.quit()
+            except Exception:
+                pass  # Browser may already be closed
@@ -0,0 +1,412 @@
+"""
+Facility detail extraction helpers.
+Turns facility detail pages (rendered body text or raw HTML) into CSV records.
+"""
+
+import re
+import sys
+import time
+from collections import namedtuple
+from collections.abc import MutableMapping
+from html.parser import HTMLParser
+from operator import attrgetter
+
+from history import normalize_history
+
+
+_WHITESPACE = re.compile(r'\s+')
+
+# CSV columns, in order; register_field() appends to it
+FIELDNAMES = []
+
+
+def empty_facility_record():
+    """Return a facility record with every CSV column present and blank."""
+    return FacilityRecord()
+
+
+def facility_id_from_url(url):
+    """Return the FacDetail facility number from a facility URL, or None."""
+    match = re.search(r'/FacDetail/(\d+)', url or '')
+    return match.group(1) if match else None
+
+
+def normalize_facility_url(facility_url, base_url):
+    """Return an absolute /carefacilitysearch/FacDetail/<id> URL."""
+    # Fix relative URLs - ensure they have the full path
+    if facility_url.startswith('/FacDetail'):
+        facility_url = f"{base_url}/carefacilitysearch{facility_url}"
+    elif '/FacDetail/' in facility_url and '/carefacilitysearch/' not in facility_url:
+        # Fix URLs that are missing /carefacilitysearch/
+        facility_url = facility_url.replace('/FacDetail/', '/carefacilitysearch/FacDetail/')
+    return facility_url
+
+
+# label is the literal text that introduces the field on a detail page, value is the
+# regex matched right after it and build turns value's capture groups into the column value;
+# repeated columns take few distinct values, which records share instead of copying
+FacilityField = namedtuple('FacilityField', 'column label value build repeated')
+
+
+def _first_group(groups):
+    return groups[0].strip()
+
+
+# Declarative field registry; the order is the CSV column order
+FIELDS = []
+# (field, compiled label + value regex) per field, compiled on first use
+_patterns = None
+
+
+def register_field(column, label, value, build=_first_group, repeated=False):
+    """Add a field to every extracted record and to the CSV columns.
+
+    The fields registered in this module get a FacilityRecord slot each;
+    fields registered later (e.g. by a module that imports this one) are
+    kept in a small per-record dict instead. Register fields before any
+    records are built.
+    """
+    global _patterns
+    if column in FIELDNAMES:
+        raise ValueError(f"Column {column!r} is already registered")
+    field = FacilityField(column, label, value, build, repeated)
+    FIELDS.append(field)
+    FIELDNAMES.append(column)
+    _patterns = None
+    if 'FacilityRecord' in globals():
+        FacilityRecord.add_column(field)
+
+
+# Facility name is the line after "Facility Detail", up to "Status:"
+register_field('Name', 'Facility Detail', r'\s+([^\n]+?)\s+Status:')
+register_field('Status', 'Status:', r'\s*([^\n]+)', repeated=True)
+# Address is the street and city/state/zip lines after "Address:"
+register_field('Address', 'Address:', r'\s*\n([^\n]+)\n([^\n]+)',
+               lambda groups: f"{groups[0].strip()}, {groups[1].strip()}")
+register_field('Phone Number', 'Phone:', r'\s*([^\n]+)')
+register_field('Facility Capacity', 'Facility Capacity:', r'\s*(\d+)', repeated=True)
+register_field('Facility Number', 'Facility Number:', r'\s*(\d+)')
+register_field('Licensee Name', 'Licensee Name:', r'\s*([^\n]+)')
+register_field('Facility Type', 'Facility Type:', r'\s*([^\n]+)', repeated=True)
+register_field('License Date', 'Lic. Date:', r'\s*([^\n]+)', repeated=True)
+
+
+def _slot_name(column):
+    """Return the FacilityRecord attribute of a column, e.g. 'Phone Number' -> phone_number."""
+    return re.sub(r'\W+', '_', column).strip('_').lower()
+
+
+class FacilityRecord(MutableMapping):
+    """Compact facility record: one slot per registered column, plus the history child rows.
+
+    Reads and writes like the dicts it replaces (record['Status'], get(),
+    'History' in record, dict(record)) without a hash table per record, and
+    the values of repeated columns are interned, so all records share one
+    copy of e.g. each status. Columns registered after the class was defined
+    live in self.extra, a dict created on the first such value. Every column
+    is always present; 'History' only once it is set. row() returns the
+    column values in FIELDNAMES order.
+    """
+
+    columns = tuple(FIELDNAMES)
+    _slots = {column: _slot_name(column) for column in FIELDNAMES}
+    _repeated = frozenset(field.column for field in FIELDS if field.repeated)
+    _row = attrgetter(*_slots.values())
+    # Columns registered after the class was defined, in FIELDNAMES order
+    _extra_columns = ()
+    __slots__ = tuple(_slots.values()) + ('history', 'extra')
+
+    def __init__(self, values=(), **kwargs):
+        for slot in self._slots.values():
+            setattr(self, slot, '')
+        self.history = None
+        self.extra = None
+        if values or kwargs:
+            self.update(values, **kwargs)
+
+    @classmethod
+    def add_column(cls, field):
+        """Make a field registered after the class was defined a column of every record."""
+        cls.columns += (field.column,)
+        cls._extra_columns += (field.column,)
+        if field.repeated:
+            cls._repeated |= {field.column}
+
+    @classmethod
+    def from_dict(cls, data):
+        """Build a record from a stored dict, dropping keys that are no longer columns."""
+        return cls((key, value) for key, value in data.items()
+                   if key in cls._slots or key in cls._extra_columns or key == 'History')
+
+    def __getitem__(self, key):
+        slot = self._slots.get(key)
+        if slot is not None:
+            return getattr(self, slot)
+        if key in self._extra_columns:
+            return self.extra.get(key, '') if self.extra else ''
+        if key == 'History' and self.history is not None:
+            return self.history
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        if key in self._repeated and type(value) is str:
+            value = sys.intern(value)
+        slot = self._slots.get(key)
+        if slot is not None:
+            setattr(self, slot, value)
+        elif key in self._extra_columns:
+            if self.extra is None:
+                self.extra = {}
+            self.extra[key] = value
+        elif key == 'History':
+            self.history = value
+        else:
+            raise KeyError(f"{key!r} is not a facility column")
+
+    def __delitem__(self, key):
+        if key != 'History' or self.history is None:
+            raise KeyError(key)
+        self.history = None
+
+    def __iter__(self):
+        yield from self.columns
+        if self.history is not None:
+            yield 'History'
+
+    def __len__(self):
+        return len(self.columns) + (self.history is not None)
+
+    def __reduce__(self):
+        # Rebuilt through __setitem__, so records from the parse pool are interned too
+        return _rebuild_record, (self.row(), self.history)
+
+    def __repr__(self):
+        return f"FacilityRecord({dict(self)!r})"
+
+    def row(self):
+        """Return the column values in FIELDNAMES order."""
+        if not self._extra_columns:
+            return self._row(self)
+        extra = self.extra or {}
+        return self._row(self) + tuple(extra.get(column, '') for column in self._extra_columns)
+
+    def copy(self):
+        return FacilityRecord(self)
+
+
+def _rebuild_record(row, history):
+    facility_data = FacilityRecord(zip(FacilityRecord.columns, row))
+    facility_data.history = history
+    return facility_data
+
+
+def _compile_patterns():
+    """Compile each registered field's label and value regex into one pattern."""
+    return [(field, re.compile(re.escape(field.label) + field.value)) for field in FIELDS]
+
+
+def extract_facility_fields(body_text):
+    """Extract the CSV fields from the visible text of a facility detail page.
+
+    Each field is one search of its precompiled pattern; the regex engine
+    skips ahead to a literal label faster than a combined scan of all labels
+    can be driven from Python. The first occurrence whose value matches wins.
+    """
+    global _patterns
+    if _patterns is None:
+        _patterns = _compile_patterns()
+
+    facility_data = empty_facility_record()
+    for field, pattern in _patterns:
+        match = pattern.search(body_text)
+        if match:
+            facility_data[field.column] = field.build(match.groups())
+
+    return facility_data
+
+
+class _VisibleTextParser(HTMLParser):
+    """Approximates WebDriver's element text for a static HTML document."""
+
+    # Subtrees that never contribute visible text
+    SKIP_TAGS = {'head', 'script', 'style', 'noscript', 'template', 'title', 'tip'}
+    # Elements without end tags
+    VOID_TAGS = {'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input',
+                 'link', 'meta', 'param', 'source', 'track', 'wbr'}
+    # Elements rendered on their own line(s)
+    BLOCK_TAGS = {'address', 'article', 'aside', 'blockquote', 'div', 'dl', 'dt', 'dd',
+                  'fieldset', 'footer', 'form', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6',
+                  'header', 'hr', 'li', 'main', 'nav', 'ol', 'p', 'pre', 'section',
+                  'table', 'tbody', 'thead', 'tfoot', 'tr', 'ul'}
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts = []
+        self.skip_tag = None
+        self.skip_depth = 0
+
+    @staticmethod
+    def _is_hidden(attrs):
+        for name, value in attrs:
+            if not value:
+                continue
+            if name == 'class' and 'ng-hide' in value.split():
+                return True
+            if name == 'style' and 'display:none' in value.replace(' ', '').lower():
+                return True
+        return False
+
+    def handle_starttag(self, tag, attrs):
+        if self.skip_tag:
+            if tag == self.skip_tag:
+                self.skip_depth += 1
+            return
+        if tag not in self.VOID_TAGS and (tag in self.SKIP_TAGS or self._is_hidden(attrs)):
+            self.skip_tag = tag
+            self.skip_depth = 1
+            return
+        if tag == 'br' or tag in self.BLOCK_TAGS:
+            self.parts.append('\n')
+        elif tag in ('td', 'th'):
+            self.parts.append(' ')
+
+    def handle_endtag(self, tag):
+        if self.skip_tag:
+            if tag == self.skip_tag:
+                self.skip_depth -= 1
+                if self.skip_depth == 0:
+                    self.skip_tag = None
+            return
+        if tag in self.BLOCK_TAGS:
+            self.parts.append('\n')
+
+    def handle_data(self, data):
+        if not self.skip_tag:
+            # Source whitespace (including newlines) renders as a single space
+            self.parts.append(_WHITESPACE.sub(' ', data))
+
+    def text(self):
+        lines = ''.join(self.parts).replace('\xa0', ' ').split('\n')
+        lines = (' '.join(line.split()) for line in lines)
+        return '\n'.join(line for line in lines if line)
+
+
+def html_to_text(html):
+    """Return the visible text of an HTML document, one block per line."""
+    parser = _VisibleTextParser()
+    parser.feed(html)
+    parser.close()
+    return parser.text()
+
+
+# Results table column headers -> where the cell text goes
+_RESULTS_COLUMNS = {'Facility Name': 'Name', 'Address': 'street', 'Zip': 'zip', 'Status': 'Status'}
+
+
+class _ResultsTableParser(HTMLParser):
+    """Collects the header and the row cells of the search results table."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.headers = []
+        self.rows = []
+        self.in_table = False
+        self.section = None
+        self.cell = None
+        self.row = None
+
+    def handle_starttag(self, tag, attrs):
+        if tag == 'table' and 'footable' in (dict(attrs).get('class') or '').split():
+            self.in_table = True
+        elif not self.in_table:
+            return
+        elif tag in ('thead', 'tbody'):
+            self.section = tag
+        elif tag == 'tr' and self.section == 'tbody':
+            self.row = {'cells': [], 'href': None}
+        elif tag in ('th', 'td'):
+            self.cell = []
+        elif tag == 'a' and self.row is not None:
+            href = dict(attrs).get('href') or ''
+            if '/FacDetail/' in href:
+                self.row['href'] = href
+
+    def handle_endtag(self, tag):
+        if not self.in_table:
+            return
+        if tag in ('th', 'td') and self.cell is not None:
+            text = ' '.join(''.join(self.cell).split())
+            if self.section == 'thead':
+                self.headers.append(text)
+            elif self.row is not None:
+                self.row['cells'].append(text)
+            self.cell = None
+        elif tag == 'tr' and self.row is not None:
+            if self.row['href']:
+                self.rows.append(self.row)
+            self.row = None
+        elif tag == 'table':
+            self.in_table = False
+
+    def handle_data(self, data):
+        if self.cell is not None:
+            self.cell.append(data)
+
+
+# Columns parse_results_table() fills in; every other column is only on the detail page
+LISTING_COLUMNS = ('Name', 'Status', 'Facility Number', 'Address')
+
+
+def detail_only_columns():
+    """Return the registered columns a results table row leaves blank, in CSV order."""
+    return [column for column in FIELDNAMES if column not in LISTING_COLUMNS]
+
+
+def parse_results_table(html):
+    """Return (facility_url, record) for every row of a search results page.
+
+    The table only has the LISTING_COLUMNS (name, street, zip and status);
+    the phone number, capacity and other detail_only_columns() are left blank
+    for the detail page to fill in.
+    """
+    parser = _ResultsTableParser()
+    parser.feed(html)
+    parser.close()
+
+    listings = []
+    for row in parser.rows:
+        values = dict.fromkeys(_RESULTS_COLUMNS.values(), '')
+        for header, text in zip(parser.headers, row['cells']):
+            # Header cells may also hold tooltip text before the column title
+            for title, key in _RESULTS_COLUMNS.items():
+                if header.endswith(title):
+                    values[key] = text
+        facility_data = empty_facility_record()
+        facility_data['Name'] = values['Name']
+        facility_data['Status'] = values['Status']
+        facility_data['Facility Number'] = facility_id_from_url(row['href']) or ''
+        # Every CCLD facility is in California; the city is not in the table
+        if values['street']:
+            facility_data['Address'] = f"{values['street']}, CA {values['zip']}".strip()
+        listings.append((row['href'], facility_data))
+    return listings
+
+
+def parse_facility_html(html, history=None):
+    """Extract the CSV fields from a detail page's HTML (e.g. a rendered page_source).
+
+    history is the raw HISTORY_SCRIPT result read from the same page; its
+    normalized child table rows are attached under the 'History' key.
+    A module-level function so it can run in a process pool.
+    """
+    facility_data = extract_facility_fields(html_to_text(html))
+    if history is not None:
+        facility_data['History'] = normalize_history(facility_data['Facility Number'], history)
+    return facility_data
+
+
+def timed_parse_facility_html(html, history=None):
+    """parse_facility_html() that also returns the seconds it took, as (record, seconds)."""
+    start = time.perf_counter()
+    facility_data = parse_facility_html(html, history)
+    return facility_data, time.perf_counter() - start
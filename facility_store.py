@@ -0,0 +1,243 @@
+"""
+SQLite store of scraped facilities.
+Upserts every record by facility number, keeps one row per crawl in a runs table and
+records what each run changed (new facilities, closures, capacity and status changes).
+"""
+
+import json
+import sqlite3
+import threading
+import time
+
+from extraction import FacilityRecord
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    city TEXT NOT NULL,
+    started_at REAL NOT NULL,
+    finished_at REAL,
+    complete INTEGER NOT NULL DEFAULT 0,
+    facilities INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS facilities (
+    facility_id TEXT PRIMARY KEY,
+    city TEXT NOT NULL,
+    name TEXT,
+    status TEXT,
+    capacity INTEGER,
+    record TEXT NOT NULL,
+    first_seen_run INTEGER NOT NULL,
+    last_seen_run INTEGER NOT NULL,
+    missing_since_run INTEGER,
+    fetched_at REAL
+);
+CREATE INDEX IF NOT EXISTS idx_facilities_city ON facilities (city);
+CREATE INDEX IF NOT EXISTS idx_facilities_status ON facilities (status);
+CREATE INDEX IF NOT EXISTS idx_facilities_capacity ON facilities (capacity);
+CREATE TABLE IF NOT EXISTS changes (
+    run_id INTEGER NOT NULL,
+    facility_id TEXT NOT NULL,
+    change TEXT NOT NULL,
+    old_value TEXT,
+    new_value TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_changes_run ON changes (run_id, change);
+"""
+
+
+# Columns added after the first release, created on databases that predate them
+MIGRATIONS = {
+    'fetched_at': "ALTER TABLE facilities ADD COLUMN fetched_at REAL",
+}
+
+
+def _capacity(record):
+    capacity = record.get('Facility Capacity', '')
+    return int(capacity) if str(capacity).isdigit() else None
+
+
+# The results table shows the current name and status, so a record whose details were not
+# fetched may update them; its other values only fill in what the stored record lacks
+_LISTED_COLUMNS = ('Name', 'Status')
+
+
+def _merge_stored(stored, record):
+    """Return the JSON of a stored record updated from one whose details were not fetched.
+
+    Blank values never replace stored ones, and the table's city-less address
+    never replaces a stored detail-page address.
+    """
+    merged = json.loads(stored)
+    for column, value in record.items():
+        if value and (column in _LISTED_COLUMNS or not merged.get(column)):
+            merged[column] = value
+    return json.dumps(merged)
+
+
+class FacilityStore:
+    """SQLite database of facilities, crawl runs and per-run changes."""
+
+    def __init__(self, path):
+        """Open (or create) the database at path."""
+        self.path = path
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(facilities)")}
+        for column, statement in MIGRATIONS.items():
+            if column not in columns:
+                self.conn.execute(statement)
+        self.conn.commit()
+
+    def start_run(self, city, resume=False):
+        """Start a crawl of city and return its run id.
+
+        With resume, the city's last unfinished run is continued instead, so
+        facilities saved before the interruption still count as seen by it.
+        """
+        with self.lock:
+            if resume:
+                row = self.conn.execute(
+                    "SELECT run_id FROM runs WHERE city = ? AND finished_at IS NULL"
+                    " ORDER BY run_id DESC LIMIT 1", (city,)
+                ).fetchone()
+                if row:
+                    return row[0]
+            cursor = self.conn.execute(
+                "INSERT INTO runs (city, started_at) VALUES (?, ?)", (city, time.time())
+            )
+            self.conn.commit()
+            return cursor.lastrowid
+
+    def _select(self, columns, ids):
+        """Return {facility_id: row of columns} for the stored facilities among ids."""
+        rows = {}
+        # Look up in chunks that fit SQLite's parameter limit
+        for start in range(0, len(ids), 500):
+            chunk = ids[start:start + 500]
+            rows.update(
+                (row[0], row[1:]) for row in self.conn.execute(
+                    f"SELECT facility_id, {columns} FROM facilities"
+                    f" WHERE facility_id IN ({', '.join('?' * len(chunk))})", chunk
+                )
+            )
+        return rows
+
+    def upsert(self, run_id, city, facilities, fetched=None):
+        """Insert or update a batch of records in one transaction, recording their changes.
+
+        fetched is the set of facility numbers whose record was just read from
+        the detail page (default: all of them); the others keep the time their
+        details were last fetched, and are merged into their stored record
+        rather than replacing it, so a --listing-only run never blanks out the
+        details of an earlier full run. Records without a facility number are
+        skipped. Blank statuses and capacities never count as a change.
+        """
+        records = [record for record in facilities if record.get('Facility Number')]
+        if not records:
+            return
+        now = time.time()
+        with self.lock, self.conn:
+            ids = [record['Facility Number'] for record in records]
+            existing = self._select('status, capacity, missing_since_run, record', ids)
+
+            changes = []
+            stored_json = {}
+            for record in records:
+                facility_id = record['Facility Number']
+                status, capacity = record.get('Status', ''), _capacity(record)
+                if facility_id not in existing:
+                    changes.append((run_id, facility_id, 'new', None, status))
+                    stored_json[facility_id] = json.dumps(dict(record))
+                    continue
+                old_status, old_capacity, missing_since, old_record = existing[facility_id]
+                if fetched is None or facility_id in fetched:
+                    stored_json[facility_id] = json.dumps(dict(record))
+                else:
+                    stored_json[facility_id] = _merge_stored(old_record, record)
+                if missing_since is not None:
+                    changes.append((run_id, facility_id, 'reappeared', None, status))
+                if status and old_status and status != old_status:
+                    change = 'closed' if 'closed' in status.lower() else 'status_changed'
+                    changes.append((run_id, facility_id, change, old_status, status))
+                if capacity is not None and old_capacity is not None and capacity != old_capacity:
+                    changes.append((run_id, facility_id, 'capacity_changed', str(old_capacity), str(capacity)))
+
+            self.conn.executemany(
+                "INSERT INTO facilities (facility_id, city, name, status, capacity, record,"
+                " first_seen_run, last_seen_run, fetched_at)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)"
+                " ON CONFLICT (facility_id) DO UPDATE SET"
+                " city = excluded.city,"
+                " name = COALESCE(NULLIF(excluded.name, ''), name),"
+                " status = COALESCE(NULLIF(excluded.status, ''), status),"
+                " capacity = COALESCE(excluded.capacity, capacity),"
+                " record = excluded.record,"
+                " last_seen_run = excluded.last_seen_run,"
+                " missing_since_run = NULL,"
+                " fetched_at = COALESCE(excluded.fetched_at, fetched_at)",
+                [(record['Facility Number'], city, record.get('Name', ''), record.get('Status', ''),
+                  _capacity(record), stored_json[record['Facility Number']], run_id, run_id,
+                  now if fetched is None or record['Facility Number'] in fetched else None)
+                 for record in records]
+            )
+            self.conn.executemany("INSERT INTO changes VALUES (?, ?, ?, ?, ?)", changes)
+            self.conn.execute(
+                "UPDATE runs SET facilities = facilities + ? WHERE run_id = ?", (len(records), run_id)
+            )
+
+    def stored_facilities(self, ids):
+        """Return {facility_id: (record, fetched_at, missing)} for the stored facilities among ids.
+
+        fetched_at is when the details were last read from the site (None if
+        never, e.g. listing-only records), and missing tells whether the last
+        complete crawl of its city no longer listed the facility.
+        """
+        with self.lock:
+            rows = self._select('record, fetched_at, missing_since_run', list(ids))
+        return {facility_id: (FacilityRecord.from_dict(json.loads(record)), fetched_at, missing_since is not None)
+                for facility_id, (record, fetched_at, missing_since) in rows.items()}
+
+    def finish_run(self, run_id, city):
+        """Close a run whose crawl went through every results page.
+
+        Only a complete crawl can tell that a facility is gone, so facilities of
+        the city it did not see are recorded as closed (once). Interrupted runs
+        are left unfinished for --resume to continue.
+        """
+        with self.lock, self.conn:
+            missing = self.conn.execute(
+                "SELECT facility_id, status FROM facilities"
+                " WHERE city = ? AND last_seen_run < ? AND missing_since_run IS NULL",
+                (city, run_id)
+            ).fetchall()
+            self.conn.executemany(
+                "INSERT INTO changes VALUES (?, ?, 'closed', ?, 'no longer listed')",
+                [(run_id, facility_id, status) for facility_id, status in missing]
+            )
+            self.conn.execute(
+                "UPDATE facilities SET missing_since_run = ?"
+                " WHERE city = ? AND last_seen_run < ? AND missing_since_run IS NULL",
+                (run_id, city, run_id)
+            )
+            self.conn.execute(
+                "UPDATE runs SET finished_at = ?, complete = 1 WHERE run_id = ?", (time.time(), run_id)
+            )
+
+    def change_summary(self, run_id):
+        """Return a one-line summary of a run's changes."""
+        with self.lock:
+            counts = self.conn.execute(
+                "SELECT change, COUNT(*) FROM changes WHERE run_id = ? GROUP BY change ORDER BY change", (run_id,)
+            ).fetchall()
+        details = ', '.join(f"{count} {change}" for change, count in counts) or 'no changes'
+        return f"Run {run_id}: {details} ({self.path})"
+
+    def close(self):
+        """Close the database."""
+        with self.lock:
+            self.conn.close()
@@ -0,0 +1,110 @@
+"""
+Persistent on-disk cache of facility detail records.
+Keyed by FacDetail facility number, with a time-to-live and a least-recently-used size cap.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+
+
+CACHE_FILENAME = '.facility-cache.sqlite3'
+
+
+class FacilityCache:
+    """SQLite-backed cache of extracted facility records."""
+
+    def __init__(self, directory, ttl_hours=168, max_mb=256):
+        """Open (or create) the cache file inside directory."""
+        self.path = os.path.join(directory, CACHE_FILENAME)
+        self.ttl = ttl_hours * 3600
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+        # Detail fetches run on worker threads; all access goes through self.lock
+        self.conn = sqlite3.connect(self.path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS facilities ("
+            " facility_id TEXT PRIMARY KEY,"
+            " record TEXT NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " fetched_at REAL NOT NULL,"
+            " accessed_at REAL NOT NULL)"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_accessed ON facilities (accessed_at)")
+        # Expired entries are dropped on open; entries that expire mid-run are evicted first when over the cap
+        self.conn.execute("DELETE FROM facilities WHERE fetched_at < ?", (time.time() - self.ttl,))
+        self.conn.commit()
+        self.total_bytes = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM facilities").fetchone()[0]
+
+    def get(self, facility_id):
+        """Return the cached record for facility_id if it is fresher than the TTL, else None."""
+        if not facility_id:
+            return None
+        now = time.time()
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT record, fetched_at FROM facilities WHERE facility_id = ?", (facility_id,)
+            ).fetchone()
+            if row is None or now - row[1] > self.ttl:
+                self.misses += 1
+                return None
+            self.conn.execute(
+                "UPDATE facilities SET accessed_at = ? WHERE facility_id = ?", (now, facility_id)
+            )
+            self.conn.commit()
+            self.hits += 1
+        return json.loads(row[0])
+
+    def put(self, facility_id, record):
+        """Store a freshly fetched record and evict old entries beyond the size cap."""
+        if not facility_id:
+            return
+        data = json.dumps(dict(record))
+        now = time.time()
+        with self.lock:
+            previous = self.conn.execute(
+                "SELECT size FROM facilities WHERE facility_id = ?", (facility_id,)
+            ).fetchone()
+            if previous:
+                self.total_bytes -= previous[0]
+            self.conn.execute(
+                "INSERT OR REPLACE INTO facilities (facility_id, record, size, fetched_at, accessed_at)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (facility_id, data, len(data), now, now)
+            )
+            self.total_bytes += len(data)
+            if self.total_bytes > self.max_bytes:
+                self._evict()
+            self.conn.commit()
+
+    def _evict(self):
+        """Drop expired entries, then least recently used ones until under max_bytes."""
+        self.conn.execute("DELETE FROM facilities WHERE fetched_at < ?", (time.time() - self.ttl,))
+        self.total_bytes = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM facilities").fetchone()[0]
+        # Evict down to 90% of the cap so the next few puts don't trigger another pass
+        excess = self.total_bytes - int(self.max_bytes * 0.9)
+        victims = []
+        for facility_id, size in self.conn.execute(
+            "SELECT facility_id, size FROM facilities ORDER BY accessed_at"
+        ):
+            if excess <= 0:
+                break
+            victims.append((facility_id,))
+            excess -= size
+            self.total_bytes -= size
+        self.conn.executemany("DELETE FROM facilities WHERE facility_id = ?", victims)
+
+    def stats(self):
+        """Return a one-line summary of cache hits and misses."""
+        return f"Cache: {self.hits} hits, {self.misses} misses ({self.path})"
+
+    def close(self):
+        """Close the cache file."""
+        with self.lock:
+            self.conn.close()
@@ -0,0 +1,115 @@
+"""
+Inspection, complaint and citation history of a facility.
+The detail page's Angular controller already holds the data behind the Visits,
+Inspections, Complaints, Citations and Other Visits tabs, so it is read in the same
+page load and normalized into child tables keyed by facility number.
+"""
+
+from sinks import split_extension
+
+
+# Reads the facility detail controller's tab data; returns null if it is not available
+HISTORY_SCRIPT = """
+if (!window.angular) { return null; }
+var root = document.getElementById('main_content');
+var scope = root && window.angular.element(root).scope();
+var ctrl = scope && scope.ctrl;
+if (!ctrl || !ctrl.FACILITYINFO) { return null; }
+function dates(list) {
+    return (list || []).map(function (d) {
+        return {date: d.ReportDate, report: !!(d.ReportPage && d.ReportPage.inx >= 0)};
+    });
+}
+var info = ctrl.FACILITYINFO;
+return {
+    inspections: dates(ctrl.InspectionDates),
+    other_visits: dates(ctrl.OtherVisitDates),
+    complaints: (ctrl.ComplaintDates || []).map(function (c) {
+        var complaint = c.Complaint || {};
+        return {
+            completed: complaint.APPROVEDATE,
+            substantiated: complaint.SUBALLEGATIONS,
+            inconclusive: complaint.INCALLEGATIONS,
+            unsubstantiated: complaint.UNSALLEGATIONS,
+            unfounded: complaint.UNFALLEGATIONS,
+            type_a: complaint.CITTYPEA,
+            type_b: complaint.CITTYPEB,
+            visits: dates(c.ReportInfo)
+        };
+    }),
+    citations: {
+        'Inspections': [info.NBRINSPTYPA, info.NBRINSPTYPB],
+        'Complaints': [info.TOTTYPEA, info.TOTTYPEB],
+        'Other Visits': [info.NBROTHERTYPA, info.NBROTHERTYPB],
+        'Total': [ctrl.TotaltypeA, ctrl.TotaltypeB]
+    }
+};
+"""
+
+# Child table -> CSV columns
+HISTORY_TABLES = {
+    'visits': ['Facility Number', 'Visit Type', 'Visit Date', 'Complaint Completed', 'Report Available'],
+    'complaints': ['Facility Number', 'Complaint Completed', 'Allegations Substantiated',
+                   'Allegations Inconclusive', 'Allegations Unsubstantiated', 'Allegations Unfounded',
+                   'Type A Citations', 'Type B Citations', 'Visits'],
+    'citations': ['Facility Number', 'Source', 'Type A Citations', 'Type B Citations'],
+}
+
+
+def _value(value):
+    """Render a controller value as a CSV cell ('-1' and null mean not applicable)."""
+    if value is None or str(value) == '-1':
+        return ''
+    return str(value).strip()
+
+
+def _visit_rows(facility_number, visit_type, visits, complaint_completed=''):
+    return [
+        {'Facility Number': facility_number, 'Visit Type': visit_type, 'Visit Date': _value(visit['date']),
+         'Complaint Completed': complaint_completed, 'Report Available': 'Yes' if visit['report'] else 'No'}
+        for visit in visits
+        # Placeholders such as "No Visit Information" carry no date
+        if any(char.isdigit() for char in _value(visit['date']))
+    ]
+
+
+def normalize_history(facility_number, history):
+    """Turn the raw HISTORY_SCRIPT result into rows for each child table."""
+    tables = {table: [] for table in HISTORY_TABLES}
+    if not history:
+        return tables
+
+    tables['visits'].extend(_visit_rows(facility_number, 'Inspection', history['inspections']))
+    tables['visits'].extend(_visit_rows(facility_number, 'Other', history['other_visits']))
+    for complaint in history['complaints']:
+        completed = _value(complaint['completed'])
+        tables['complaints'].append({
+            'Facility Number': facility_number,
+            'Complaint Completed': completed,
+            'Allegations Substantiated': _value(complaint['substantiated']),
+            'Allegations Inconclusive': _value(complaint['inconclusive']),
+            'Allegations Unsubstantiated': _value(complaint['unsubstantiated']),
+            'Allegations Unfounded': _value(complaint['unfounded']),
+            'Type A Citations': _value(complaint['type_a']),
+            'Type B Citations': _value(complaint['type_b']),
+            'Visits': len(complaint['visits']),
+        })
+        tables['visits'].extend(_visit_rows(facility_number, 'Complaint', complaint['visits'], completed))
+    for source, (type_a, type_b) in history['citations'].items():
+        tables['citations'].append({'Facility Number': facility_number, 'Source': source,
+                                    'Type A Citations': _value(type_a), 'Type B Citations': _value(type_b)})
+    return tables
+
+
+def history_filename(filename, table):
+    """Return the child table file next to the main output, e.g. roseville-elderly-facilities-visits.csv."""
+    root, extension = split_extension(filename)
+    return f"{root}-{table}{extension}"
+
+
+def history_rows(facilities, table):
+    """Return the rows of one child table for a batch of facilities.
+
+    Facilities without history (listing mode, the HTTP engine) contribute no rows.
+    """
+    return [row for facility in facilities for row in (facility.get('History') or {}).get(table, [])]
@@ -0,0 +1,120 @@
+"""
+Browserless fetcher for facility detail pages.
+Downloads FacDetail pages over a pooled keep-alive HTTP connection and parses the HTML directly.
+"""
+
+import time
+
+from extraction import parse_facility_html
+
+
+# Fields a static response must contain before we trust it over the browser
+REQUIRED_FIELDS = ('Name', 'Status')
+
+USER_AGENT = (
+    "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/120.0 Safari/537.36"
+)
+
+
+class DetailFetchError(Exception):
+    """A detail page could not be downloaded: the request failed or got an error response."""
+
+
+class HttpDetailFetcher:
+    """Fetches and parses facility detail pages without a browser."""
+
+    def __init__(self, pool_size=4, timeout=10, retries=2, recorder=None, on_error=None, log=print):
+        """Create the connection pool shared by every detail request.
+
+        recorder is a SessionRecorder that keeps every page downloaded, and
+        on_error(url) is called for every request that fails or gets an error
+        response (after the retries).
+        """
+        self.recorder = recorder
+        self.on_error = on_error
+        self.log = log
+        # Imported here so that runs without the http engine do not load it
+        import urllib3
+
+        self.http = urllib3.PoolManager(
+            maxsize=pool_size,
+            block=True,
+            headers={'User-Agent': USER_AGENT, 'Connection': 'keep-alive'},
+            timeout=urllib3.Timeout(connect=timeout, read=timeout),
+            retries=urllib3.Retry(total=retries, backoff_factor=0.5,
+                                  status_forcelist=(502, 503, 504)),
+        )
+
+    def fetch(self, url):
+        """Download a page and return (status_code, html)."""
+        response = self.http.request('GET', url)
+        return response.status, response.data.decode('utf-8', errors='replace')
+
+    def fetch_facility(self, url):
+        """Fetch a detail page and return its record, or None if the static HTML lacks the fields.
+
+        Raises DetailFetchError when the page could not be downloaded, which
+        a browser would not fix.
+        """
+        from urllib3.exceptions import HTTPError
+
+        start = time.perf_counter()
+        try:
+            status, html = self.fetch(url)
+        except HTTPError as e:
+            self.failed(url, f"HTTP fetch failed for {url}: {e}")
+        if self.recorder:
+            self.recorder.record('detail', url, html, time.perf_counter() - start, engine='http', status=status)
+
+        if status != 200:
+            self.failed(url, f"HTTP fetch returned {status} for {url}")
+
+        facility_data = parse_facility_html(html)
+        if not all(facility_data[field] for field in REQUIRED_FIELDS):
+            return None
+        return facility_data
+
+    def failed(self, url, message):
+        self.log(message)
+        if self.on_error:
+            self.on_error(url)
+        raise DetailFetchError(message)
+
+    def close(self):
+        """Close all pooled connections."""
+        self.http.clear()
+
+
+def summarize_latencies(latencies):
+    """Return count, mean, median and p95 (in seconds) for a list of latencies."""
+    if not latencies:
+        return None
+    ordered = sorted(latencies)
+    count = len(ordered)
+    return {
+        'count': count,
+        'mean': sum(ordered) / count,
+        'median': ordered[count // 2],
+        'p95': ordered[min(count - 1, int(count * 0.95))],
+    }
+
+
+def format_latency_report(latencies_by_path):
+    """Format a per-facility latency comparison between fetch paths."""
+    lines = ["Per-facility detail latency:"]
+    summaries = {}
+    for path, latencies in latencies_by_path.items():
+        summary = summarize_latencies(latencies)
+        if summary is None:
+            continue
+        summaries[path] = summary
+        lines.append(
+            f"  {path:<9} n={summary['count']:<5} mean={summary['mean']:.3f}s "
+            f"median={summary['median']:.3f}s p95={summary['p95']:.3f}s"
+        )
+    if 'http' in summaries and 'selenium' in summaries and summaries['http']['mean'] > 0:
+        speedup = summaries['selenium']['mean'] / summaries['http']['mean']
+        lines.append(f"  http is {speedup:.1f}x faster than selenium per facility")
+    return '\n'.join(lines)
+
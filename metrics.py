@@ -0,0 +1,155 @@
+"""
+Per-phase timing spans for the scraper.
+Metrics records how long each phase of a crawl takes (Chrome startup, opening the search
+form, the search, pagination, detail page loads, extraction, writing the output, ...)
+and counts events, for the --profile summary and for a metrics file, in JSON or the
+Prometheus text format, that is rewritten while the crawl runs.
+"""
+
+import json
+import os
+import threading
+import time
+from array import array
+from collections import Counter
+from contextlib import contextmanager
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+def quantile(ordered, q):
+    """Return the q-quantile (nearest rank) of a sorted sequence."""
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+
+class Metrics:
+    """Durations per phase and event counters of a crawl, safe to update from any thread."""
+
+    def __init__(self):
+        self.started = time.time()
+        # Phase -> durations in seconds; a compact array, as detail phases see one per facility
+        self.durations = {}
+        self.counters = Counter()
+        self.lock = threading.Lock()
+
+    @contextmanager
+    def span(self, phase):
+        """Time the body of a with statement as one occurrence of phase."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(phase, time.perf_counter() - start)
+
+    def observe(self, phase, seconds):
+        """Record one occurrence of phase that took seconds."""
+        with self.lock:
+            durations = self.durations.get(phase)
+            if durations is None:
+                durations = self.durations[phase] = array('d')
+            durations.append(seconds)
+
+    def count(self, name, amount=1):
+        """Add to an event counter (facilities, cache hits, ...)."""
+        with self.lock:
+            self.counters[name] += amount
+
+    def summaries(self):
+        """Return {phase: {count, total, mean, p50, p95, p99, max}} with times in seconds."""
+        with self.lock:
+            phases = {phase: sorted(durations) for phase, durations in self.durations.items()}
+        summaries = {}
+        for phase, ordered in phases.items():
+            total = sum(ordered)
+            summary = {'count': len(ordered), 'total': total, 'mean': total / len(ordered)}
+            for q in QUANTILES:
+                summary[f'p{round(q * 100)}'] = quantile(ordered, q)
+            summary['max'] = ordered[-1]
+            summaries[phase] = summary
+        return summaries
+
+    def snapshot(self):
+        """Everything recorded so far, as a JSON-serializable dict."""
+        with self.lock:
+            counters = dict(self.counters)
+        return {
+            'started': self.started,
+            'elapsed_seconds': time.time() - self.started,
+            'counters': counters,
+            'phases': self.summaries(),
+        }
+
+    def format_profile(self):
+        """Return a table of the time spent per phase, the largest total first."""
+        snapshot = self.snapshot()
+        lines = [f"Profile ({snapshot['elapsed_seconds']:.1f}s elapsed):",
+                 f"  {'phase':<20} {'n':>7} {'total':>9} {'share':>6} {'p50':>8} {'p95':>8} {'p99':>8} {'max':>8}"]
+        elapsed = max(snapshot['elapsed_seconds'], 1e-9)
+        for phase, summary in sorted(snapshot['phases'].items(), key=lambda item: -item[1]['total']):
+            lines.append(
+                f"  {phase:<20} {summary['count']:>7} {summary['total']:>8.1f}s {summary['total'] / elapsed:>6.0%} "
+                f"{summary['p50']:>7.3f}s {summary['p95']:>7.3f}s {summary['p99']:>7.3f}s {summary['max']:>7.3f}s"
+            )
+        if snapshot['counters']:
+            lines.append('  ' + ', '.join(f"{name}={value}" for name, value in sorted(snapshot['counters'].items())))
+        return '\n'.join(lines)
+
+    def to_prometheus(self):
+        """Return the metrics in the Prometheus text exposition format."""
+        snapshot = self.snapshot()
+        lines = [
+            '# HELP scraper_phase_seconds Time spent in each phase of the crawl.',
+            '# TYPE scraper_phase_seconds summary',
+        ]
+        for phase, summary in sorted(snapshot['phases'].items()):
+            for q in QUANTILES:
+                lines.append(f'scraper_phase_seconds{{phase="{phase}",quantile="{q}"}} '
+                             f"{summary[f'p{round(q * 100)}']:.6f}")
+            lines.append(f'scraper_phase_seconds_sum{{phase="{phase}"}} {summary["total"]:.6f}')
+            lines.append(f'scraper_phase_seconds_count{{phase="{phase}"}} {summary["count"]}')
+        for name, value in sorted(snapshot['counters'].items()):
+            lines.append(f'# TYPE scraper_{name}_total counter')
+            lines.append(f'scraper_{name}_total {value}')
+        lines.append('# TYPE scraper_elapsed_seconds gauge')
+        lines.append(f"scraper_elapsed_seconds {snapshot['elapsed_seconds']:.3f}")
+        return '\n'.join(lines) + '\n'
+
+
+class MetricsExporter:
+    """Rewrites a metrics file every interval seconds until closed.
+
+    A path ending in .json gets the JSON snapshot; any other (e.g. .prom, for
+    node_exporter's textfile collector) the Prometheus text format.
+    """
+
+    def __init__(self, metrics, path, interval=5.0):
+        self.metrics = metrics
+        self.path = path
+        self.interval = interval
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self.export_periodically, name='metrics-export', daemon=True)
+        self.thread.start()
+
+    def export_periodically(self):
+        while not self.stopped.wait(self.interval):
+            self.export()
+
+    def export(self):
+        """Write the current metrics; readers never see a half-written file."""
+        if self.path.endswith('.json'):
+            content = json.dumps(self.metrics.snapshot(), indent=2) + '\n'
+        else:
+            content = self.metrics.to_prometheus()
+        temporary = f"{self.path}.tmp"
+        try:
+            with open(temporary, 'w', encoding='utf-8') as f:
+                f.write(content)
+            os.replace(temporary, self.path)
+        except OSError as e:
+            print(f"Warning: could not write metrics to {self.path}: {e}")
+
+    def close(self):
+        """Stop the updates and write the final metrics."""
+        self.stopped.set()
+        self.thread.join()
+        self.export()
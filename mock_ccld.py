@@ -0,0 +1,312 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the CCLD facility search site.
+Serves the saved page sources (page_source.html, search_page_source.html,
+results_page_source.html and facility_detail.html) as the landing page, the search
+form, paginated results with a working 'Next »' control and one detail page per
+synthetic facility, with configurable latency, jitter and error rate, so crawls can
+be run and timed without touching the live site.
+
+    python mock_ccld.py --facilities 500 --latency 0.2
+    python scraper.py Roseville --base-url http://127.0.0.1:8800 --no-cache
+"""
+
+import argparse
+import random
+import re
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, quote, urlsplit
+
+from extraction import facility_id_from_url, parse_facility_html, parse_results_table
+
+HERE = Path(__file__).resolve().parent
+DEFAULT_PORT = 8800
+
+# Page sources cut down to what the scraper reads: no scripts (so nothing is fetched from
+# the live site or third-party hosts), stylesheets or <base> tags. ng-hide keeps hiding.
+STRIPPED_TAGS = [
+    re.compile(r'<script\b[^>]*>.*?</script>', re.IGNORECASE | re.DOTALL),
+    re.compile(r'<(?:link|base)\b[^>]*>', re.IGNORECASE),
+]
+HEAD_EXTRA = '<style>.ng-hide { display: none !important; }</style>'
+
+# The landing page's 'Elderly Assisted Living' button opens the search form
+LANDING_SCRIPT = """
+document.getElementById('fselectorElderlyAssistedLiving').onclick = function () {
+    location.href = '/carefacilitysearch/search';
+};
+"""
+
+# Enter in the city field runs the search
+SEARCH_SCRIPT = """
+var city = document.getElementById('city');
+city.addEventListener('keydown', function (event) {
+    if (event.key === 'Enter') {
+        event.preventDefault();
+        location.href = '/carefacilitysearch/results?city=' + encodeURIComponent(city.value) + '&page=1';
+    }
+});
+"""
+
+NEXT_CONTROL = '<li ng-class="{disabled: ctrl.currentPage == ctrl.pagedItems.length - 1}">'
+NEXT_BUTTON = '<span class="anchorlike" ng-click="ctrl.nextPage()">Next »</span>'
+
+
+def load_page(name, script=''):
+    """Read a saved page source and strip it down for serving."""
+    html = (HERE / name).read_text(encoding='utf-8')
+    for pattern in STRIPPED_TAGS:
+        html = pattern.sub('', html)
+    if script:
+        html = html.replace('</body>', f'<script>{script}</script></body>', 1)
+    return html.replace('</head>', HEAD_EXTRA + '</head>', 1)
+
+
+def substitute(html, old, new, page):
+    """Replace every occurrence of old, which the saved page must still contain."""
+    if old not in html:
+        raise ValueError(f"{page} no longer contains {old!r}")
+    return html.replace(old, new)
+
+
+class MockSite:
+    """The pages of the stand-in site for a number of synthetic facilities.
+
+    Every search, whatever the city, finds the same facilities.
+    """
+
+    def __init__(self, facilities=500, page_size=10):
+        self.facilities = facilities
+        self.page_size = page_size
+        self.landing = load_page('page_source.html', LANDING_SCRIPT)
+        # Nothing on the search form may look like results, or the search would seem done at once
+        search = load_page('search_page_source.html', SEARCH_SCRIPT)
+        self.search = search.replace('footable', 'resultstable').replace('FacDetail', 'Detail')
+        self.results_head, self.results_row, self.results_tail = self.results_template()
+        self.detail = self.detail_template()
+
+    def results_template(self):
+        """Split the results page into what comes before the rows, one row, and what follows."""
+        html = load_page('results_page_source.html')
+        body_start = html.index('<tbody>', html.index('footable')) + len('<tbody>')
+        body_end = html.index('</tbody>', body_start)
+        row_start = html.index('<tr', body_start)
+        row = html[row_start:html.index('</tr>', row_start) + len('</tr>')]
+        href, listing = parse_results_table(html)[0]
+        street, zip_code = listing['Address'].rsplit(', CA ', 1)
+        for old, new in [(href, '@@HREF@@'), (listing['Name'], '@@NAME@@'), (street, '@@STREET@@'),
+                         (f'>{zip_code}<', '>@@ZIP@@<'), (f">{listing['Status']}<", '>@@STATUS@@<')]:
+            row = substitute(row, old, new, 'results_page_source.html')
+        tail = html[body_end:]
+        tail = substitute(tail, NEXT_CONTROL, NEXT_CONTROL[:-1] + ' class="@@NEXT_CLASS@@">', 'results_page_source.html')
+        tail = substitute(tail, NEXT_BUTTON,
+                          '<span class="anchorlike" onclick="location.href=\'@@NEXT_URL@@\'">Next »</span>',
+                          'results_page_source.html')
+        return html[:body_start], row, tail
+
+    def detail_template(self):
+        """The detail page with placeholders for the values that differ between facilities."""
+        html = load_page('facility_detail.html')
+        facility_data = parse_facility_html(html)
+        street, city_zip = facility_data['Address'].split(', ', 1)
+        city, zip_code = city_zip.rsplit(', CA ', 1)
+        for old, new in [
+            (facility_data['Name'], '@@NAME@@'),
+            (f'>{street}<', '>@@STREET@@<'),
+            (f'{city},&nbsp;CA&nbsp;{zip_code}', '@@CITY@@,&nbsp;CA&nbsp;@@ZIP@@'),
+            (facility_data['Licensee Name'], '@@LICENSEE@@'),
+            (facility_data['Phone Number'], '@@PHONE@@'),
+            (f">{facility_data['Facility Capacity']} <", '>@@CAPACITY@@ <'),
+            (facility_data['Facility Number'], '@@NUMBER@@'),
+        ]:
+            html = substitute(html, old, new, 'facility_detail.html')
+        return html
+
+    def facility(self, index):
+        """The values of the index-th synthetic facility."""
+        return {
+            '@@NUMBER@@': str(300000000 + index),
+            '@@NAME@@': f'MOCK CARE HOME {index}',
+            '@@STREET@@': f'{100 + index} MAIN ST',
+            '@@CITY@@': 'ROSEVILLE',
+            '@@ZIP@@': str(95661 + index % 90),
+            '@@STATUS@@': 'Pending',
+            '@@LICENSEE@@': f'MOCK LICENSEE {index}',
+            '@@PHONE@@': f'(916) 555-{index % 10000:04d}',
+            '@@CAPACITY@@': str(6 + index % 94),
+        }
+
+    def results_page(self, city, page):
+        """The page-th (from 1) page of search results."""
+        first = (page - 1) * self.page_size
+        rows = []
+        for index in range(first, min(first + self.page_size, self.facilities)):
+            values = self.facility(index)
+            values['@@HREF@@'] = f"/FacDetail/{values['@@NUMBER@@']}"
+            rows.append(fill(self.results_row, values))
+        last_page = first + self.page_size >= self.facilities
+        tail = fill(self.results_tail, {
+            '@@NEXT_CLASS@@': 'disabled' if last_page else '',
+            '@@NEXT_URL@@': f'/carefacilitysearch/results?city={quote(city)}&page={page + 1}',
+        })
+        return self.results_head + ''.join(rows) + tail
+
+    def detail_page(self, facility_number):
+        """The detail page of a facility, or None if there is no such facility."""
+        index = int(facility_number) - 300000000
+        if not 0 <= index < self.facilities:
+            return None
+        return fill(self.detail, self.facility(index))
+
+
+def fill(template, values):
+    for placeholder, value in values.items():
+        template = template.replace(placeholder, value)
+    return template
+
+
+class MockCCLDServer(ThreadingHTTPServer):
+    """HTTP server for a MockSite.
+
+    Every page waits latency seconds, give or take up to jitter, before it is
+    sent, and error_rate is the share of detail pages answered with a 503.
+    The three may be changed while the server runs; stats counts the
+    responses by kind. capacity, if set, is how many pages the site works on
+    at once: further requests queue, so latency grows with the load like a
+    saturated server's.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, port=DEFAULT_PORT, facilities=500, page_size=10, latency=0.0, jitter=0.0,
+                 error_rate=0.0, seed=None, capacity=None):
+        self.site = MockSite(facilities, page_size)
+        self.workers = threading.BoundedSemaphore(capacity) if capacity else None
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.random = random.Random(seed)
+        self.stats = Counter()
+        self.lock = threading.Lock()
+        super().__init__(('127.0.0.1', port), MockCCLDHandler)
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def delay(self):
+        """Seconds the next response waits."""
+        with self.lock:
+            return max(0.0, self.latency + self.random.uniform(-self.jitter, self.jitter))
+
+    def inject_error(self):
+        with self.lock:
+            return self.random.random() < self.error_rate
+
+    def count(self, kind):
+        with self.lock:
+            self.stats[kind] += 1
+
+    def start(self):
+        """Serve on a background thread; returns the site's base URL."""
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self.base_url
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+class MockCCLDHandler(BaseHTTPRequestHandler):
+    """Routes a request to the landing page, search form, results or a detail page."""
+
+    protocol_version = 'HTTP/1.1'  # keep-alive
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        path = url.path.rstrip('/').lower()
+        site = self.server.site
+        facility_number = facility_id_from_url(url.path)
+        if facility_number:
+            kind = 'detail'
+            html = site.detail_page(facility_number)
+        elif path == '/carefacilitysearch':
+            kind, html = 'landing', site.landing
+        elif path == '/carefacilitysearch/search':
+            kind, html = 'search', site.search
+        elif path == '/carefacilitysearch/results':
+            query = parse_qs(url.query)
+            kind = 'results'
+            html = site.results_page(query.get('city', [''])[0], int(query.get('page', ['1'])[0]))
+        else:
+            # Images and other assets the saved pages refer to
+            self.server.count('not found')
+            self.send_page(404, 'Not found')
+            return
+
+        if self.server.workers:
+            with self.server.workers:
+                time.sleep(self.server.delay())
+        else:
+            time.sleep(self.server.delay())
+        if html is None:
+            self.server.count('not found')
+            self.send_page(404, 'No such facility')
+        elif kind == 'detail' and self.server.inject_error():
+            self.server.count('errors')
+            self.send_page(503, 'Service Unavailable')
+        else:
+            self.server.count(kind)
+            self.send_page(200, html)
+
+    def send_page(self, status, html):
+        body = html.encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def add_server_arguments(parser):
+    """Add the options that shape the stand-in site to an argument parser."""
+    parser.add_argument('--facilities', type=int, default=500, help='Facilities every search finds (default: 500)')
+    parser.add_argument('--page-size', type=int, default=10, help='Facilities per results page (default: 10)')
+    parser.add_argument('--latency', type=float, default=0.0, help='Seconds every page waits (default: 0)')
+    parser.add_argument('--jitter', type=float, default=0.0,
+                        help='Up to this many seconds are added to or taken from the latency (default: 0)')
+    parser.add_argument('--error-rate', type=float, default=0.0,
+                        help='Share of detail pages answered with a 503, e.g. 0.05 (default: 0)')
+    parser.add_argument('--seed', type=int, default=None, help='Seed of the jitter and errors')
+    parser.add_argument('--capacity', type=int, default=None,
+                        help='Pages the site serves at once; more requests queue (default: unlimited)')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve a local stand-in for the CCLD facility search site.')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help=f'Local port (default: {DEFAULT_PORT})')
+    add_server_arguments(parser)
+    args = parser.parse_args()
+
+    server = MockCCLDServer(args.port, args.facilities, args.page_size, args.latency, args.jitter,
+                            args.error_rate, args.seed, args.capacity)
+    print(f"Mock CCLD site with {args.facilities} facilities at {server.base_url}")
+    print(f"  python scraper.py Roseville --base-url {server.base_url} --no-cache")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nStopping mock site...")
+    finally:
+        server.server_close()
+        print(f"Responses: {dict(server.stats)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Replay of recorded scraping sessions.
+Drives the same ElderlyFacilityScraper flow - parsing, checkpoints, output sinks and the
+database - over the documents of a session recorded with --record, at full speed and
+without a browser or network, so extraction and performance can be reproduced exactly.
+"""
+
+import time
+
+from extraction import facility_id_from_url
+from scraper import ElderlyFacilityScraper
+from session_archive import SessionArchive
+
+
+class ReplayScraper(ElderlyFacilityScraper):
+    """Runs the scraper over a recorded session instead of the site.
+
+    Everything after loading a page - parsing, the parse pool, checkpoints,
+    output sinks and the database - runs as in the recorded crawl. Chrome is
+    never started, the rate limit and the cache are off, and the detail pages
+    are parsed as the browser path does whichever engine recorded them.
+    """
+
+    def __init__(self, city, replay_dir, output_dir=None, **kwargs):
+        self.archive = SessionArchive(replay_dir)
+        self.replayed_searches = {}
+        self.results_pages = []
+        self.page_number = 0
+        kwargs.update(engine='selenium', workers=1, rate=1e9, concurrency=None, use_cache=False,
+                      lean=False, driver=None)
+        super().__init__(city, output_dir, **kwargs)
+
+    def create_driver(self):
+        raise RuntimeError("A replay never starts a browser; every page comes from the archive")
+
+    def navigate_to_search(self):
+        self.log(f"Replaying the recorded session ({len(self.archive.entries)} documents)...")
+
+    def search_city(self):
+        """Pick the next recorded search for the city."""
+        self.log(f"Searching for facilities in {self.city}...")
+        searches = self.archive.searches(self.city)
+        if not searches:
+            self.log(f"Warning: the recording has no search for {self.city}")
+        count = self.replayed_searches.get(self.city, 0)
+        self.replayed_searches[self.city] = count + 1
+        self.results_pages = searches[min(count, len(searches) - 1)] if searches else []
+        self.page_number = 1
+
+    def current_results_page(self):
+        for entry in self.results_pages:
+            if entry['page'] == self.page_number:
+                return entry
+        return None
+
+    def results_page_source(self):
+        entry = self.current_results_page()
+        return self.archive.document(entry) if entry else ''
+
+    def facility_urls_on_page(self):
+        if self.listing_only or self.delta:
+            return super().facility_urls_on_page()
+        entry = self.current_results_page()
+        return list(entry['facility_urls']) if entry else []
+
+    def has_next_page(self):
+        return any(entry['page'] > self.page_number for entry in self.results_pages)
+
+    def go_to_next_page(self):
+        self.page_number += 1
+
+    def load_facility_page(self, facility_url, driver=None):
+        entry = self.archive.details.get(facility_id_from_url(facility_url))
+        if entry is None:
+            self.log(f"Warning: {facility_url} is not in the recording")
+            return None, None
+        return self.archive.document(entry), entry.get('history')
+
+    def run(self):
+        start = time.perf_counter()
+        super().run()
+        self.log(f"Replayed in {time.perf_counter() - start:.1f}s; "
+                 f"the recorded crawl took {self.archive.recorded_seconds:.1f}s")
+
+    def close(self):
+        super().close()
+        self.archive.close()
@@ -0,0 +1,272 @@
+"""
+Live results grid for the GUI.
+ResultStore keeps the scraped records column by column, with an index of the rows of
+each status and one of all rows in capacity order, both updated as records arrive.
+ResultView is the filtered and sorted list of rows the grid shows, built from those
+indexes and kept in order as records stream in, and VirtualGrid is a ttk.Treeview that
+only ever holds the rows on screen, so scrolling, sorting and filtering cost the same
+at 100 rows as at 100,000.
+"""
+
+import sys
+import tkinter as tk
+from array import array
+from bisect import bisect_left, bisect_right
+from tkinter import ttk
+
+GRID_COLUMNS = ('Facility Number', 'Name', 'Address', 'Phone Number', 'Status', 'Facility Capacity')
+COLUMN_WIDTHS = {'Facility Number': 90, 'Name': 200, 'Address': 240, 'Phone Number': 100,
+                 'Status': 80, 'Facility Capacity': 60}
+
+# Capacity of a record without one (listing-only runs); sorts first
+NO_CAPACITY = -1
+
+SORT_KEYS = (None, 'status', 'capacity')
+
+
+def capacity_of(record):
+    try:
+        return int(record.get('Facility Capacity') or NO_CAPACITY)
+    except ValueError:
+        return NO_CAPACITY
+
+
+class ResultStore:
+    """Records kept column by column, with the indexes the grid filters and sorts with."""
+
+    def __init__(self, columns=GRID_COLUMNS):
+        self.columns = columns
+        self.clear()
+
+    def clear(self):
+        self.values = {column: [] for column in self.columns}
+        self.statuses = self.values['Status']
+        self.capacities = array('l')
+        # Status -> its rows, in the order they were scraped
+        self.rows_by_status = {}
+        # Every row ordered by capacity (then by arrival), with the capacities alongside for bisect
+        self.capacity_rows = array('l')
+        self.capacity_keys = array('l')
+
+    def __len__(self):
+        return len(self.capacities)
+
+    def add(self, record):
+        """Append a record; returns its row number."""
+        row = len(self.capacities)
+        for column, values in self.values.items():
+            values.append(record.get(column) or '')
+        capacity = capacity_of(record)
+        self.capacities.append(capacity)
+        self.rows_by_status.setdefault(self.statuses[row], array('l')).append(row)
+        position = bisect_right(self.capacity_keys, capacity)
+        self.capacity_keys.insert(position, capacity)
+        self.capacity_rows.insert(position, row)
+        return row
+
+    def row_values(self, row):
+        return tuple(self.values[column][row] for column in self.columns)
+
+    def status_names(self):
+        return sorted(self.rows_by_status)
+
+
+class ResultView:
+    """The rows of a ResultStore that pass a filter, in display order.
+
+    status keeps one status only; min_capacity and max_capacity (inclusive)
+    drop records outside the range, including those without a capacity.
+    sort is None (the order scraped), 'status' or 'capacity'; rows with equal
+    keys stay in the order they arrived, and descending reverses the whole
+    order. Rows are kept ascending with their sort keys, so add() can place
+    a new row with a bisect instead of sorting again.
+    """
+
+    def __init__(self, store):
+        self.store = store
+        self.status = None
+        self.min_capacity = None
+        self.max_capacity = None
+        self.sort = None
+        self.descending = False
+        self.rebuild()
+
+    def __len__(self):
+        return len(self.rows)
+
+    def configure(self, **settings):
+        """Change the filter or sort (status, min_capacity, max_capacity, sort, descending)."""
+        for name, value in settings.items():
+            if not hasattr(self, name):
+                raise TypeError(f"{name!r} is not a view setting")
+            setattr(self, name, value)
+        if self.sort not in SORT_KEYS:
+            raise ValueError(f"Cannot sort by {self.sort!r}")
+        self.rebuild()
+
+    def filters_capacity(self):
+        return self.min_capacity is not None or self.max_capacity is not None
+
+    def matches(self, row):
+        store = self.store
+        if self.status is not None and store.statuses[row] != self.status:
+            return False
+        if self.filters_capacity():
+            lowest, highest = self.capacity_range()
+            return lowest <= store.capacities[row] <= highest
+        return True
+
+    def key(self, row):
+        if self.sort == 'capacity':
+            return self.store.capacities[row]
+        if self.sort == 'status':
+            return self.store.statuses[row]
+        return row
+
+    def capacity_range(self):
+        """The lowest and highest capacity kept; records without one fall below any range."""
+        lowest = max(self.min_capacity or 0, NO_CAPACITY + 1)
+        highest = sys.maxsize if self.max_capacity is None else self.max_capacity
+        return lowest, highest
+
+    def rebuild(self):
+        """Recompute the rows from the store's indexes."""
+        store = self.store
+        statuses, capacities = store.statuses, store.capacities
+        lowest, highest = self.capacity_range()
+        keys = None
+        if self.sort == 'capacity' or (self.status is None and self.sort is None and self.filters_capacity()):
+            # A capacity range is a slice of the capacity index
+            low, high = 0, len(store)
+            if self.filters_capacity():
+                low = bisect_left(store.capacity_keys, lowest)
+                high = bisect_right(store.capacity_keys, highest)
+            rows = store.capacity_rows[low:high]
+            if self.sort is None:
+                rows = array('l', sorted(rows))
+            elif self.status is None:
+                keys = list(store.capacity_keys[low:high])
+            else:
+                rows = array('l', [row for row in rows if statuses[row] == self.status])
+                keys = [capacities[row] for row in rows]
+        elif self.status is None and self.sort is None:
+            rows = array('l', range(len(store)))
+        else:
+            if self.status is not None:
+                groups = [store.rows_by_status.get(self.status, array('l'))]
+            else:
+                groups = [store.rows_by_status[status] for status in store.status_names()]
+            rows = array('l')
+            keys = [] if self.sort == 'status' else None
+            for group in groups:
+                if self.filters_capacity():
+                    group = [row for row in group if lowest <= capacities[row] <= highest]
+                rows.extend(group)
+                if keys is not None and len(group):
+                    keys.extend([statuses[group[0]]] * len(group))
+        self.rows = rows
+        self.keys = keys
+
+    def add(self, row):
+        """Place a row just added to the store, if it passes the filter."""
+        if not self.matches(row):
+            return
+        if self.sort is None:
+            self.rows.append(row)
+            return
+        key = self.key(row)
+        position = bisect_right(self.keys, key)
+        self.keys.insert(position, key)
+        self.rows.insert(position, row)
+
+    def row_at(self, index):
+        """The store row shown at position index."""
+        return self.rows[len(self.rows) - 1 - index if self.descending else index]
+
+
+class VirtualGrid(ttk.Frame):
+    """A Treeview over a ResultView that holds one item per visible line.
+
+    Scrolling only rewrites the values of those items, so the cost of a
+    redraw does not depend on the number of rows. A click on a column
+    heading calls on_sort with its sort key ('status', 'capacity', or None for
+    the columns that only sort in the order scraped).
+    """
+
+    SORTABLE = {'Status': 'status', 'Facility Capacity': 'capacity'}
+
+    def __init__(self, parent, view, on_sort=None, height=12):
+        super().__init__(parent)
+        self.view = view
+        self.on_sort = on_sort
+        self.offset = 0
+        self.tree = ttk.Treeview(self, columns=view.store.columns, show='headings', height=height,
+                                 selectmode='none')
+        self.scrollbar = ttk.Scrollbar(self, orient=tk.VERTICAL, command=self.scroll)
+        for column in view.store.columns:
+            self.tree.heading(column, text=column, command=lambda column=column: self.heading_clicked(column))
+            self.tree.column(column, width=COLUMN_WIDTHS.get(column, 100), stretch=True)
+        self.tree.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+        self.scrollbar.grid(row=0, column=1, sticky=(tk.N, tk.S))
+        self.columnconfigure(0, weight=1)
+        self.rowconfigure(0, weight=1)
+
+        self.items = []
+        self.resize_items(height)
+        self.tree.bind('<Configure>', self.fit_to_height)
+        self.tree.bind('<MouseWheel>', lambda event: self.scroll('scroll', -3 if event.delta > 0 else 3, 'units'))
+        self.tree.bind('<Button-4>', lambda event: self.scroll('scroll', -3, 'units'))
+        self.tree.bind('<Button-5>', lambda event: self.scroll('scroll', 3, 'units'))
+
+    def heading_clicked(self, column):
+        if self.on_sort:
+            self.on_sort(self.SORTABLE.get(column))
+
+    def resize_items(self, count):
+        """Keep exactly count items in the tree."""
+        while len(self.items) < count:
+            self.items.append(self.tree.insert('', tk.END, values=()))
+        while len(self.items) > count:
+            self.tree.delete(self.items.pop())
+
+    def fit_to_height(self, event=None):
+        """Show as many lines as fit in the tree's current height."""
+        box = self.tree.bbox(self.items[0]) if self.items else None
+        if not box:
+            return
+        heading, line = box[1], box[3]
+        count = max(1, (self.tree.winfo_height() - heading) // max(line, 1))
+        if count != len(self.items):
+            self.resize_items(count)
+            self.refresh()
+
+    def scroll(self, action, amount, unit=None):
+        """Scrollbar and mouse wheel command: ('moveto', fraction) or ('scroll', n, 'units'|'pages')."""
+        page = len(self.items)
+        if action == 'moveto':
+            self.offset = int(float(amount) * len(self.view))
+        elif action == 'scroll':
+            self.offset += int(amount) * (page if unit == 'pages' else 1)
+        self.refresh()
+
+    def refresh(self):
+        """Write the visible rows into the items."""
+        view = self.view
+        page = len(self.items)
+        self.offset = max(0, min(self.offset, len(view) - page))
+        for index, item in enumerate(self.items):
+            position = self.offset + index
+            values = view.store.row_values(view.row_at(position)) if position < len(view) else ()
+            self.tree.item(item, values=values)
+        if len(view):
+            self.scrollbar.set(self.offset / len(view), min(1.0, (self.offset + page) / len(view)))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+    def show_sort(self):
+        """Mark the sorted column's heading with an arrow."""
+        for column in self.view.store.columns:
+            text = column
+            if self.view.sort and self.SORTABLE.get(column) == self.view.sort:
+                text += ' ▼' if self.view.descending else ' ▲'
+            self.tree.heading(column, text=text)
@@ -5,31 +5,278 @@ Scrapes elderly care facility information from the California Community Care Lic
 """
 
 import sys
-import csv
 import time
-import re
 import argparse
+import json
 import os
 import shutil
-from selenium import webdriver
+import threading
+import multiprocessing
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
-from webdriver_manager.chrome import ChromeDriverManager
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
+
+from extraction import (FIELDNAMES, FacilityRecord, detail_only_columns, empty_facility_record,
+                        facility_id_from_url, normalize_facility_url, parse_facility_html, parse_results_table,
+                        timed_parse_facility_html)
+from http_fetcher import DetailFetchError, HttpDetailFetcher, format_latency_report
+from driver_pool import DriverPool
+from rate_limit import HostRateLimiter
+from fetch_cache import FacilityCache
+from lean_profile import LeanProfile
+from metrics import Metrics, MetricsExporter
+from checkpoint import CheckpointJournal
+from delta import merge_listing, plan_delta, summarize_plan
+from facility_store import FacilityStore
+from history import HISTORY_SCRIPT, HISTORY_TABLES, history_filename, history_rows
+from sinks import SINKS, open_sink
+from batch import BatchScraper, read_cities_file
+from waits import PageWaits, angular_idle, detail_rendered, first_facility_href, results_changed, results_ready
+
+
+# Where the chromedriver (and Chrome) that Selenium Manager resolved is remembered between runs
+CHROMEDRIVER_CACHE = os.path.join(
+    os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache'),
+    'elderly-facility-scraper', 'chromedriver.json'
+)
+
+
+def cached_chromedriver_paths():
+    """Return the (chromedriver, Chrome) paths resolved by an earlier launch, or None if they are gone."""
+    try:
+        with open(CHROMEDRIVER_CACHE, encoding='utf-8') as f:
+            paths = json.load(f)
+        driver_path, browser_path = paths['driver'], paths['browser']
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+    if not os.access(driver_path, os.X_OK) or (browser_path and not os.path.exists(browser_path)):
+        return None
+    return driver_path, browser_path
+
+
+def remember_chromedriver_paths(driver_path, browser_path):
+    """Save the paths Selenium Manager resolved so later launches can skip it."""
+    try:
+        os.makedirs(os.path.dirname(CHROMEDRIVER_CACHE), exist_ok=True)
+        with open(CHROMEDRIVER_CACHE, 'w', encoding='utf-8') as f:
+            json.dump({'driver': driver_path, 'browser': browser_path}, f)
+    except OSError:
+        pass  # Only costs the lookup on the next launch
+
+
+def forget_chromedriver_paths():
+    """Drop the remembered paths, e.g. once Chrome has been updated past the cached driver."""
+    try:
+        os.remove(CHROMEDRIVER_CACHE)
+    except OSError:
+        pass
+
+
+def create_chrome_driver(lean=None, network_log=False):
+    """Launch a headless Chrome WebDriver.
+    
+    lean is a LeanProfile whose blocking applies to the first tab; network_log
+    keeps Chrome's network events for driver.get_log('performance').
+    """
+    # Selenium's WebDriver modules take a noticeable part of a second to import,
+    # so they are only loaded once a browser is actually needed
+    from selenium import webdriver
+    from selenium.common.exceptions import WebDriverException
+    from selenium.webdriver.chrome.options import Options
+    from selenium.webdriver.chrome.service import Service
+    
+    # Setup Chrome options
+    chrome_options = Options()
+    chrome_options.add_argument("--headless")  # Run in headless mode
+    chrome_options.add_argument("--no-sandbox")
+    chrome_options.add_argument("--disable-dev-shm-usage")
+    chrome_options.add_argument("--disable-gpu")
+    chrome_options.add_argument("--window-size=1920,1080")
+    if lean:
+        lean.configure(chrome_options)
+    if network_log:
+        chrome_options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+    
+    # Initialize the driver
+    # Check if running as a bundled app (PyInstaller creates a temp folder and stores path in _MEIPASS)
+    selenium_manager = not (getattr(sys, 'frozen', False) and hasattr(sys, '_MEIPASS'))
+    cached = None
+    if not selenium_manager:
+        # Look for bundled chromedriver
+        bundled_chromedriver = os.path.join(sys._MEIPASS, 'chromedriver')
+        if os.path.exists(bundled_chromedriver):
+            service = Service(bundled_chromedriver)
+        else:
+            # Fallback to system chromedriver
+            chromedriver_path = shutil.which('chromedriver')
+            if chromedriver_path:
+                service = Service(chromedriver_path)
+            else:
+                raise RuntimeError(
+                    "ChromeDriver not found. Please install it:\n"
+                    "  brew install chromedriver"
+                )
+    else:
+        # Let Selenium Manager find (or download) chromedriver - once: the paths it
+        # resolves are cached, since looking them up runs a helper on every launch
+        cached = cached_chromedriver_paths()
+        if cached:
+            driver_path, browser_path = cached
+            service = Service(driver_path)
+            if browser_path:
+                chrome_options.binary_location = browser_path
+        else:
+            service = Service()
+    
+    try:
+        driver = webdriver.Chrome(service=service, options=chrome_options)
+    except WebDriverException:
+        if not cached:
+            raise
+        # Chrome was probably updated past the cached chromedriver; resolve both again
+        forget_chromedriver_paths()
+        cached = None
+        chrome_options.binary_location = ''
+        service = Service()
+        driver = webdriver.Chrome(service=service, options=chrome_options)
+    if selenium_manager and not cached:
+        remember_chromedriver_paths(service.path, chrome_options.binary_location)
+    if lean:
+        lean.apply(driver)
+    return driver
+
+
+def open_search_form(driver, base_url, waits, log=print):
+    """Load the search page and open the Elderly Assisted Living search form.
+    
+    waits is the PageWaits of driver.
+    """
+    from selenium.webdriver.support import expected_conditions as EC
+    
+    log(f"Navigating to {base_url}...")
+    driver.get(base_url + "/carefacilitysearch")
+    
+    # Wait for Angular to load - wait for buttons to be present
+    log("Waiting for page to load...")
+    waits.until('angular idle', angular_idle)
+    
+    # Click on "Elderly Assisted Living" button
+    log("Clicking on 'Elderly Assisted Living' button...")
+    try:
+        elderly_button = waits.until(
+            'facility types', EC.element_to_be_clickable((By.ID, "fselectorElderlyAssistedLiving"))
+        )
+        elderly_button.click()
+    except TimeoutException:
+        log("Could not find 'Elderly Assisted Living' button by ID. Trying button text...")
+        elderly_button = waits.until(
+            'facility types',
+            EC.element_to_be_clickable((By.XPATH, "//button[contains(text(), 'Elderly Assisted Living')]"))
+        )
+        elderly_button.click()
+    
+    # Wait for the search form
+    waits.until('search form', EC.visibility_of_element_located((By.ID, "city")))
+
+
+def completed_future(result):
+    """Return a Future that already holds result."""
+    future = Future()
+    future.set_result(result)
+    return future
 
 
 class ElderlyFacilityScraper:
     """Scraper for elderly care facilities in California."""
     
-    def __init__(self, city, output_dir=None):
-        """Initialize the scraper with a city name and optional output directory."""
-        self.city = city
-        self.base_url = "https://www.ccld.dss.ca.gov"
+    DEFAULT_BASE_URL = "https://www.ccld.dss.ca.gov"
+    
+    # Facilities written (and upserted) at a time by a delta crawl
+    DELTA_BATCH_SIZE = 50
+    
+    def __init__(self, city, output_dir=None, engine='selenium', base_url=None, workers=1,
+                 rate=1.0, concurrency=None, use_cache=True, cache_ttl_hours=168, cache_max_mb=256,
+                 resume=False, listing_only=False, enrich=False, parse_workers=2, output_format='csv',
+                 db_path=None, delta=False, stale_after_hours=720, keep_facilities=False,
+                 lean=False, lean_allow=(), driver=None, record_dir=None, profile=False,
+                 metrics_path=None, metrics_interval=5.0, events=None, adaptive=False, min_concurrency=1):
+        """Initialize the scraper with a city name and optional output directory.
+        
+        engine selects how facility detail pages are fetched: 'selenium' renders
+        every page in Chrome, 'http' downloads the HTML directly and falls back to
+        Chrome only when the static response lacks the facility fields.
+        workers > 1 spreads the detail pages of each results page across that
+        many extra headless Chrome instances.
+        rate is the request budget per second shared by everything that hits the
+        site, and concurrency caps the detail fetches in flight at once (default:
+        the number of workers, or 4 with the http engine).
+        use_cache keeps extracted detail records in a cache file in the output
+        directory; entries older than cache_ttl_hours are fetched again and the
+        least recently used ones are evicted beyond cache_max_mb.
+        resume continues an interrupted crawl of the same city from its
+        checkpoint journal, appending to the existing CSV.
+        listing_only takes each facility's name, address and status from the
+        results table without visiting detail pages; with enrich, detail pages
+        are still fetched to fill in the columns the table lacks.
+        parse_workers is the number of processes that extract fields from the
+        page source of Chrome-rendered detail pages (0 parses in the thread
+        that drove the browser).
+        output_format picks the sink the records are written to: 'csv',
+        'csv.gz', 'csv.zst' or 'parquet' (which cannot be resumed).
+        db_path additionally upserts every record into a SQLite database that
+        tracks crawl runs and what each run changed.
+        delta (which needs db_path) reads the whole results listing first and
+        fetches detail pages only for facilities that are new, changed in the
+        listing, missing from the last crawl, stored without their details or
+        whose details are older than stale_after_hours, stalest first; the rest
+        are written from the database.
+        keep_facilities also keeps every record in self.facilities; by default
+        records are only streamed (see iter_facilities()) and counted in
+        self.facility_count, so memory does not grow with the crawl.
+        lean makes Chrome skip images, fonts, stylesheets and hosts other than
+        the site; lean_allow keeps some of those (see LeanProfile).
+        driver is a running browser to use instead of launching one (the
+        daemon's warm sessions); close() leaves it open.
+        record_dir keeps every document loaded (search form, results and
+        detail pages) in a session archive there, for replay.py; the cache is
+        not used, so that every page is loaded and recorded.
+        self.metrics times every phase of the crawl; profile prints the
+        summary at the end of run(), and metrics_path is a file rewritten
+        every metrics_interval seconds with them, in JSON if it ends in .json
+        and in the Prometheus text format otherwise.
+        events is a queue that receives the crawl's progress instead of the
+        console: {'log': message} for each line of output, {'progress':
+        message} when the crawl moves to another stage and {'facility':
+        record} for every record, so a GUI can drain it on its own thread.
+        stop() (from any thread) ends run() early, keeping what was saved.
+        adaptive turns concurrency into an upper bound: an AdaptiveConcurrency
+        controller moves the detail fetches in flight between min_concurrency
+        and it, following the detail latency, timeouts and error responses.
+        """
+        self.base_url = (base_url or self.DEFAULT_BASE_URL).rstrip('/')
+        self.engine = engine
+        self.events = events
+        self.stop_requested = threading.Event()
+        self.metrics = Metrics()
+        self.profile = profile
+        self.metrics_exporter = MetricsExporter(self.metrics, metrics_path, metrics_interval) if metrics_path else None
         self.facilities = []
+        self.facility_count = 0
+        self.keep_facilities = keep_facilities
+        self.detail_latencies = {'http': [], 'selenium': []}
+        self.recorder = None
+        if record_dir:
+            from session_archive import SessionRecorder
+            self.recorder = SessionRecorder(record_dir)
+            use_cache = False
+        self.http_fetcher = None
+        if engine == 'http':
+            # One pooled connection per detail fetch in flight
+            self.http_fetcher = HttpDetailFetcher(pool_size=max(4, concurrency or 0), recorder=self.recorder,
+                                                  on_error=lambda url: self.report_detail_outcome(failure='error'),
+                                                  log=self.log)
         self.scraping_completed = False
         self.output_dir = output_dir or os.getcwd()
         
@@ -37,78 +284,122 @@ class ElderlyFacilityScraper:
         if self.output_dir and not os.path.exists(self.output_dir):
             os.makedirs(self.output_dir)
         
-        filename = f"{self.city.lower().replace(' ', '-')}-elderly-facilities.csv"
-        self.filename = os.path.join(self.output_dir, filename)
+        self.cache = FacilityCache(self.output_dir, cache_ttl_hours, cache_max_mb) if use_cache else None
         
-        # Setup Chrome options
-        chrome_options = Options()
-        chrome_options.add_argument("--headless")  # Run in headless mode
-        chrome_options.add_argument("--no-sandbox")
-        chrome_options.add_argument("--disable-dev-shm-usage")
-        chrome_options.add_argument("--disable-gpu")
-        chrome_options.add_argument("--window-size=1920,1080")
-        
-        # Initialize the driver
-        # Check if running as a frozen app (PyInstaller)
-        if getattr(sys, 'frozen', False):
-            # Running as bundled app - look for bundled chromedriver
-            if hasattr(sys, '_MEIPASS'):
-                # PyInstaller creates a temp folder and stores path in _MEIPASS
-                bundled_chromedriver = os.path.join(sys._MEIPASS, 'chromedriver')
-                if os.path.exists(bundled_chromedriver):
-                    service = Service(bundled_chromedriver)
-                else:
-                    # Fallback to system chromedriver
-                    chromedriver_path = shutil.which('chromedriver')
-                    if chromedriver_path:
-                        service = Service(chromedriver_path)
-                    else:
-                        raise RuntimeError(
-                            "ChromeDriver not found. Please install it:\n"
-                            "  brew install chromedriver"
-                        )
-            else:
-                service = Service()  # Let Selenium Manager handle it
+        if resume and output_format == 'parquet':
+            raise ValueError("Parquet output cannot be resumed; use a CSV format with resume")
+        self.output_format = output_format
+        self.sinks = {}
+        if delta and not db_path:
+            raise ValueError("A delta crawl needs the database of previous runs (db_path)")
+        self.store = FacilityStore(db_path) if db_path else None
+        self.delta = delta
+        self.stale_after_hours = stale_after_hours
+        self.store_run = None
+        self.resume = resume
+        self.listing_only = listing_only or enrich
+        self.enrich = enrich
+        self.set_city(city)
+        
+        self.lean = LeanProfile(self.base_url, lean_allow) if lean else None
+        if self.lean:
+            self.log(self.lean.describe())
+        self.owns_driver = driver is None
+        # Chrome is launched on first use of self.driver, so a scraper that never
+        # reaches the site (or only writes from the cache) never starts one
+        self._driver = driver
+        # Set when the browser is handed over already on the search form
+        self.search_form_ready = False
+        self.waits = PageWaits(driver)
+        
+        # Tabs on the primary driver must not be opened from several threads at once
+        self.driver_lock = threading.Lock()
+        
+        # Extra drivers that fetch detail pages while self.driver stays on the results page;
+        # they too are launched when the first detail page is fetched
+        self.driver_pool = DriverPool(workers, self.create_driver) if workers > 1 else None
+        
+        # Detail HTML is parsed in other processes while the browser moves on
+        self.parse_pool = ProcessPoolExecutor(parse_workers) if parse_workers > 0 else None
+        
+        # Politeness: one token bucket per host, shared by every fetch
+        self.rate_limiter = HostRateLimiter(rate)
+        if concurrency is None:
+            concurrency = 4 if engine == 'http' else workers
+        if self.driver_pool or self.http_fetcher:
+            concurrency = max(1, concurrency)
         else:
-            # Running as script - let Selenium Manager auto-download
-            service = Service()
+            concurrency = 1  # a single browser can only load one page at a time
+        self.detail_engine = None
+        self.concurrency_controller = None
+        if concurrency > 1:
+            from async_engine import AsyncDetailEngine
+            if adaptive:
+                from concurrency import AdaptiveConcurrency
+                self.concurrency_controller = AdaptiveConcurrency(min(min_concurrency, concurrency), concurrency,
+                                                                  log=self.log)
+            self.detail_engine = AsyncDetailEngine(self.download_facility_details, self.rate_limiter, concurrency,
+                                                   self.concurrency_controller)
+    
+    @property
+    def driver(self):
+        """The browser that runs the search, launched on first use."""
+        if self._driver is None:
+            self._driver = self.create_driver()
+            self.waits.driver = self._driver
+        return self._driver
+    
+    def create_driver(self):
+        """Launch a browser for the search or for detail pages."""
+        with self.metrics.span('chrome_startup'):
+            return create_chrome_driver(self.lean)
+    
+    def set_city(self, city):
+        """Point the scraper (and its output file and checkpoint) at a city."""
+        self.close_sinks()
+        self.store_run = None
+        self.city = city
+        filename = f"{self.city.lower().replace(' ', '-')}-elderly-facilities{SINKS[self.output_format].extension}"
+        self.filename = os.path.join(self.output_dir, filename)
+        
+        # Checkpointing: which pages/facilities are safely in the CSV
+        self.journal = CheckpointJournal(self.filename)
+        self.csv_started = False
+        self.page_facility_ids = []
+        self.skipped_on_page = 0
         
-        self.driver = webdriver.Chrome(service=service, options=chrome_options)
-        self.wait = WebDriverWait(self.driver, 10)
+        # Listing and delta modes: facility URL -> record read from the results table
+        self.listings = {}
+        # Facility numbers whose detail page was downloaded in this crawl (not cache hits)
+        self.detail_ids = set()
+        self.results_page_number = 1
+        self.results_load_seconds = 0.0
+        self.last_facility_at = time.perf_counter()
     
     def navigate_to_search(self):
         """Navigate to the elderly assisted living search page."""
-        print(f"Navigating to {self.base_url}...")
-        self.driver.get(self.base_url + "/carefacilitysearch")
-        
-        # Wait for Angular to load - wait for buttons to be present
-        print("Waiting for page to load...")
-        time.sleep(5)
-        
-        # Click on "Elderly Assisted Living" button
-        print("Clicking on 'Elderly Assisted Living' button...")
-        try:
-            elderly_button = self.wait.until(
-                EC.element_to_be_clickable((By.ID, "fselectorElderlyAssistedLiving"))
-            )
-            elderly_button.click()
-        except TimeoutException:
-            print("Could not find 'Elderly Assisted Living' button by ID. Trying button text...")
-            elderly_button = self.wait.until(
-                EC.element_to_be_clickable((By.XPATH, "//button[contains(text(), 'Elderly Assisted Living')]"))
-            )
-            elderly_button.click()
-        
-        time.sleep(3)  # Wait for page to load
+        self.report_progress("Loading website...")
+        if self.search_form_ready:
+            # A warm browser from the daemon is already on the form
+            self.search_form_ready = False
+            return
+        start = time.perf_counter()
+        open_search_form(self.driver, self.base_url, self.waits, self.log)
+        self.metrics.observe('navigate_to_search', time.perf_counter() - start)
+        if self.recorder:
+            self.recorder.record('search', self.driver.current_url, self.driver.page_source,
+                                 time.perf_counter() - start)
     
     def search_city(self):
         """Enter the city name and submit the search."""
-        print(f"Searching for facilities in {self.city}...")
+        from selenium.webdriver.support import expected_conditions as EC
+        
+        self.log(f"Searching for facilities in {self.city}...")
+        self.report_progress(f"Searching for {self.city}...")
+        start = time.perf_counter()
         
         # Find the city input field by ID
-        city_input = self.wait.until(
-            EC.presence_of_element_located((By.ID, "city"))
-        )
+        city_input = self.waits.until('search form', EC.presence_of_element_located((By.ID, "city")))
         
         # Clear and enter city name
         city_input.clear()
@@ -117,97 +408,269 @@ class ElderlyFacilityScraper:
         # Press Enter
         city_input.send_keys(Keys.RETURN)
         
-        time.sleep(5)  # Wait for results to load
+        # Wait for results to load
+        try:
+            self.waits.until('results', results_ready)
+        except TimeoutException:
+            self.log("Warning: Timed out waiting for search results")
+        # Which results page the browser shows and how long it took to load, for the recorder
+        self.results_page_number = 1
+        self.results_load_seconds = time.perf_counter() - start
+        self.metrics.observe('search', self.results_load_seconds)
+    
+    def scrape_facility_details(self, facility_url, driver=None):
+        """Scrape details from a single facility page, using the cache when it is fresh.
+        
+        driver is a pool driver dedicated to detail pages; by default the page
+        is opened in a new tab of the primary driver.
+        """
+        facility_data = self.cached_facility_details(facility_url)
+        if facility_data:
+            self.log(f"Using cached details: {facility_data['Name']}")
+            return facility_data
+        return self.download_facility_details(facility_url, driver)
+    
+    def cached_facility_details(self, facility_url):
+        """Return the cached record for a facility, or None.
+        
+        Records cached before a column was added to the field registry are
+        treated as missing so they are fetched again.
+        """
+        if not self.cache:
+            return None
+        facility_data = self.cache.get(facility_id_from_url(facility_url))
+        if facility_data is None or any(field not in facility_data for field in FIELDNAMES):
+            return None
+        self.metrics.count('cache_hits')
+        return FacilityRecord.from_dict(facility_data)
     
-    def scrape_facility_details(self, facility_url):
-        """Scrape details from a single facility page."""
-        # Fix relative URLs - ensure they have the full path
-        if facility_url.startswith('/FacDetail'):
-            facility_url = f"{self.base_url}/carefacilitysearch{facility_url}"
-        elif '/FacDetail/' in facility_url and '/carefacilitysearch/' not in facility_url:
-            # Fix URLs that are missing /carefacilitysearch/
-            facility_url = facility_url.replace('/FacDetail/', '/carefacilitysearch/FacDetail/')
+    def download_facility_details(self, facility_url, driver=None):
+        """Fetch a facility page from the site and store the result in the cache."""
+        return self.finish_download(facility_url, self.start_download(facility_url, driver))
+    
+    def start_download(self, facility_url, driver=None):
+        """Start fetching a facility page and return a Future of its record.
+        
+        Pages rendered in Chrome are parsed in the parse pool, so the calling
+        thread is free for the next page as soon as the page source is read.
+        """
+        facility_url = normalize_facility_url(facility_url, self.base_url)
         
-        print(f"Scraping facility: {facility_url}")
+        self.log(f"Scraping facility: {facility_url}")
         
-        # Open facility page in a new window
-        self.driver.execute_script("window.open('');")
-        self.driver.switch_to.window(self.driver.window_handles[-1])
-        self.driver.get(facility_url)
+        if self.http_fetcher:
+            start = time.perf_counter()
+            try:
+                facility_data = self.http_fetcher.fetch_facility(facility_url)
+            except DetailFetchError:
+                # Already reported to the concurrency controller; a browser would only load the site again
+                self.metrics.count('detail_failures')
+                return completed_future(empty_facility_record())
+            seconds = time.perf_counter() - start
+            self.detail_latencies['http'].append(seconds)
+            # Includes the extraction, which the fetcher does itself
+            self.metrics.observe('detail_http', seconds)
+            if facility_data:
+                self.report_detail_outcome(seconds)
+                return completed_future(facility_data)
+            self.metrics.count('browser_fallbacks')
+            self.log("Static HTML lacks facility fields, falling back to browser...")
+        
+        start = time.perf_counter()
+        if driver is not None:
+            page_source, history = self.load_facility_page(facility_url, driver)
+        elif self.driver_pool:
+            page_source, history = self.driver_pool.run(self.load_facility_page, facility_url)
+        else:
+            with self.driver_lock:
+                page_source, history = self.load_facility_page(facility_url)
+        seconds = time.perf_counter() - start
+        self.detail_latencies['selenium'].append(seconds)
+        self.metrics.observe('detail_load', seconds)
+        if self.recorder and page_source is not None:
+            self.recorder.record('detail', facility_url, page_source, seconds, engine='selenium', history=history)
         
-        # Wait for page to load - wait for body content
+        if page_source is None:
+            self.metrics.count('detail_failures')
+            return completed_future(empty_facility_record())
+        return self.parse_detail(page_source, history)
+    
+    def parse_detail(self, page_source, history):
+        """Extract a rendered detail page, in the parse pool if there is one; returns a Future of its record."""
+        if not self.parse_pool:
+            facility_data, seconds = timed_parse_facility_html(page_source, history)
+            self.metrics.observe('extract', seconds)
+            return completed_future(facility_data)
+        parsed = Future()
+        
+        def extracted(future):
+            try:
+                facility_data, seconds = future.result()
+            except Exception as e:
+                parsed.set_exception(e)
+                return
+            self.metrics.observe('extract', seconds)
+            parsed.set_result(facility_data)
+        
+        self.parse_pool.submit(timed_parse_facility_html, page_source, history).add_done_callback(extracted)
+        return parsed
+    
+    def finish_download(self, facility_url, future):
+        """Wait for a download started by start_download(), cache its record and note it as fetched."""
         try:
-            self.wait.until(EC.presence_of_element_located((By.TAG_NAME, "body")))
-            time.sleep(3)  # Additional wait for Angular/dynamic content
+            facility_data = future.result()
+        except Exception as e:
+            self.log(f"Error parsing facility details: {e}")
+            self.metrics.count('detail_failures')
+            facility_data = empty_facility_record()
+        if not facility_data['Name']:
+            self.log(f"Debug: Could not find name for {facility_url}")
+            return facility_data
+        facility_id = facility_id_from_url(facility_url)
+        self.detail_ids.add(facility_id)
+        if self.cache:
+            self.cache.put(facility_id, facility_data)
+        return facility_data
+    
+    def scrape_facility_details_browser(self, facility_url, driver=None):
+        """Scrape details from a single facility page rendered in Chrome."""
+        page_source, history = self.load_facility_page(facility_url, driver)
+        if page_source is None:
+            return empty_facility_record()
+        return parse_facility_html(page_source, history)
+    
+    def load_facility_page(self, facility_url, driver=None):
+        """Render a facility page in Chrome.
+        
+        Returns its page source (None on failure) and the raw visit, complaint
+        and citation history held by the page's controller (None if unavailable).
+        """
+        use_tab = driver is None
+        if use_tab:
+            # Open facility page in a new window
+            driver = self.driver
+            driver.execute_script("window.open('');")
+            driver.switch_to.window(driver.window_handles[-1])
+            if self.lean:
+                self.lean.apply(driver)
+        start = time.perf_counter()
+        driver.get(facility_url)
+        
+        # Wait for Angular to render the facility name and Status: block
+        timed_out = False
+        try:
+            self.waits.until('detail page', detail_rendered, driver=driver)
         except TimeoutException:
-            print("Warning: Page load timeout")
-            time.sleep(2)
+            self.log("Warning: Page load timeout")
+            timed_out = True
+        seconds = time.perf_counter() - start
         
-        facility_data = {
-            'Name': '',
-            'Status': '',
-            'Address': '',
-            'Phone Number': '',
-            'Facility Capacity': ''
-        }
+        page_source = None
+        history = None
         
         try:
-            # Get the body text which contains all facility details
-            body_text = self.driver.find_element(By.TAG_NAME, "body").text
-            
-            # Debug: Log if body is too short
-            if len(body_text) < 100:
-                print(f"Warning: Page body too short ({len(body_text)} chars), may not have loaded properly")
-                print(f"Body preview: {body_text[:200]}")
-            
-            # Extract facility name (first line after "Facility Detail")
-            name_match = re.search(r'Facility Detail\s+([^\n]+?)\s+Status:', body_text, re.DOTALL)
-            if name_match:
-                facility_data['Name'] = name_match.group(1).strip()
-            else:
-                print(f"Debug: Could not find name. Body preview: {body_text[:300]}")
-            
-            # Extract status
-            status_match = re.search(r'Status:\s*([^\n]+)', body_text)
-            if status_match:
-                facility_data['Status'] = status_match.group(1).strip()
-            
-            # Extract address (lines between "Address:" and "Licensee Name:")
-            address_match = re.search(r'Address:\s*\n([^\n]+)\n([^\n]+)', body_text)
-            if address_match:
-                # Get the street and city/state/zip lines
-                street = address_match.group(1).strip()
-                city_state_zip = address_match.group(2).strip()
-                facility_data['Address'] = f"{street}, {city_state_zip}"
-            
-            # Extract phone number
-            phone_match = re.search(r'Phone:\s*([^\n]+)', body_text)
-            if phone_match:
-                facility_data['Phone Number'] = phone_match.group(1).strip()
-            
-            # Extract capacity
-            capacity_match = re.search(r'Facility Capacity:\s*(\d+)', body_text)
-            if capacity_match:
-                facility_data['Facility Capacity'] = capacity_match.group(1).strip()
+            # One round trip for the whole DOM; the text is extracted off the browser thread
+            page_source = driver.page_source
+            # The history tabs' data is already loaded with the page
+            history = driver.execute_script(HISTORY_SCRIPT)
         
         except Exception as e:
-            print(f"Error scraping facility details: {e}")
+            self.log(f"Error scraping facility details: {e}")
             import traceback
-            traceback.print_exc()
+            self.log(traceback.format_exc())
         
-        # Close the facility tab and return to results page
-        self.driver.close()
-        self.driver.switch_to.window(self.driver.window_handles[0])
+        if timed_out:
+            self.report_detail_outcome(failure='timeout')
+        elif page_source is None:
+            self.report_detail_outcome(failure='error')
+        else:
+            self.report_detail_outcome(seconds)
         
-        return facility_data
+        if use_tab:
+            # Close the facility tab and return to results page
+            driver.close()
+            driver.switch_to.window(driver.window_handles[0])
+        
+        return page_source, history
     
-    def scrape_results_page(self):
-        """Scrape all facilities from the current results page."""
-        print("Scraping facilities from current page...")
+    def report_detail_outcome(self, seconds=None, failure=None):
+        """Feed a detail fetch to the concurrency controller: its latency, or 'timeout' or 'error'."""
+        if failure:
+            self.metrics.count(f'detail_{failure}s')
+        if not self.concurrency_controller:
+            return
+        if failure:
+            self.concurrency_controller.failure(failure)
+        else:
+            self.concurrency_controller.success(seconds)
+    
+    def fetch_facility_details(self, facility_urls):
+        """Yield the details of each facility URL, in the order given.
         
-        page_facilities = []
+        With a driver pool or the http engine the pages are fetched concurrently
+        by the asyncio detail engine; otherwise they are visited one after
+        another in a tab of the primary driver. Either way requests are paced by
+        the per-host rate limiter. Facilities with a fresh cache entry are
+        returned without touching the network or the rate limiter.
+        """
+        cached = [self.cached_facility_details(url) for url in facility_urls]
+        downloads = self._download_all([url for url, hit in zip(facility_urls, cached) if hit is None])
+        for facility_data in cached:
+            if facility_data is None:
+                facility_data = next(downloads)
+            yield facility_data
+    
+    def _download_all(self, facility_urls):
+        if self.detail_engine:
+            for url, facility_data in self.detail_engine.iter_results(facility_urls):
+                yield facility_data
+            return
         
-        try:
+        # The browser loads the next page while the previous one is being parsed
+        parsing = deque()
+        for url in facility_urls:
+            with self.metrics.span('rate_limit'):
+                self.rate_limiter.acquire(normalize_facility_url(url, self.base_url))
+            parsing.append((url, self.start_download(url)))
+            if len(parsing) > 1:
+                yield self.finish_download(*parsing.popleft())
+        while parsing:
+            yield self.finish_download(*parsing.popleft())
+    
+    def facility_records(self, facility_urls):
+        """Yield the record of each facility URL from the current search, in the order given.
+        
+        In listing mode the records come from the results table, with detail
+        pages fetched only for rows missing a column the table lacks when
+        enriching.
+        """
+        if not self.listing_only:
+            yield from self.fetch_facility_details(facility_urls)
+            return
+        
+        records = [self.listings[url].copy() for url in facility_urls]
+        # Only the columns the table never has are worth a detail page
+        detail_columns = detail_only_columns()
+        incomplete = [self.enrich and not all(facility_data[field] for field in detail_columns)
+                      for facility_data in records]
+        details = self.fetch_facility_details(
+            [url for url, missing in zip(facility_urls, incomplete) if missing]
+        )
+        for facility_data, missing in zip(records, incomplete):
+            if missing:
+                # The detail page wins, e.g. its address has the city the table lacks
+                facility_data = merge_listing(facility_data, next(details))
+            yield facility_data
+    
+    def facility_urls_on_page(self):
+        """Return the facility detail URLs listed on the current results page."""
+        start = time.perf_counter()
+        if self.listing_only or self.delta:
+            # One pass over the page source reads every row of the table
+            page_listings = parse_results_table(self.results_page_source())
+            self.listings.update(page_listings)
+            page_urls = [url for url, facility_data in page_listings]
+        else:
             # Find all "view" links for facilities (lowercase)
             view_links = self.driver.find_elements(By.LINK_TEXT, "view")
             
@@ -215,36 +678,70 @@ class ElderlyFacilityScraper:
                 # Try alternative selector
                 view_links = self.driver.find_elements(By.CSS_SELECTOR, "a[href*='FacDetail']")
             
-            # Get all facility URLs first
-            facility_urls = [link.get_attribute('href') for link in view_links]
-            
-            print(f"Found {len(facility_urls)} facilities on this page")
-            
-            # Return empty list if no facilities
-            if len(facility_urls) == 0:
-                return page_facilities
-            
-            # Scrape each facility
-            for url in facility_urls:
-                facility_data = self.scrape_facility_details(url)
-                if facility_data['Name']:  # Only add if we got at least the name
-                    page_facilities.append(facility_data)
-                    self.facilities.append(facility_data)
-                    print(f"✓ Added facility: {facility_data['Name']}")
-                else:
-                    print(f"✗ Failed to get name for {url}")
-                    # Add it anyway with whatever data we have
-                    page_facilities.append(facility_data)
-                    self.facilities.append(facility_data)
-                time.sleep(1)  # Be nice to the server
+            page_urls = [link.get_attribute('href') for link in view_links]
+        self.metrics.observe('results_links', time.perf_counter() - start)
+        self.metrics.count('results_pages')
+        
+        if self.recorder:
+            self.recorder.record('results', self.driver.current_url, self.results_page_source(),
+                                 self.results_load_seconds, city=self.city, page=self.results_page_number,
+                                 facility_urls=page_urls)
+        return page_urls
+    
+    def results_page_source(self):
+        """Return the HTML of the results page the browser shows."""
+        return self.driver.page_source
+    
+    def collect_facility_urls(self):
+        """Page through the current search results and return every facility URL, without visiting them."""
+        facility_urls = []
+        page_num = 1
+        while True:
+            page_urls = self.facility_urls_on_page()
+            self.log(f"Page {page_num}: {len(page_urls)} facilities")
+            facility_urls.extend(page_urls)
+            if not page_urls or not self.has_next_page():
+                break
+            self.go_to_next_page()
+            page_num += 1
+        return facility_urls
+    
+    def iter_page_records(self):
+        """Yield the record of each facility on the current results page that still needs scraping."""
+        try:
+            facility_urls = self.facility_urls_on_page()
+            self.log(f"Found {len(facility_urls)} facilities on this page")
+            facility_urls = self.pending_facility_urls(facility_urls)
+            self.last_facility_at = time.perf_counter()
             
-            return page_facilities
+            for url, facility_data in zip(facility_urls, self.facility_records(facility_urls)):
+                if not facility_data['Name']:
+                    # Kept anyway with whatever data we have
+                    self.log(f"✗ Failed to get name for {url}")
+                self.count_facility(facility_data)
+                yield facility_data
         
         except Exception as e:
-            print(f"Error scraping results page: {e}")
+            self.log(f"Error scraping results page: {e}")
             import traceback
-            traceback.print_exc()
-            return page_facilities
+            self.log(traceback.format_exc())
+    
+    def scrape_results_page(self):
+        """Scrape all facilities from the current results page."""
+        return list(self.iter_page_records())
+    
+    def count_facility(self, facility_data):
+        """Count a scraped record, keeping it in self.facilities if keep_facilities is set."""
+        self.facility_count += 1
+        # Time per facility as the crawl experiences it: cache hits, waits, loads and extraction
+        now = time.perf_counter()
+        self.metrics.observe('facility', now - self.last_facility_at)
+        self.metrics.count('facilities')
+        self.last_facility_at = now
+        if self.events is not None:
+            self.events.put({'facility': facility_data})
+        if self.keep_facilities:
+            self.facilities.append(facility_data)
     
     def has_next_page(self):
         """Check if there's a next page in pagination."""
@@ -259,88 +756,418 @@ class ElderlyFacilityScraper:
     
     def go_to_next_page(self):
         """Navigate to the next page of results."""
+        with self.metrics.span('rate_limit'):
+            self.rate_limiter.acquire(self.base_url)
+        
         # Click on "Next »" span element
+        start = time.perf_counter()
+        previous_href = first_facility_href(self.driver)
         next_button = self.driver.find_element(By.XPATH, "//span[contains(text(), 'Next »')]")
         next_button.click()
         
-        time.sleep(3)  # Wait for page to load
+        # Wait for the results table to show the next page's rows
+        try:
+            self.waits.until('next page', results_changed(previous_href))
+        except TimeoutException:
+            self.log("Warning: Results did not change after clicking Next")
+        self.results_page_number += 1
+        self.results_load_seconds = time.perf_counter() - start
+        self.metrics.observe('next_page', self.results_load_seconds)
     
-    def scrape_all_pages(self):
-        """Scrape facilities from all pages."""
-        page_num = 1
+    def prepare_checkpoint(self):
+        """Load the checkpoint journal when resuming, else start a fresh one.
+        
+        Returns the first results page that still needs scraping.
+        """
+        if self.resume and self.journal.load():
+            # Drop any rows written after the last checkpoint
+            if os.path.exists(self.filename):
+                with open(self.filename, 'r+b') as f:
+                    f.truncate(min(self.journal.csv_bytes, os.path.getsize(self.filename)))
+                self.csv_started = self.journal.csv_bytes > 0
+            for table in HISTORY_TABLES:
+                filename = history_filename(self.filename, table)
+                size = self.journal.history_bytes.get(filename, 0)
+                if not os.path.exists(filename):
+                    continue
+                if size:
+                    with open(filename, 'r+b') as f:
+                        f.truncate(min(size, os.path.getsize(filename)))
+                else:
+                    os.remove(filename)  # Created after the last checkpoint
+            self.log(f"Resuming after page {self.journal.last_page} "
+                     f"({len(self.journal.completed_ids)} facilities already saved)")
+            return self.journal.last_page + 1
+        
+        if self.resume:
+            self.log("No unfinished crawl to resume. Starting from page 1.")
+        self.journal.reset()
+        return 1
+    
+    def skip_to_page(self, page_num):
+        """Click through results pages without scraping them; returns the page reached."""
+        current = 1
+        while current < page_num and self.has_next_page():
+            self.go_to_next_page()
+            current += 1
+        return current
+    
+    def pending_facility_urls(self, facility_urls):
+        """Drop facilities already saved by the run being resumed.
+        
+        Also remembers the facility numbers of this page for the checkpoint.
+        """
+        pending = [url for url in facility_urls
+                   if facility_id_from_url(url) not in self.journal.completed_ids]
+        self.skipped_on_page = len(facility_urls) - len(pending)
+        if self.skipped_on_page:
+            self.log(f"Skipping {self.skipped_on_page} facilities already saved")
+        self.page_facility_ids = [facility_id_from_url(url) for url in pending]
+        return pending
+    
+    def save_page(self, page_num, page_facilities):
+        """Append a page's facilities to the CSV, then checkpoint them.
+        
+        A page cut short (e.g. by a stop request) is checkpointed as unfinished,
+        so a resumed run scrapes its remaining facilities.
+        """
+        if page_facilities:
+            self.write_facilities(page_facilities, is_first_page=not self.csv_started)
+            self.csv_started = True
+        csv_bytes = os.path.getsize(self.filename) if os.path.exists(self.filename) else 0
+        history_bytes = {}
+        for table in HISTORY_TABLES:
+            filename = history_filename(self.filename, table)
+            if os.path.exists(filename):
+                history_bytes[filename] = os.path.getsize(filename)
+        # Facilities are scraped in link order, so the saved ones are a prefix of the page
+        saved_ids = self.page_facility_ids[:len(page_facilities)]
+        finished = len(saved_ids) == len(self.page_facility_ids)
+        with self.metrics.span('checkpoint'):
+            self.journal.record_page(page_num if finished else page_num - 1, saved_ids, csv_bytes, history_bytes)
+    
+    def iter_facilities(self):
+        """Crawl the city and yield each facility record as soon as it is extracted.
+        
+        Runs the search, then streams the results (see iter_search_results()).
+        Records are written to the output as their results page completes, so
+        a consumer that only looks at each record once keeps memory flat.
+        """
+        self.navigate_to_search()
+        self.search_city()
+        yield from self.iter_search_results()
+    
+    async def aiter_facilities(self):
+        """Asynchronous counterpart of iter_facilities() for asyncio applications.
+        
+        The crawl runs on a thread of its own, one record at a time, so the
+        event loop stays free while pages load and the crawl never runs ahead
+        of the consumer.
+        """
+        import asyncio
+        
+        loop = asyncio.get_running_loop()
+        records = self.iter_facilities()
+        done = object()
+        # Every step runs on the same thread, which owns the browser
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix='crawl') as crawl_thread:
+            try:
+                while True:
+                    facility_data = await loop.run_in_executor(crawl_thread, next, records, done)
+                    if facility_data is done:
+                        break
+                    yield facility_data
+            finally:
+                await loop.run_in_executor(crawl_thread, records.close)
+    
+    def iter_search_results(self):
+        """Yield the facility records of the current search, page by page.
+        
+        Each results page is written to the output sinks and checkpointed once
+        its records have been consumed. Closing the generator early (e.g. on a
+        stop request) still saves the records already yielded, and leaves the
+        crawl resumable; the crawl is only marked complete at the last page.
+        """
+        if self.delta:
+            yield from self.iter_delta()
+            return
+        
+        page_num = self.prepare_checkpoint()
+        if page_num > 1:
+            self.log(f"Fast-forwarding to page {page_num}...")
+            if self.skip_to_page(page_num) < page_num:
+                self.log("No pages left to resume.")
+                self.mark_complete()
+                return
         
         while True:
-            print(f"\n--- Scraping page {page_num} ---")
-            page_facilities = self.scrape_results_page()
+            self.log(f"\n--- Scraping page {page_num} ---")
+            page_facilities = []
+            try:
+                for facility_data in self.iter_page_records():
+                    page_facilities.append(facility_data)
+                    yield facility_data
+            finally:
+                # Write this page's facilities to the output
+                if page_facilities or self.skipped_on_page:
+                    self.save_page(page_num, page_facilities)
             
             # Stop if no facilities found on this page
-            if len(page_facilities) == 0:
-                print("No facilities found on this page. Stopping pagination.")
+            if not page_facilities and not self.skipped_on_page:
+                self.log("No facilities found on this page. Stopping pagination.")
                 break
             
-            # Write this page's facilities to CSV
-            self.append_to_csv(page_facilities, is_first_page=(page_num == 1))
-            
             if self.has_next_page():
-                print("Moving to next page...")
+                self.log("Moving to next page...")
                 self.go_to_next_page()
                 page_num += 1
             else:
-                print("No more pages to scrape.")
+                self.log("No more pages to scrape.")
                 break
         
         # Mark scraping as completed
-        self.scraping_completed = True
+        self.mark_complete()
+    
+    def scrape_all_pages(self):
+        """Scrape facilities from all pages of the current search."""
+        for facility_data in self.iter_search_results():
+            self.log(f"✓ Added facility: {facility_data['Name']}")
+    
+    def iter_delta(self):
+        """Crawl the city incrementally against the database of previous runs.
+        
+        Pages through the whole listing first, then fetches only the detail
+        pages picked by plan_delta(), yielding the reused records before the
+        refreshed ones. Records are written and upserted in batches, so an
+        interrupted delta crawl loses little: the facilities it already
+        refreshed are no longer stale for the next one.
+        """
+        self.journal.reset()
+        listings = {}
+        for url in self.collect_facility_urls():
+            facility_id = facility_id_from_url(url)
+            if facility_id:
+                listings.setdefault(facility_id, (url, self.listings[url]))
+        if not listings:
+            self.log("No facilities found. Stopping.")
+            return
+        
+        plan = plan_delta(listings.values(), self.store.stored_facilities(listings),
+                          self.stale_after_hours)
+        self.log(summarize_plan(plan))
+        
+        for facility_data in plan.reused:
+            self.count_facility(facility_data)
+            yield facility_data
+        self.write_facilities(plan.reused, is_first_page=True)
+        self.csv_started = bool(plan.reused)
+        
+        batch = []
+        try:
+            for url, detail_data in zip(plan.urls, self._download_all(plan.urls)):
+                listing = self.listings[url]
+                facility_data = merge_listing(listing, detail_data)
+                self.log(f"Refreshed ({plan.reasons[listing['Facility Number']]}): {facility_data['Name'] or url}")
+                self.count_facility(facility_data)
+                batch.append(facility_data)
+                yield facility_data
+                if len(batch) == self.DELTA_BATCH_SIZE:
+                    self.write_facilities(batch, is_first_page=not self.csv_started)
+                    self.csv_started = True
+                    batch = []
+        finally:
+            self.write_facilities(batch, is_first_page=not self.csv_started)
+        
+        self.mark_complete()
     
-    def append_to_csv(self, facilities, is_first_page=False):
-        """Append facilities to CSV file after each page is scraped."""
+    def write_facilities(self, facilities, is_first_page=False):
+        """Write a page of facilities (and their history child tables) to the output sinks.
+        
+        is_first_page starts the files afresh; otherwise rows are appended.
+        Every sink is flushed to disk before this returns, so the page can be
+        checkpointed.
+        """
         if not facilities:
             return
         
-        mode = 'w' if is_first_page else 'a'
+        self.log(f"Writing {len(facilities)} facilities to {self.filename}...")
+        start = time.perf_counter()
         
-        print(f"Writing {len(facilities)} facilities to {self.filename}...")
+        self.sink_for('main', self.filename, FIELDNAMES, is_first_page).write(facilities)
+        for table, fieldnames in HISTORY_TABLES.items():
+            filename = history_filename(self.filename, table)
+            rows = history_rows(facilities, table)
+            if rows:
+                self.sink_for(table, filename, fieldnames, is_first_page).write(rows)
+            elif is_first_page and table not in self.sinks and os.path.exists(filename):
+                os.remove(filename)  # Left over from an earlier run
         
-        with open(self.filename, mode, newline='', encoding='utf-8') as csvfile:
-            fieldnames = ['Name', 'Status', 'Address', 'Phone Number', 'Facility Capacity']
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-            
-            # Write header only on first page
-            if is_first_page:
-                writer.writeheader()
-            
-            for facility in facilities:
-                writer.writerow(facility)
+        # Make sure the rows are on disk before the page is checkpointed
+        for sink in self.sinks.values():
+            sink.flush()
+        self.metrics.observe('write', time.perf_counter() - start)
+        if self.store:
+            # Cache hits, listing-only and reused records keep the time their details were last fetched
+            with self.metrics.span('database'):
+                self.store.upsert(self.current_store_run(), self.city, facilities, self.detail_ids)
         
-        print(f"✓ Wrote to {self.filename}")
+        self.log(f"✓ Wrote to {self.filename}")
+    
+    def current_store_run(self):
+        """Return the database run id of the current city's crawl, starting the run on first use."""
+        if self.store_run is None:
+            self.store_run = self.store.start_run(self.city, resume=self.resume)
+        return self.store_run
+    
+    def finish_store_run(self):
+        """Close the current city's database run after a complete crawl and report its changes."""
+        if not self.store or self.store_run is None:
+            # Nothing was written, which more likely means a failed search than a city
+            # whose facilities all closed
+            return
+        run_id = self.store_run
+        self.store.finish_run(run_id, self.city)
+        self.log(self.store.change_summary(run_id))
+        self.store_run = None
+    
+    def mark_complete(self):
+        """Record that every results page of the city has been scraped."""
+        self.journal.mark_complete()
+        self.scraping_completed = True
+        self.finish_store_run()
+    
+    def sink_for(self, name, filename, fieldnames, is_first_page):
+        """Return the open sink called name, opening it on first use."""
+        if name not in self.sinks:
+            # A child table first written after page 1 still starts a new file
+            append = not is_first_page and os.path.exists(filename)
+            self.sinks[name] = open_sink(self.output_format, filename, fieldnames, append=append)
+        return self.sinks[name]
+    
+    def close_sinks(self):
+        """Close the output files of the current city."""
+        for sink in self.sinks.values():
+            sink.close()
+        self.sinks = {}
+    
+    def log(self, message):
+        """Report progress, on the console or as an event (the GUI shows it in its output pane)."""
+        if self.events is not None:
+            self.events.put({'log': message})
+        else:
+            print(message)
+    
+    def report_progress(self, message):
+        """Report the stage the crawl is at; only an events queue receives it."""
+        if self.events is not None:
+            self.events.put({'progress': message})
+    
+    def stop(self):
+        """Ask run() to stop; quitting the browsers also interrupts a page that is loading."""
+        self.stop_requested.set()
+        self.quit_browsers()
     
     def run(self):
         """Run the complete scraping process."""
         try:
-            self.navigate_to_search()
-            self.search_city()
-            self.scrape_all_pages()
+            records = self.iter_facilities()
+            try:
+                for facility_data in records:
+                    self.log(f"✓ Added facility: {facility_data['Name']}")
+                    if self.stop_requested.is_set():
+                        self.log("\n⚠ Scraping stopped by user")
+                        break
+            finally:
+                # Saves the facilities already scraped when stopping early
+                records.close()
             
             if self.scraping_completed:
-                print(f"\n✓ Scraping completed successfully! Total facilities: {len(self.facilities)}")
-                print(f"Data saved to: {self.filename}")
+                self.log(f"\n✓ Scraping completed successfully! Total facilities: {self.facility_count}")
+                self.log(f"Data saved to: {self.filename}")
+            
+            waits_summary = self.waits.format_summary()
+            if waits_summary:
+                self.log(waits_summary)
+            if self.cache:
+                self.log(self.cache.stats())
+            if self.engine == 'http':
+                self.log(format_latency_report(self.detail_latencies))
         except Exception as e:
-            print(f"\n✗ ERROR: An error occurred during scraping: {e}")
-            import traceback
-            traceback.print_exc()
+            if self.stop_requested.is_set():
+                # The browser was quit under the crawl
+                self.log("\n⚠ Scraping stopped by user")
+            else:
+                self.log(f"\n✗ ERROR: An error occurred during scraping: {e}")
+                import traceback
+                self.log(traceback.format_exc())
         finally:
             if not self.scraping_completed:
-                if self.facilities:
-                    print(f"\n⚠ WARNING: Scraping was interrupted! Partial data ({len(self.facilities)} facilities) saved to: {self.filename}")
+                if self.stop_requested.is_set():
+                    if self.facility_count:
+                        self.log(f"⚠ Partial data ({self.facility_count} facilities) saved to: {self.filename}")
+                elif self.facility_count:
+                    self.log(f"\n⚠ WARNING: Scraping was interrupted! Partial data ({self.facility_count} facilities) saved to: {self.filename}")
                 else:
-                    print(f"\n✗ ERROR: Scraping failed - no data was collected.")
+                    self.log(f"\n✗ ERROR: Scraping failed - no data was collected.")
             
-            print("\nClosing browser...")
-            self.driver.quit()
+            if self.profile:
+                self.log(self.metrics.format_profile())
+            self.log("\nClosing browser...")
+            self.report_progress("Cleaning up...")
+            self.close()
+    
+    def quit_browsers(self):
+        """Quit the browsers this scraper launched, which also stops a crawl in progress."""
+        if self.owns_driver and self._driver is not None:
+            try:
+                self._driver.quit()
+            except Exception:
+                pass  # Browser may already be closed
+        if self.driver_pool:
+            self.driver_pool.close()
+    
+    def close(self):
+        """Quit the browsers and release the cache and HTTP connections."""
+        self.quit_browsers()
+        if self.detail_engine:
+            self.detail_engine.close()
+        if self.cache:
+            self.cache.close()
+        if self.recorder:
+            self.recorder.close()
+        if self.metrics_exporter:
+            self.metrics_exporter.close()
+        if self.http_fetcher:
+            self.http_fetcher.close()
+        if self.parse_pool:
+            self.parse_pool.shutdown(wait=False)
+        self.close_sinks()
+        if self.store:
+            self.store.close()
+
+
+def options_error(cities, options):
+    """Return why a crawl of cities with these ElderlyFacilityScraper options cannot run, or None.
+    
+    The checks the CLI makes on its arguments, and the daemon on its jobs.
+    """
+    if options.get('resume') and len(cities) > 1:
+        return '--resume applies to a single city'
+    if options.get('resume') and options.get('output_format') == 'parquet':
+        return '--resume cannot append to Parquet output'
+    if options.get('delta'):
+        if not options.get('db_path'):
+            return '--delta compares against the database of previous runs; add --db PATH'
+        if len(cities) > 1 or options.get('resume') or options.get('listing_only') or options.get('enrich'):
+            return ('--delta applies to a single city and cannot be combined with '
+                    '--resume, --listing-only or --enrich')
+    return None
 
 
 def main():
     """Main entry point for the script."""
+    # Needed by the HTML parse pool in frozen (PyInstaller) builds
+    multiprocessing.freeze_support()
     parser = argparse.ArgumentParser(
         description='Scrape elderly care facilities in California cities.',
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -349,15 +1176,36 @@ Examples:
   python scraper.py "Los Angeles"
   python scraper.py "San Francisco" --output-dir /path/to/folder
   python scraper.py "Sacramento" -o ./output
+  python scraper.py "Roseville" --engine http
+  python scraper.py "Los Angeles" --workers 4 --rate 2
+  python scraper.py "Los Angeles" --engine http --rate 10 --concurrency 16 --adaptive
+  python scraper.py "Los Angeles" --lean --lean-allow stylesheets
+  python scraper.py --cities-file placer-county.txt --workers 4
+  python scraper.py "Los Angeles" --listing-only
+  python scraper.py "Los Angeles" --db facilities.sqlite3
+  python scraper.py "Los Angeles" --db facilities.sqlite3 --delta
+  python scraper.py "Roseville" --daemon
+  python scraper.py "Roseville" --record sessions/roseville
+  python scraper.py "Roseville" --replay sessions/roseville -o replayed
+  python scraper.py "Roseville" --profile --metrics-file metrics.prom
         """
     )
     
     parser.add_argument(
         'city',
         type=str,
+        nargs='?',
         help='Name of the California city to search for facilities'
     )
     
+    parser.add_argument(
+        '--cities-file',
+        type=str,
+        default=None,
+        help='Scrape every city listed in this file (one per line) in a single batch, '
+             'writing one CSV per city plus combined-elderly-facilities.csv'
+    )
+    
     parser.add_argument(
         '-o', '--output-dir',
         type=str,
@@ -365,15 +1213,281 @@ Examples:
         help='Directory where CSV file will be saved (default: current directory)'
     )
     
+    parser.add_argument(
+        '--engine',
+        choices=['selenium', 'http'],
+        default='selenium',
+        help='How facility detail pages are fetched: render in Chrome (default) '
+             'or download the HTML directly, falling back to Chrome when needed'
+    )
+    
+    parser.add_argument(
+        '--base-url',
+        type=str,
+        default=None,
+        help=f'Site to scrape (default: {ElderlyFacilityScraper.DEFAULT_BASE_URL}); '
+             'point at a local server for testing'
+    )
+    
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=1,
+        help='Number of headless Chrome instances fetching detail pages in parallel (default: 1)'
+    )
+    
+    parser.add_argument(
+        '--rate',
+        type=float,
+        default=1.0,
+        help='Maximum requests per second sent to the site (default: 1.0)'
+    )
+    
+    parser.add_argument(
+        '--concurrency',
+        type=int,
+        default=None,
+        help='Maximum detail pages fetched at once (default: --workers, or 4 with --engine http)'
+    )
+    
+    parser.add_argument(
+        '--adaptive',
+        action='store_true',
+        help='Adjust the detail pages fetched at once between --min-concurrency and --concurrency: '
+             'one more after each round of healthy responses, half as many on timeouts, '
+             'error responses or a slowdown'
+    )
+    
+    parser.add_argument(
+        '--min-concurrency',
+        type=int,
+        default=1,
+        metavar='N',
+        help='With --adaptive, never fetch fewer detail pages at once than this (default: 1)'
+    )
+    
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help='Always fetch detail pages from the site instead of the on-disk cache'
+    )
+    
+    parser.add_argument(
+        '--cache-ttl',
+        type=float,
+        default=168,
+        help='Hours a cached facility record stays fresh (default: 168)'
+    )
+    
+    parser.add_argument(
+        '--cache-max-mb',
+        type=float,
+        default=256,
+        help='Size cap of the facility cache; least recently used entries are evicted (default: 256)'
+    )
+    
+    parser.add_argument(
+        '--resume',
+        action='store_true',
+        help='Continue an interrupted crawl of this city from its checkpoint, appending to the existing CSV'
+    )
+    
+    parser.add_argument(
+        '--parse-workers',
+        type=int,
+        default=2,
+        help='Processes parsing rendered detail pages off the browser thread; 0 parses inline (default: 2)'
+    )
+    
+    parser.add_argument(
+        '--format',
+        choices=sorted(SINKS),
+        default='csv',
+        help='Output format: plain CSV (default), gzip- or zstd-compressed CSV, or Parquet '
+             '(csv.zst needs zstandard, parquet needs pyarrow)'
+    )
+    
+    parser.add_argument(
+        '--db',
+        type=str,
+        default=None,
+        metavar='PATH',
+        help='Also upsert every facility into this SQLite database, with a runs table and '
+             'per-run changes (new, closed, capacity/status changed)'
+    )
+    
+    parser.add_argument(
+        '--delta',
+        action='store_true',
+        help='Incremental crawl against --db: read the whole listing, then fetch detail pages only for '
+             'new, changed, previously missing, stale or incomplete facilities'
+    )
+    
+    parser.add_argument(
+        '--stale-after',
+        type=float,
+        default=720,
+        metavar='HOURS',
+        help='With --delta, refetch facilities whose details are older than this (default: 720, 30 days)'
+    )
+    
+    parser.add_argument(
+        '--lean',
+        action='store_true',
+        help='Keep Chrome from loading images, fonts, stylesheets and third-party hosts'
+    )
+    
+    parser.add_argument(
+        '--lean-allow',
+        action='append',
+        default=[],
+        metavar='KIND_OR_HOST',
+        help='With --lean, still load this resource kind (images, fonts, stylesheets, third-party) '
+             'or host; may be repeated'
+    )
+    
+    parser.add_argument(
+        '--daemon',
+        action='store_true',
+        help='Run the job with a warm browser of the scraper daemon (python daemon.py) instead of '
+             'launching Chrome; the daemon\'s own --base-url, --lean and browsers apply'
+    )
+    
+    parser.add_argument(
+        '--daemon-port',
+        type=int,
+        default=None,
+        metavar='PORT',
+        help='Port of the scraper daemon (default: 8765)'
+    )
+    
+    parser.add_argument(
+        '--record',
+        type=str,
+        default=None,
+        metavar='DIR',
+        help='Save every page loaded (search form, results and detail pages) with its load time '
+             'in a session archive in DIR; the cache is not used'
+    )
+    
+    parser.add_argument(
+        '--replay',
+        type=str,
+        default=None,
+        metavar='DIR',
+        help='Run the crawl from the session archive recorded in DIR, at full speed and without '
+             'Chrome or network (--engine, --workers, --rate and --lean do not apply)'
+    )
+    
+    parser.add_argument(
+        '--profile',
+        action='store_true',
+        help='Print the time spent per phase (Chrome startup, search, pagination, detail pages, '
+             'extraction, writing, ...) with p50/p95/p99 when the crawl ends'
+    )
+    
+    parser.add_argument(
+        '--metrics-file',
+        type=str,
+        default=None,
+        metavar='PATH',
+        help='Keep the per-phase timings and counters in PATH up to date while the crawl runs: '
+             'JSON if PATH ends in .json, else the Prometheus text format'
+    )
+    
+    parser.add_argument(
+        '--metrics-interval',
+        type=float,
+        default=5.0,
+        metavar='SECONDS',
+        help='Seconds between updates of --metrics-file (default: 5)'
+    )
+    
+    parser.add_argument(
+        '--listing-only',
+        action='store_true',
+        help='Take name, address and status from the results table without visiting detail pages'
+    )
+    
+    parser.add_argument(
+        '--enrich',
+        action='store_true',
+        help='Like --listing-only, but fetch detail pages to fill in the phone number and capacity '
+             'the results table lacks'
+    )
+    
     args = parser.parse_args()
     
-    print(f"Starting scraper for {args.city}...")
+    if args.cities_file:
+        cities = read_cities_file(args.cities_file)
+        if args.city and args.city not in cities:
+            cities.insert(0, args.city)
+    elif args.city:
+        cities = [args.city]
+    else:
+        parser.error('a city or --cities-file is required')
+    if not cities:
+        parser.error(f'no cities found in {args.cities_file}')
+    error = options_error(cities, dict(resume=args.resume, output_format=args.format, delta=args.delta,
+                                       db_path=args.db, listing_only=args.listing_only, enrich=args.enrich))
+    if error:
+        parser.error(error)
+    
+    if args.adaptive and args.workers < 2 and args.engine != 'http':
+        parser.error('--adaptive needs concurrent detail fetches: --workers 2 or more, or --engine http')
+    
+    if args.record and args.replay:
+        parser.error('--record and --replay cannot be combined')
+    if args.daemon and (args.record or args.replay):
+        parser.error('--record and --replay run without the daemon')
+    
+    if args.daemon:
+        from daemon import DEFAULT_PORT, daemon_running, run_in_daemon
+        port = args.daemon_port or DEFAULT_PORT
+        if daemon_running(port):
+            options = dict(engine=args.engine, rate=args.rate, use_cache=not args.no_cache,
+                           cache_ttl_hours=args.cache_ttl, cache_max_mb=args.cache_max_mb,
+                           resume=args.resume, listing_only=args.listing_only, enrich=args.enrich,
+                           parse_workers=args.parse_workers, output_format=args.format,
+                           db_path=os.path.abspath(args.db) if args.db else None, delta=args.delta,
+                           stale_after_hours=args.stale_after)
+            print(f"Submitting {', '.join(cities)} to the scraper daemon on port {port}...")
+            summary = run_in_daemon(cities, args.output_dir, options, port)
+            if summary is None:
+                print("✗ ERROR: Lost the connection to the scraper daemon")
+            elif summary['error']:
+                print(f"✗ ERROR: {summary['error']}")
+            else:
+                print(f"\n✓ {summary['facilities']} facilities saved to: {summary['filename']}")
+            return
+        print(f"No scraper daemon answered on port {port} (start one with: python daemon.py); "
+              "launching Chrome here")
+    
+    print(f"Starting scraper for {', '.join(cities)}...")
     if args.output_dir:
         print(f"Output directory: {os.path.abspath(args.output_dir)}")
     print("=" * 50)
     
-    scraper = ElderlyFacilityScraper(args.city, args.output_dir)
-    scraper.run()
+    options = dict(base_url=args.base_url, resume=args.resume, listing_only=args.listing_only,
+                   enrich=args.enrich, parse_workers=args.parse_workers, output_format=args.format,
+                   db_path=args.db, delta=args.delta, stale_after_hours=args.stale_after,
+                   profile=args.profile, metrics_path=args.metrics_file,
+                   metrics_interval=args.metrics_interval)
+    if args.replay:
+        from replay import ReplayScraper
+        scraper = ReplayScraper(cities[0], args.replay, args.output_dir, **options)
+    else:
+        scraper = ElderlyFacilityScraper(cities[0], args.output_dir, engine=args.engine,
+                                         workers=args.workers, rate=args.rate,
+                                         concurrency=args.concurrency, adaptive=args.adaptive,
+                                         min_concurrency=args.min_concurrency, use_cache=not args.no_cache,
+                                         cache_ttl_hours=args.cache_ttl, cache_max_mb=args.cache_max_mb,
+                                         lean=args.lean, lean_allow=args.lean_allow,
+                                         record_dir=args.record, **options)
+    if len(cities) > 1:
+        BatchScraper(scraper, cities).run()
+    else:
+        scraper.run()
     
     print("=" * 50)
     print("Scraping completed!")
@@ -7,9 +7,25 @@ Cross-platform GUI application for scraping elderly care facilities in Californi
 import tkinter as tk
 from tkinter import ttk, scrolledtext, messagebox, filedialog
 import threading
+import multiprocessing
+import queue
 import sys
 import os
+import time
+from collections import deque
+from functools import partial
 from scraper import ElderlyFacilityScraper
+from batch import BatchScraper
+from daemon import daemon_running, run_in_daemon
+from results_grid import ResultStore, ResultView, VirtualGrid
+from sinks import SINKS
+
+# How often the Tk loop takes the scraper's progress events off the queue
+POLL_INTERVAL_MS = 100
+# Events handled per poll, so a burst cannot freeze the window
+MAX_EVENTS_PER_POLL = 5000
+# Lines kept in the output pane; older ones are dropped
+MAX_LOG_LINES = 5000
 
 
 class ScraperGUI:
@@ -19,18 +35,33 @@ class ScraperGUI:
         """Initialize the GUI."""
         self.root = root
         self.root.title("Elderly Care Facility Scraper")
-        self.root.geometry("700x600")
+        self.root.geometry("900x650")
         self.root.resizable(True, True)
         
         # Variables
         self.city_var = tk.StringVar()
         self.output_dir_var = tk.StringVar(value=os.getcwd())
+        self.resume_var = tk.BooleanVar(value=False)
+        self.listing_var = tk.BooleanVar(value=False)
+        self.format_var = tk.StringVar(value='csv')
         self.is_scraping = False
         self.scraper = None
         self.should_stop = False
         
+        # Progress from the scraping thread, shown by poll_events() on the Tk thread
+        self.events = queue.SimpleQueue()
+        self.facilities_scraped = 0
+        
+        # Records of the current run for the results grid
+        self.results = ResultStore()
+        self.results_view = ResultView(self.results)
+        self.status_filter_var = tk.StringVar(value='All')
+        self.min_capacity_var = tk.StringVar()
+        self.max_capacity_var = tk.StringVar()
+        
         # Create GUI elements
         self.create_widgets()
+        self.root.after(POLL_INTERVAL_MS, self.poll_events)
         
     def create_widgets(self):
         """Create all GUI widgets."""
@@ -42,7 +73,7 @@ class ScraperGUI:
         self.root.columnconfigure(0, weight=1)
         self.root.rowconfigure(0, weight=1)
         main_frame.columnconfigure(1, weight=1)
-        main_frame.rowconfigure(3, weight=1)
+        main_frame.rowconfigure(5, weight=1)
         
         # Title
         title_label = ttk.Label(
@@ -53,7 +84,7 @@ class ScraperGUI:
         title_label.grid(row=0, column=0, columnspan=3, pady=(0, 20))
         
         # City input
-        city_label = ttk.Label(main_frame, text="City Name:", font=("Arial", 10))
+        city_label = ttk.Label(main_frame, text="City Name(s):", font=("Arial", 10))
         city_label.grid(row=1, column=0, sticky=tk.W, pady=5)
         
         self.city_entry = ttk.Entry(main_frame, textvariable=self.city_var, width=30, font=("Arial", 10))
@@ -88,6 +119,37 @@ class ScraperGUI:
         )
         self.start_button.grid(row=3, column=2, pady=5, padx=(5, 0))
         
+        # Run options
+        options_frame = ttk.Frame(main_frame)
+        options_frame.grid(row=3, column=1, sticky=tk.W, pady=5, padx=(5, 5))
+        
+        # Resume checkbox
+        self.resume_check = ttk.Checkbutton(
+            options_frame,
+            text="Resume interrupted run",
+            variable=self.resume_var
+        )
+        self.resume_check.pack(side=tk.LEFT)
+        
+        # Listing-only checkbox
+        self.listing_check = ttk.Checkbutton(
+            options_frame,
+            text="Listing only (no phone/capacity)",
+            variable=self.listing_var
+        )
+        self.listing_check.pack(side=tk.LEFT, padx=(10, 0))
+        
+        # Output format
+        ttk.Label(options_frame, text="Format:").pack(side=tk.LEFT, padx=(10, 0))
+        self.format_combo = ttk.Combobox(
+            options_frame,
+            textvariable=self.format_var,
+            values=sorted(SINKS),
+            state='readonly',
+            width=8
+        )
+        self.format_combo.pack(side=tk.LEFT, padx=(5, 0))
+        
         # Stop button (initially disabled)
         self.stop_button = ttk.Button(
             main_frame,
@@ -102,18 +164,21 @@ class ScraperGUI:
         self.progress_label = ttk.Label(main_frame, text="Ready to scrape", font=("Arial", 9))
         self.progress_label.grid(row=4, column=0, columnspan=2, sticky=tk.W, pady=5)
         
-        # Output text area
-        output_label = ttk.Label(main_frame, text="Output:", font=("Arial", 10))
-        output_label.grid(row=5, column=0, columnspan=3, sticky=tk.W, pady=(10, 5))
+        # Output log and results grid, one tab each
+        notebook = ttk.Notebook(main_frame)
+        notebook.grid(row=5, column=0, columnspan=3, sticky=(tk.W, tk.E, tk.N, tk.S), pady=(10, 10))
         
+        output_tab = ttk.Frame(notebook)
         self.output_text = scrolledtext.ScrolledText(
-            main_frame,
+            output_tab,
             width=80,
             height=25,
             font=("Courier", 9),
             wrap=tk.WORD
         )
-        self.output_text.grid(row=6, column=0, columnspan=3, sticky=(tk.W, tk.E, tk.N, tk.S), pady=(0, 10))
+        self.output_text.pack(fill=tk.BOTH, expand=True)
+        notebook.add(output_tab, text="Output")
+        notebook.add(self.create_results_tab(notebook), text="Results")
         
         # Status bar
         self.status_bar = ttk.Label(
@@ -125,21 +190,143 @@ class ScraperGUI:
         )
         self.status_bar.grid(row=1, column=0, sticky=(tk.W, tk.E))
         
+    def create_results_tab(self, parent):
+        """Create the results grid with its status and capacity filters."""
+        frame = ttk.Frame(parent, padding="5")
+        frame.columnconfigure(0, weight=1)
+        frame.rowconfigure(1, weight=1)
+        
+        filters = ttk.Frame(frame)
+        filters.grid(row=0, column=0, sticky=(tk.W, tk.E), pady=(0, 5))
+        ttk.Label(filters, text="Status:").pack(side=tk.LEFT)
+        self.status_filter = ttk.Combobox(
+            filters,
+            textvariable=self.status_filter_var,
+            values=['All'],
+            state='readonly',
+            width=12
+        )
+        self.status_filter.pack(side=tk.LEFT, padx=(5, 10))
+        self.status_filter.bind('<<ComboboxSelected>>', lambda e: self.apply_results_filter())
+        
+        ttk.Label(filters, text="Capacity from").pack(side=tk.LEFT)
+        ttk.Entry(filters, textvariable=self.min_capacity_var, width=6).pack(side=tk.LEFT, padx=(5, 5))
+        ttk.Label(filters, text="to").pack(side=tk.LEFT)
+        ttk.Entry(filters, textvariable=self.max_capacity_var, width=6).pack(side=tk.LEFT, padx=(5, 10))
+        self.min_capacity_var.trace_add('write', lambda *args: self.apply_results_filter())
+        self.max_capacity_var.trace_add('write', lambda *args: self.apply_results_filter())
+        
+        self.results_count_label = ttk.Label(filters, text="No facilities yet")
+        self.results_count_label.pack(side=tk.RIGHT)
+        
+        # Click the Status or Facility Capacity heading to sort by it (again to reverse)
+        self.results_grid = VirtualGrid(frame, self.results_view, on_sort=self.sort_results)
+        self.results_grid.grid(row=1, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+        return frame
+    
+    def apply_results_filter(self):
+        """Filter the results grid by the status and capacity inputs."""
+        status = self.status_filter_var.get()
+        self.results_view.configure(
+            status=None if status == 'All' else status,
+            min_capacity=parse_capacity(self.min_capacity_var.get()),
+            max_capacity=parse_capacity(self.max_capacity_var.get())
+        )
+        self.results_grid.offset = 0
+        self.refresh_results()
+    
+    def sort_results(self, sort):
+        """Sort the results grid; sorting by the same column again reverses the order."""
+        descending = sort is not None and sort == self.results_view.sort and not self.results_view.descending
+        self.results_view.configure(sort=sort, descending=descending)
+        self.results_grid.offset = 0
+        self.results_grid.show_sort()
+        self.refresh_results()
+    
+    def refresh_results(self):
+        """Redraw the visible rows of the results grid and its counts."""
+        self.results_grid.refresh()
+        if len(self.results_view) == len(self.results):
+            text = f"{len(self.results)} facilities"
+        else:
+            text = f"Showing {len(self.results_view)} of {len(self.results)} facilities"
+        self.results_count_label.config(text=text)
+        statuses = ['All'] + self.results.status_names()
+        if len(statuses) != len(self.status_filter['values']):
+            self.status_filter.config(values=statuses)
+    
+    def clear_results(self):
+        self.results.clear()
+        self.results_view.rebuild()
+        self.results_grid.offset = 0
+        self.refresh_results()
+    
     def log_output(self, message):
-        """Add a message to the output text area."""
-        self.output_text.insert(tk.END, message + "\n")
-        self.output_text.see(tk.END)
-        self.root.update_idletasks()
+        """Add a message to the output text area (safe from any thread)."""
+        self.events.put({'log': message})
         
     def update_status(self, message):
-        """Update the status bar."""
-        self.status_bar.config(text=message)
-        self.root.update_idletasks()
+        """Update the status bar (safe from any thread)."""
+        self.events.put({'status': message})
         
     def update_progress(self, message):
-        """Update the progress label."""
-        self.progress_label.config(text=message)
-        self.root.update_idletasks()
+        """Update the progress label (safe from any thread)."""
+        self.events.put({'progress': message})
+    
+    def run_on_ui(self, function, *args):
+        """Call function on the Tk thread, after the events queued before it."""
+        self.events.put({'call': partial(function, *args)})
+    
+    def poll_events(self):
+        """Show the events queued since the last poll, in one batch per widget."""
+        lines = deque(maxlen=MAX_LOG_LINES)
+        labels = {}
+        new_results = []
+        
+        def show():
+            if new_results:
+                self.refresh_results()
+                new_results.clear()
+            if lines:
+                self.append_lines(lines)
+                lines.clear()
+            if 'progress' in labels:
+                self.progress_label.config(text=labels['progress'])
+            if 'status' in labels:
+                self.status_bar.config(text=labels['status'])
+            labels.clear()
+        
+        handled = 0
+        while handled < MAX_EVENTS_PER_POLL:
+            try:
+                event = self.events.get_nowait()
+            except queue.Empty:
+                break
+            handled += 1
+            if 'log' in event:
+                lines.append(event['log'])
+            elif 'facility' in event:
+                row = self.results.add(event['facility'])
+                self.results_view.add(row)
+                new_results.append(row)
+                self.facilities_scraped += 1
+                labels['progress'] = f"Scraped {self.facilities_scraped} facilities..."
+            elif 'call' in event:
+                show()
+                event['call']()
+            else:
+                labels.update(event)  # progress or status; only the latest is shown
+        show()
+        # Come back at once when events were left over
+        self.root.after(1 if handled == MAX_EVENTS_PER_POLL else POLL_INTERVAL_MS, self.poll_events)
+    
+    def append_lines(self, lines):
+        """Append lines to the output pane, keeping only the last MAX_LOG_LINES."""
+        self.output_text.insert(tk.END, '\n'.join(lines) + '\n')
+        excess = int(self.output_text.index('end-1c').split('.')[0]) - 1 - MAX_LOG_LINES
+        if excess > 0:
+            self.output_text.delete('1.0', f'{excess + 1}.0')
+        self.output_text.see(tk.END)
     
     def browse_folder(self):
         """Open folder browser dialog."""
@@ -187,6 +374,8 @@ class ScraperGUI:
         
         # Clear output
         self.output_text.delete(1.0, tk.END)
+        self.facilities_scraped = 0
+        self.clear_results()
         
         # Update UI state
         self.is_scraping = True
@@ -196,29 +385,69 @@ class ScraperGUI:
         self.city_entry.config(state=tk.DISABLED)
         self.output_entry.config(state=tk.DISABLED)
         self.browse_button.config(state=tk.DISABLED)
+        self.resume_check.config(state=tk.DISABLED)
+        self.listing_check.config(state=tk.DISABLED)
+        self.format_combo.config(state=tk.DISABLED)
         
         # Start scraping in a separate thread
-        thread = threading.Thread(target=self.run_scraper, args=(city, output_dir), daemon=True)
+        thread = threading.Thread(
+            target=self.run_scraper,
+            args=(city, output_dir, self.resume_var.get(), self.listing_var.get(), self.format_var.get()),
+            daemon=True
+        )
         thread.start()
         
     def stop_scraping(self):
         """Stop the scraping process."""
-        if self.scraper and self.is_scraping:
+        if self.is_scraping:
             self.log_output("\n⚠ Stopping scraper... Please wait...")
             self.update_status("Stopping...")
             self.update_progress("Stopping...")
             self.should_stop = True
             self.stop_button.config(state=tk.DISABLED)
             
-            # Try to quit the driver to force immediate stop
+            if not self.scraper:
+                # Still setting up (stopped_before_start() catches it) or a daemon job,
+                # which stops when its connection is closed
+                return
+            
+            # Quitting the browsers stops a page load in progress
             try:
-                if self.scraper.driver:
-                    self.scraper.driver.quit()
+                self.scraper.stop()
             except:
                 pass
             
-    def run_scraper(self, city, output_dir):
+    def reset_controls(self):
+        """Re-enable the inputs once a run has finished."""
+        self.is_scraping = False
+        self.start_button.config(state=tk.NORMAL)
+        self.stop_button.config(state=tk.DISABLED)
+        self.city_entry.config(state=tk.NORMAL)
+        self.output_entry.config(state=tk.NORMAL)
+        self.browse_button.config(state=tk.NORMAL)
+        self.resume_check.config(state=tk.NORMAL)
+        self.listing_check.config(state=tk.NORMAL)
+        self.format_combo.config(state='readonly')
+        self.scraper = None
+    
+    def run_scraper(self, city, output_dir, resume=False, listing_only=False, output_format='csv'):
         """Run the scraper (called in a separate thread)."""
+        # Several comma-separated cities run as one batch
+        cities = [name.strip() for name in city.split(',') if name.strip()]
+        use_daemon = daemon_running()
+        if self.stopped_before_start():
+            self.run_on_ui(self.reset_controls)
+            return
+        if use_daemon:
+            # A warm browser skips Chrome's startup
+            options = {'resume': resume and len(cities) == 1, 'listing_only': listing_only,
+                       'output_format': output_format}
+            self.run_daemon_job(cities, output_dir, options)
+            return
+        if len(cities) > 1:
+            self.run_batch(cities, output_dir, listing_only, output_format)
+            return
+        
         try:
             self.update_status(f"Scraping facilities in {city}...")
             self.update_progress("Initializing...")
@@ -226,254 +455,146 @@ class ScraperGUI:
             self.log_output(f"Output folder: {output_dir}")
             self.log_output("=" * 50)
             
-            # Create custom scraper with GUI logging
-            self.scraper = GUIElderlyFacilityScraper(city, self, output_dir)
+            # The scraper reports through the events queue
+            self.scraper = ElderlyFacilityScraper(city, output_dir, resume=resume, listing_only=listing_only,
+                                                  output_format=output_format, events=self.events)
+            if self.stopped_before_start():
+                return
             self.scraper.run()
             
             self.log_output("=" * 50)
             self.log_output("Scraping completed!")
             
-            if self.scraper.facilities:
-                self.update_status(f"Completed! Found {len(self.scraper.facilities)} facilities")
-                self.update_progress(f"✓ Completed - {len(self.scraper.facilities)} facilities found")
-                messagebox.showinfo(
+            if self.scraper.facility_count:
+                self.update_status(f"Completed! Found {self.scraper.facility_count} facilities")
+                self.update_progress(f"✓ Completed - {self.scraper.facility_count} facilities found")
+                self.run_on_ui(
+                    messagebox.showinfo,
                     "Success",
-                    f"Scraping completed!\n\nFound {len(self.scraper.facilities)} facilities.\n\nData saved to: {self.scraper.filename}"
+                    f"Scraping completed!\n\nFound {self.scraper.facility_count} facilities.\n\nData saved to: {self.scraper.filename}"
                 )
             else:
                 self.update_status("Completed - No facilities found")
                 self.update_progress("✓ Completed - No facilities found")
-                messagebox.showinfo("Complete", f"No facilities found in {city}.")
+                self.run_on_ui(messagebox.showinfo, "Complete", f"No facilities found in {city}.")
                 
         except Exception as e:
             self.log_output(f"\n✗ Error: {e}")
             self.update_status("Error occurred")
             self.update_progress("✗ Error occurred")
-            messagebox.showerror("Error", f"An error occurred:\n\n{str(e)}")
+            self.run_on_ui(messagebox.showerror, "Error", f"An error occurred:\n\n{str(e)}")
             
         finally:
-            # Reset UI state
-            self.is_scraping = False
-            self.start_button.config(state=tk.NORMAL)
-            self.stop_button.config(state=tk.DISABLED)
-            self.city_entry.config(state=tk.NORMAL)
-            self.output_entry.config(state=tk.NORMAL)
-            self.browse_button.config(state=tk.NORMAL)
-            self.scraper = None
-
+            self.run_on_ui(self.reset_controls)
+    
+    def stopped_before_start(self):
+        """Tell whether Stop was clicked while the run was being set up, closing its scraper if so.
 
-class GUIElderlyFacilityScraper(ElderlyFacilityScraper):
-    """Extended scraper that logs to GUI instead of console."""
+        stop_scraping() sets should_stop before it looks at self.scraper, so a
+        scraper assigned after that look is caught here instead.
+        """
+        if not self.should_stop:
+            return False
+        if self.scraper:
+            self.scraper.stop()
+            self.scraper.close()
+        self.update_status("Stopped")
+        self.update_progress("⚠ Stopped before scraping started")
+        return True
     
-    def __init__(self, city, gui, output_dir=None):
-        """Initialize with GUI reference."""
-        super().__init__(city, output_dir)
-        self.gui = gui
-        
-    def navigate_to_search(self):
-        """Navigate to the elderly assisted living search page."""
-        self.gui.log_output(f"Navigating to {self.base_url}...")
-        self.gui.update_progress("Loading website...")
-        self.driver.get(self.base_url + "/carefacilitysearch")
-        
-        # Wait for Angular to load
-        self.gui.log_output("Waiting for page to load...")
-        import time
-        time.sleep(5)
-        
-        # Click on "Elderly Assisted Living" button
-        self.gui.log_output("Clicking on 'Elderly Assisted Living' button...")
-        self.gui.update_progress("Navigating to search form...")
-        from selenium.common.exceptions import TimeoutException
-        from selenium.webdriver.common.by import By
-        from selenium.webdriver.support import expected_conditions as EC
-        
-        try:
-            elderly_button = self.wait.until(
-                EC.element_to_be_clickable((By.ID, "fselectorElderlyAssistedLiving"))
-            )
-            elderly_button.click()
-        except TimeoutException:
-            self.gui.log_output("Could not find 'Elderly Assisted Living' button by ID. Trying button text...")
-            elderly_button = self.wait.until(
-                EC.element_to_be_clickable((By.XPATH, "//button[contains(text(), 'Elderly Assisted Living')]"))
-            )
-            elderly_button.click()
-        
-        time.sleep(3)
-        
-    def search_city(self):
-        """Enter the city name and submit the search."""
-        self.gui.log_output(f"Searching for facilities in {self.city}...")
-        self.gui.update_progress(f"Searching for {self.city}...")
-        
-        from selenium.webdriver.common.by import By
-        from selenium.webdriver.common.keys import Keys
-        from selenium.webdriver.support import expected_conditions as EC
-        import time
-        
-        city_input = self.wait.until(
-            EC.presence_of_element_located((By.ID, "city"))
-        )
-        
-        city_input.clear()
-        city_input.send_keys(self.city)
-        city_input.send_keys(Keys.RETURN)
-        
-        time.sleep(5)
-        
-    def scrape_results_page(self):
-        """Scrape all facilities from the current results page."""
-        self.gui.log_output("Scraping facilities from current page...")
-        
-        from selenium.webdriver.common.by import By
-        import time
-        
-        page_facilities = []
-        
+    def run_batch(self, cities, output_dir, listing_only=False, output_format='csv'):
+        """Scrape several cities with one browser session (called in a separate thread)."""
         try:
-            view_links = self.driver.find_elements(By.LINK_TEXT, "view")
-            
-            if not view_links:
-                view_links = self.driver.find_elements(By.CSS_SELECTOR, "a[href*='FacDetail']")
-            
-            facility_urls = [link.get_attribute('href') for link in view_links]
-            
-            self.gui.log_output(f"Found {len(facility_urls)} facilities on this page")
-            
-            if len(facility_urls) == 0:
-                return page_facilities
-            
-            for idx, url in enumerate(facility_urls, 1):
-                # Check if stop was requested
-                if self.gui.should_stop:
-                    self.gui.log_output("\n⚠ Scraping stopped by user")
-                    return page_facilities
-                
-                self.gui.update_progress(f"Scraping facility {idx}/{len(facility_urls)}...")
-                facility_data = self.scrape_facility_details(url)
-                if facility_data['Name']:
-                    page_facilities.append(facility_data)
-                    self.facilities.append(facility_data)
-                    self.gui.log_output(f"✓ Added: {facility_data['Name']}")
-                else:
-                    self.gui.log_output(f"✗ Failed to get name for {url}")
-                    page_facilities.append(facility_data)
-                    self.facilities.append(facility_data)
-                time.sleep(1)
+            self.update_status(f"Scraping {len(cities)} cities...")
+            self.update_progress("Initializing...")
+            self.log_output(f"Starting batch for {', '.join(cities)}...")
+            self.log_output(f"Output folder: {output_dir}")
+            self.log_output("=" * 50)
             
-            return page_facilities
+            self.scraper = ElderlyFacilityScraper(cities[0], output_dir, listing_only=listing_only,
+                                                  output_format=output_format, events=self.events)
+            if self.stopped_before_start():
+                return
+            batch = BatchScraper(self.scraper, cities, log=self.scraper.log,
+                                 should_stop=self.scraper.stop_requested.is_set)
+            batch.run()
             
+            self.log_output("=" * 50)
+            self.update_status(f"Completed! Found {len(batch.records)} unique facilities")
+            self.update_progress(f"✓ Completed - {len(batch.records)} unique facilities found")
+            self.run_on_ui(
+                messagebox.showinfo,
+                "Success",
+                f"Batch completed!\n\nFound {len(batch.records)} unique facilities in {len(cities)} cities.\n\n"
+                f"Combined data saved to: {batch.combined_filename}"
+            )
         except Exception as e:
-            self.gui.log_output(f"Error scraping results page: {e}")
-            import traceback
-            self.gui.log_output(traceback.format_exc())
-            return page_facilities
-    
-    def scrape_all_pages(self):
-        """Scrape facilities from all pages."""
-        page_num = 1
-        
-        while True:
-            # Check if stop was requested
-            if self.gui.should_stop:
-                self.gui.log_output("\n⚠ Scraping stopped by user")
-                break
-            
-            self.gui.log_output(f"\n--- Scraping page {page_num} ---")
-            self.gui.update_progress(f"Scraping page {page_num}...")
-            page_facilities = self.scrape_results_page()
-            
-            if len(page_facilities) == 0:
-                self.gui.log_output("No facilities found on this page. Stopping pagination.")
-                break
-            
-            self.append_to_csv(page_facilities, is_first_page=(page_num == 1))
-            
-            if self.has_next_page():
-                self.gui.log_output("Moving to next page...")
-                self.go_to_next_page()
-                page_num += 1
-            else:
-                self.gui.log_output("No more pages to scrape.")
-                break
-        
-        if not self.gui.should_stop:
-            self.scraping_completed = True
-    
-    def append_to_csv(self, facilities, is_first_page=False):
-        """Append facilities to CSV file after each page is scraped."""
-        if not facilities:
-            return
-        
-        import csv
-        mode = 'w' if is_first_page else 'a'
-        
-        self.gui.log_output(f"Writing {len(facilities)} facilities to {self.filename}...")
-        
-        with open(self.filename, mode, newline='', encoding='utf-8') as csvfile:
-            fieldnames = ['Name', 'Status', 'Address', 'Phone Number', 'Facility Capacity']
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-            
-            if is_first_page:
-                writer.writeheader()
-            
-            for facility in facilities:
-                writer.writerow(facility)
-        
-        self.gui.log_output(f"✓ Wrote to {self.filename}")
-    
-    def run(self):
-        """Run the complete scraping process."""
+            self.log_output(f"\n✗ Error: {e}")
+            self.update_status("Error occurred")
+            self.update_progress("✗ Error occurred")
+            self.run_on_ui(messagebox.showerror, "Error", f"An error occurred:\n\n{str(e)}")
+        finally:
+            self.run_on_ui(self.reset_controls)
+
+    def run_daemon_job(self, cities, output_dir, options):
+        """Run the job with a warm browser of the scraper daemon (called in a separate thread)."""
         try:
-            self.navigate_to_search()
-            
-            if self.gui.should_stop:
-                return
-            
-            self.search_city()
-            
-            if self.gui.should_stop:
-                return
+            self.update_status(f"Scraping {', '.join(cities)}...")
+            self.update_progress("Submitting job to the scraper daemon...")
+            self.log_output(f"Using a warm browser of the scraper daemon for {', '.join(cities)}")
+            self.log_output(f"Output folder: {output_dir}")
+            self.log_output("=" * 50)
             
-            self.scrape_all_pages()
+            summary = run_in_daemon(cities, output_dir, options, log=self.log_output,
+                                    should_stop=lambda: self.should_stop,
+                                    on_facility=lambda record: self.events.put({'facility': record}))
             
-            if self.scraping_completed:
-                self.gui.log_output(f"\n✓ Scraping completed successfully! Total facilities: {len(self.facilities)}")
-                self.gui.log_output(f"Data saved to: {self.filename}")
-            elif self.gui.should_stop:
-                if self.facilities:
-                    self.gui.log_output(f"\n⚠ Scraping stopped! Partial data ({len(self.facilities)} facilities) saved to: {self.filename}")
-        except Exception as e:
-            # Check if error is due to browser being closed (stop requested)
-            if self.gui.should_stop:
-                if self.facilities:
-                    self.gui.log_output(f"\n⚠ Scraping stopped! Partial data ({len(self.facilities)} facilities) saved to: {self.filename}")
-                else:
-                    self.gui.log_output(f"\n⚠ Scraping stopped by user")
+            self.log_output("=" * 50)
+            if summary is None:
+                self.update_status("Stopped")
+                self.update_progress("⚠ Stopped - data scraped so far was saved")
+            elif summary['error']:
+                raise RuntimeError(summary['error'])
             else:
-                self.gui.log_output(f"\n✗ ERROR: An error occurred during scraping: {e}")
-                import traceback
-                self.gui.log_output(traceback.format_exc())
+                self.update_status(f"Completed! Found {summary['facilities']} facilities")
+                self.update_progress(f"✓ Completed - {summary['facilities']} facilities found")
+                self.run_on_ui(
+                    messagebox.showinfo,
+                    "Success",
+                    f"Scraping completed!\n\nFound {summary['facilities']} facilities.\n\n"
+                    f"Data saved to: {summary['filename']}"
+                )
+        except Exception as e:
+            self.log_output(f"\n✗ Error: {e}")
+            self.update_status("Error occurred")
+            self.update_progress("✗ Error occurred")
+            self.run_on_ui(messagebox.showerror, "Error", f"An error occurred:\n\n{str(e)}")
         finally:
-            if not self.scraping_completed and not self.gui.should_stop:
-                if self.facilities:
-                    self.gui.log_output(f"\n⚠ WARNING: Scraping was interrupted! Partial data ({len(self.facilities)} facilities) saved to: {self.filename}")
-                else:
-                    self.gui.log_output(f"\n✗ ERROR: Scraping failed - no data was collected.")
-            
-            try:
-                self.gui.log_output("\nClosing browser...")
-                self.gui.update_progress("Cleaning up...")
-                self.driver.quit()
-            except:
-                pass  # Browser may already be closed
+            self.run_on_ui(self.reset_controls)
+
+
+def parse_capacity(text):
+    """The capacity typed into a filter box, or None when it is blank or not a number."""
+    try:
+        return int(text)
+    except ValueError:
+        return None
 
 
 def main():
     """Main entry point for the GUI application."""
+    # Needed by the HTML parse pool in frozen (PyInstaller) builds
+    multiprocessing.freeze_support()
     root = tk.Tk()
     app = ScraperGUI(root)
+    startup_file = os.environ.get('SCRAPER_STARTUP_FILE')
+    if startup_file:
+        # bench_startup.py: note when the window is on screen, then quit
+        root.update()
+        with open(startup_file, 'w') as f:
+            f.write(repr(time.time()))
+        root.destroy()
+        return
     root.mainloop()
 
 
@@ -0,0 +1,101 @@
+"""
+Record-and-replay archives of scraping sessions.
+A recording keeps every document the scraper loads (the search form, each results page
+and each facility detail page) with how long it took to load, so the crawl can later be
+replayed from the archive (see replay.py) with no browser or network and no waiting.
+
+An archive is a directory with two files: pages.gz, the documents as one gzip member
+each, appended as they are loaded, and manifest.jsonl, one line per document with its
+kind, URL, offset and length in pages.gz, load time and kind-specific details.
+"""
+
+import gzip
+import json
+import os
+import threading
+import time
+
+from extraction import facility_id_from_url
+
+PAGES_FILE = 'pages.gz'
+MANIFEST_FILE = 'manifest.jsonl'
+
+
+class SessionRecorder:
+    """Appends the documents of a session to an archive directory, replacing any earlier recording."""
+
+    def __init__(self, directory):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.pages = open(os.path.join(directory, PAGES_FILE), 'wb')
+        self.manifest = open(os.path.join(directory, MANIFEST_FILE), 'w', encoding='utf-8')
+        self.started = time.perf_counter()
+        self.count = 0
+        self.lock = threading.Lock()
+
+    def record(self, kind, url, html, seconds, **details):
+        """Add a document that took seconds to load; details are kept in its manifest line."""
+        raw = html.encode('utf-8')
+        # mtime=0 so the same page always compresses to the same bytes
+        data = gzip.compress(raw, mtime=0)
+        with self.lock:
+            entry = {'kind': kind, 'url': url, 'offset': self.pages.tell(), 'length': len(data),
+                     'bytes': len(raw), 'seconds': round(seconds, 4),
+                     'at': round(time.perf_counter() - self.started - seconds, 4)}
+            entry.update(details)
+            self.pages.write(data)
+            self.pages.flush()
+            # The line is only written once its document is, so an interrupted recording still replays
+            self.manifest.write(json.dumps(entry) + '\n')
+            self.manifest.flush()
+            self.count += 1
+
+    def close(self):
+        with self.lock:
+            self.pages.close()
+            self.manifest.close()
+
+
+class SessionArchive:
+    """Reads the documents of a recorded session."""
+
+    def __init__(self, directory):
+        manifest = os.path.join(directory, MANIFEST_FILE)
+        if not os.path.exists(manifest):
+            raise ValueError(f"{directory} holds no recorded session (no {MANIFEST_FILE})")
+        self.entries = []
+        with open(manifest, encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    self.entries.append(json.loads(line))
+        self.pages = open(os.path.join(directory, PAGES_FILE), 'rb')
+        self.lock = threading.Lock()
+        # Facility number -> its last detail page (a browser fallback comes after the HTTP attempt)
+        self.details = {facility_id_from_url(entry['url']): entry
+                        for entry in self.entries if entry['kind'] == 'detail'}
+
+    def document(self, entry):
+        """Return the HTML of a manifest entry."""
+        with self.lock:
+            self.pages.seek(entry['offset'])
+            data = self.pages.read(entry['length'])
+        return gzip.decompress(data).decode('utf-8')
+
+    def searches(self, city):
+        """Return the recorded searches for city, each a list of its results page entries."""
+        searches = []
+        for entry in self.entries:
+            if entry['kind'] != 'results' or entry['city'] != city:
+                continue
+            if entry['page'] == 1 or not searches:
+                searches.append([])
+            searches[-1].append(entry)
+        return searches
+
+    @property
+    def recorded_seconds(self):
+        """Wall time of the recorded session, up to its last document."""
+        return max((entry['at'] + entry['seconds'] for entry in self.entries), default=0.0)
+
+    def close(self):
+        self.pages.close()
@@ -0,0 +1,166 @@
+"""
+Output sinks for facility records.
+A sink stays open for a whole city, buffers the rows of each results page and writes
+them out in one go on flush(): as plain CSV, gzip/zstd-compressed CSV, or Parquet.
+"""
+
+import csv
+import gzip
+import io
+import os
+
+
+def row_values(row, fieldnames):
+    """Return the values of a record (or child table row) in fieldnames order.
+
+    FacilityRecords already hold their columns in FIELDNAMES order; other keys,
+    such as a record's history, are not columns of the file and are left out.
+    """
+    if getattr(row, 'columns', None) == fieldnames:
+        return row.row()
+    return [row.get(field, '') for field in fieldnames]
+
+
+class CsvSink:
+    """Buffered CSV file that keeps one writer for the whole run."""
+
+    extension = '.csv'
+
+    def __init__(self, path, fieldnames, append=False):
+        """Open path for writing; with append, rows are added after the existing ones."""
+        self.path = path
+        self.fieldnames = tuple(fieldnames)
+        exists = append and os.path.exists(path) and os.path.getsize(path) > 0
+        self.file = open(path, 'ab' if append else 'wb')
+        self.buffer = io.StringIO()
+        self.writer = csv.writer(self.buffer)
+        if not exists:
+            self.writer.writerow(self.fieldnames)
+
+    def write(self, rows):
+        """Buffer rows until the next flush()."""
+        self.writer.writerows(row_values(row, self.fieldnames) for row in rows)
+
+    def encode(self, text):
+        """Return the bytes appended to the file for a chunk of CSV text."""
+        return text.encode('utf-8')
+
+    def flush(self):
+        """Write the buffered rows and make sure they are on disk."""
+        text = self.buffer.getvalue()
+        if text:
+            self.file.write(self.encode(text))
+            self.buffer.seek(0)
+            self.buffer.truncate()
+        self.file.flush()
+        os.fsync(self.file.fileno())
+
+    def close(self):
+        """Flush and close the file."""
+        if not self.file.closed:
+            self.flush()
+            self.file.close()
+
+
+class GzipCsvSink(CsvSink):
+    """CSV compressed with gzip.
+
+    Every flush appends a complete gzip member, so the file is readable (and can
+    be truncated back to a checkpoint) after any flush; gzip readers decompress
+    the members as one stream.
+    """
+
+    extension = '.csv.gz'
+
+    def encode(self, text):
+        return gzip.compress(text.encode('utf-8'))
+
+
+class ZstdCsvSink(CsvSink):
+    """CSV compressed with Zstandard, one frame per flush like GzipCsvSink."""
+
+    extension = '.csv.zst'
+
+    def __init__(self, path, fieldnames, append=False):
+        try:
+            import zstandard
+        except ImportError:
+            raise RuntimeError("--format csv.zst requires the zstandard package (pip install zstandard)")
+        self.compressor = zstandard.ZstdCompressor(level=10)
+        super().__init__(path, fieldnames, append)
+
+    def encode(self, text):
+        return self.compressor.compress(text.encode('utf-8'))
+
+
+class ParquetSink:
+    """Columnar Parquet file written in row groups.
+
+    Rows are buffered until row_group_size of them are pending, so each row
+    group holds many results pages. The file is only valid once closed, so
+    Parquet output cannot be appended to or resumed.
+    """
+
+    extension = '.parquet'
+
+    def __init__(self, path, fieldnames, append=False, row_group_size=10000):
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError:
+            raise RuntimeError("--format parquet requires the pyarrow package (pip install pyarrow)")
+        if append:
+            raise RuntimeError("Parquet files cannot be appended to; use --format csv to resume crawls")
+        self.pyarrow = pyarrow
+        self.path = path
+        self.fieldnames = tuple(fieldnames)
+        self.row_group_size = row_group_size
+        self.schema = pyarrow.schema([(field, pyarrow.string()) for field in fieldnames])
+        self.writer = pyarrow.parquet.ParquetWriter(path, self.schema, compression='zstd')
+        self.rows = []
+
+    def write(self, rows):
+        """Buffer rows; a row group is written once enough are pending."""
+        self.rows.extend(row_values(row, self.fieldnames) for row in rows)
+        if len(self.rows) >= self.row_group_size:
+            self._write_row_group()
+
+    def _write_row_group(self):
+        if not self.rows:
+            return
+        columns = {field: [str(value) for value in column]
+                   for field, column in zip(self.fieldnames, zip(*self.rows))}
+        self.writer.write_table(self.pyarrow.Table.from_pydict(columns, schema=self.schema))
+        self.rows = []
+
+    def flush(self):
+        """Row groups are written when full or on close()."""
+
+    def close(self):
+        """Write the last row group and the file footer."""
+        if self.writer is not None:
+            self._write_row_group()
+            self.writer.close()
+            self.writer = None
+
+
+# --format name -> sink class
+SINKS = {
+    'csv': CsvSink,
+    'csv.gz': GzipCsvSink,
+    'csv.zst': ZstdCsvSink,
+    'parquet': ParquetSink,
+}
+
+
+def open_sink(output_format, path, fieldnames, append=False):
+    """Open the sink for an output format."""
+    return SINKS[output_format](path, fieldnames, append)
+
+
+def split_extension(filename):
+    """Split a sink file name into its root and its (possibly double) extension."""
+    for sink in SINKS.values():
+        if filename.endswith(sink.extension):
+            return filename[:-len(sink.extension)], sink.extension
+    return os.path.splitext(filename)
@@ -7,7 +7,8 @@ from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
 from webdriver_manager.chrome import ChromeDriverManager
 import time
-import re
+
+from extraction import extract_facility_fields
 
 chrome_options = Options()
 chrome_options.add_argument("--headless")
@@ -27,45 +28,10 @@ try:
     print("\n--- Body Text ---")
     print(body_text[:1000])
     
-    facility_data = {
-        'Name': '',
-        'Status': '',
-        'Address': '',
-        'Phone Number': '',
-        'Facility Capacity': ''
-    }
-    
-    # Extract facility name
-    name_match = re.search(r'Facility Detail\s+([^\n]+?)\s+Status:', body_text, re.DOTALL)
-    if name_match:
-        facility_data['Name'] = name_match.group(1).strip()
-        print(f"\nName: {facility_data['Name']}")
-    
-    # Extract status
-    status_match = re.search(r'Status:\s*([^\n]+)', body_text)
-    if status_match:
-        facility_data['Status'] = status_match.group(1).strip()
-        print(f"Status: {facility_data['Status']}")
-    
-    # Extract address
-    address_match = re.search(r'Address:\s*\n([^\n]+)\n([^\n]+)', body_text)
-    if address_match:
-        street = address_match.group(1).strip()
-        city_state_zip = address_match.group(2).strip()
-        facility_data['Address'] = f"{street}, {city_state_zip}"
-        print(f"Address: {facility_data['Address']}")
-    
-    # Extract phone
-    phone_match = re.search(r'Phone:\s*([^\n]+)', body_text)
-    if phone_match:
-        facility_data['Phone Number'] = phone_match.group(1).strip()
-        print(f"Phone: {facility_data['Phone Number']}")
-    
-    # Extract capacity
-    capacity_match = re.search(r'Facility Capacity:\s*(\d+)', body_text)
-    if capacity_match:
-        facility_data['Facility Capacity'] = capacity_match.group(1).strip()
-        print(f"Capacity: {facility_data['Facility Capacity']}")
+    facility_data = extract_facility_fields(body_text)
+    print()
+    for field, value in facility_data.items():
+        print(f"{field}: {value}")
     
     print("\n--- Final Data ---")
     print(facility_data)
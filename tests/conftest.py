@@ -0,0 +1,7 @@
+"""Offline tests: no Chrome and no network. Run from the repository root with python -m pytest tests."""
+
+import os
+import sys
+
+# The modules live at the top of the repository
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,97 @@
+import random
+import threading
+import time
+
+import pytest
+
+from async_engine import AsyncDetailEngine
+from concurrency import AdaptiveConcurrency
+from rate_limit import HostRateLimiter, TokenBucket
+
+
+def test_token_bucket_spaces_requests_after_a_burst():
+    bucket = TokenBucket(rate=10, capacity=2)
+    delays = [bucket.reserve() for _ in range(4)]
+    assert delays[:2] == [0.0, 0.0]
+    assert delays[2] == pytest.approx(0.1, abs=0.01)
+    assert delays[3] == pytest.approx(0.2, abs=0.01)
+
+
+def test_token_bucket_refills():
+    bucket = TokenBucket(rate=50)
+    bucket.reserve()
+    time.sleep(0.05)
+    assert bucket.reserve() == 0.0
+
+
+def test_token_bucket_needs_a_positive_rate():
+    with pytest.raises(ValueError):
+        TokenBucket(rate=0)
+
+
+def test_one_bucket_per_host():
+    limiter = HostRateLimiter(rate=5)
+    first = limiter.bucket_for('https://example.org/a')
+    assert limiter.bucket_for('https://EXAMPLE.org/b') is first
+    assert limiter.bucket_for('https://other.org/a') is not first
+
+
+def test_rate_limits_the_engine():
+    engine = AsyncDetailEngine(lambda url: url, HostRateLimiter(rate=20), max_in_flight=4)
+    start = time.perf_counter()
+    results = list(engine.iter_results([f'https://example.org/{number}' for number in range(6)]))
+    engine.close()
+    # One request at once, then one every 1/20 s
+    assert time.perf_counter() - start >= 0.2
+    assert len(results) == 6
+
+
+def tracking_fetch(delay):
+    """A fetch that sleeps a random time and records how many fetches run at once."""
+    lock = threading.Lock()
+    state = {'running': 0, 'most': 0}
+    rng = random.Random(5)
+
+    def fetch(url):
+        with lock:
+            state['running'] += 1
+            state['most'] = max(state['most'], state['running'])
+            seconds = rng.uniform(0, delay)
+        time.sleep(seconds)
+        with lock:
+            state['running'] -= 1
+        return {'url': url}
+
+    return fetch, state
+
+
+def test_results_in_input_order_with_bounded_concurrency():
+    fetch, state = tracking_fetch(0.02)
+    engine = AsyncDetailEngine(fetch, HostRateLimiter(rate=10000), max_in_flight=3)
+    urls = [f'https://example.org/{number}' for number in range(30)]
+    results = list(engine.iter_results(urls))
+    engine.close()
+    assert [url for url, record in results] == urls
+    assert [record['url'] for url, record in results] == urls
+    assert 1 < state['most'] <= 3
+
+
+def test_controller_limits_fetches_in_flight():
+    fetch, state = tracking_fetch(0.02)
+    controller = AdaptiveConcurrency(minimum=1, maximum=1, log=lambda message: None)
+    engine = AsyncDetailEngine(fetch, HostRateLimiter(rate=10000), max_in_flight=4, controller=controller)
+    list(engine.iter_results([f'https://example.org/{number}' for number in range(10)]))
+    engine.close()
+    assert state['most'] == 1
+
+
+def test_slow_consumer_holds_back_requests():
+    fetched = []
+    engine = AsyncDetailEngine(fetched.append, HostRateLimiter(rate=10000), max_in_flight=2)
+    results = engine.iter_results([f'https://example.org/{number}' for number in range(10)])
+    next(results)
+    time.sleep(0.05)
+    # The result taken plus at most max_in_flight waiting for the consumer
+    assert len(fetched) <= 3
+    results.close()
+    engine.close()
@@ -0,0 +1,73 @@
+import json
+import queue
+
+from checkpoint import CheckpointJournal
+
+
+def journal_lines(journal):
+    with open(journal.path, encoding='utf-8') as f:
+        return [json.loads(line) for line in f]
+
+
+def test_torn_last_line_is_ignored_and_cut_off(tmp_path):
+    journal = CheckpointJournal(str(tmp_path / 'roseville.csv'))
+    journal.reset()
+    journal.record_page(1, ['1', '2'], 100)
+    journal.record_page(2, ['3'], 150)
+    # A crash in the middle of writing page 3's entry
+    with open(journal.path, 'a', encoding='utf-8') as f:
+        f.write('{"page": 3, "ids": ["4"')
+
+    resumed = CheckpointJournal(str(tmp_path / 'roseville.csv'))
+    assert resumed.load()
+    assert resumed.last_page == 2
+    assert resumed.csv_bytes == 150
+    assert resumed.completed_ids == {'1', '2', '3'}
+
+    # New entries start on a line of their own
+    resumed.record_page(3, ['4'], 200)
+    assert [entry['page'] for entry in journal_lines(resumed)] == [1, 2, 3]
+
+
+def test_resume_keeps_each_facility_once(tmp_path):
+    journal = CheckpointJournal(str(tmp_path / 'roseville.csv'))
+    journal.reset()
+    journal.record_page(1, ['1', '2'], 100)
+    # A page cut short, then finished by a resumed run
+    journal.record_page(2, ['3'], 150)
+    journal.record_page(2, ['3', '4'], 180)
+
+    resumed = CheckpointJournal(str(tmp_path / 'roseville.csv'))
+    assert resumed.load()
+    assert resumed.completed_ids == {'1', '2', '3', '4'}
+    assert resumed.last_page == 2
+    assert resumed.csv_bytes == 180
+
+
+def test_resume_skips_saved_facilities(tmp_path):
+    from scraper import ElderlyFacilityScraper
+
+    scraper = ElderlyFacilityScraper('Roseville', str(tmp_path), use_cache=False, resume=True,
+                                     events=queue.SimpleQueue())
+    try:
+        scraper.journal.reset()
+        scraper.journal.record_page(1, ['100', '101'], 0)
+        assert scraper.prepare_checkpoint() == 2
+        urls = [f'/FacDetail/{facility_id}' for facility_id in ('100', '101', '102')]
+        assert scraper.pending_facility_urls(urls) == ['/FacDetail/102']
+        assert scraper.page_facility_ids == ['102']
+    finally:
+        scraper.close()
+
+
+def test_completed_crawl_is_not_resumed(tmp_path):
+    journal = CheckpointJournal(str(tmp_path / 'roseville.csv'))
+    journal.reset()
+    journal.record_page(1, ['1'], 100)
+    journal.mark_complete()
+
+    assert not CheckpointJournal(str(tmp_path / 'roseville.csv')).load()
+
+
+def test_missing_journal_is_not_resumed(tmp_path):
+    assert not CheckpointJournal(str(tmp_path / 'roseville.csv')).load()
@@ -0,0 +1,83 @@
+import pytest
+
+from concurrency import AdaptiveConcurrency
+
+
+def controller(**settings):
+    return AdaptiveConcurrency(log=lambda message: None, **settings)
+
+
+def healthy_round(concurrency, seconds=0.1):
+    for _ in range(concurrency.limit):
+        concurrency.success(seconds)
+
+
+def test_additive_increase_per_healthy_round():
+    concurrency = controller(minimum=1, maximum=4)
+    limits = []
+    for _ in range(5):
+        healthy_round(concurrency)
+        limits.append(concurrency.limit)
+    assert limits == [2, 3, 4, 4, 4]
+    assert [(old, new) for seconds, old, new, reason in concurrency.changes] == [(1, 2), (2, 3), (3, 4)]
+
+
+def test_increase_waits_for_a_full_round():
+    concurrency = controller(minimum=1, maximum=8)
+    healthy_round(concurrency)
+    healthy_round(concurrency)
+    assert concurrency.limit == 3
+    concurrency.success(0.1)
+    concurrency.success(0.1)
+    assert concurrency.limit == 3
+
+
+def test_multiplicative_decrease_on_errors():
+    concurrency = controller(minimum=1, maximum=8)
+    while concurrency.limit < 8:
+        healthy_round(concurrency)
+    # Fetches in flight at the change belong to the old limit
+    for _ in range(7):
+        concurrency.failure('timeout')
+    assert concurrency.limit == 8
+    concurrency.failure('timeout')
+    assert concurrency.limit == 4
+    assert concurrency.changes[-1][1:] == (8, 4, 'timeout')
+    for _ in range(4):
+        concurrency.failure('error')
+    assert concurrency.limit == 2
+
+
+def test_multiplicative_decrease_on_latency():
+    concurrency = controller(minimum=1, maximum=8, slow_factor=2.0)
+    while concurrency.limit < 6:
+        healthy_round(concurrency, 0.1)
+    healthy_round(concurrency, 0.5)
+    assert concurrency.limit == 3
+    assert 'median latency' in concurrency.changes[-1][3]
+
+
+def test_slow_site_at_minimum_becomes_the_baseline():
+    concurrency = controller(minimum=1, maximum=8)
+    healthy_round(concurrency, 0.1)
+    healthy_round(concurrency, 1.0)
+    assert concurrency.limit == 1
+    # The site is slow whatever we do; at the minimum that is its normal pace
+    healthy_round(concurrency, 1.0)
+    assert concurrency.limit == 2
+    assert concurrency.baseline == 1.0
+
+
+def test_never_below_minimum():
+    concurrency = controller(minimum=2, maximum=8)
+    for _ in range(10):
+        concurrency.failure('error')
+    assert concurrency.limit == 2
+    assert concurrency.changes == []
+
+
+def test_invalid_bounds():
+    with pytest.raises(ValueError):
+        AdaptiveConcurrency(minimum=0)
+    with pytest.raises(ValueError):
+        AdaptiveConcurrency(minimum=4, maximum=2)
@@ -0,0 +1,114 @@
+import json
+import os
+import socket
+import stat
+import threading
+
+import pytest
+
+import daemon
+from daemon import JobEvents, ScraperDaemon, connect, daemon_running, job_error, run_in_daemon
+from extraction import FIELDNAMES, FacilityRecord
+
+
+@pytest.fixture
+def token_file(tmp_path, monkeypatch):
+    path = str(tmp_path / 'cache' / 'daemon-token')
+    monkeypatch.setattr(daemon, 'TOKEN_FILE', path)
+    return path
+
+
+@pytest.fixture
+def server(token_file):
+    """A daemon without browsers, so only handshakes and refused jobs can be served."""
+    server = ScraperDaemon(port=0, sessions=0)
+    thread = threading.Thread(target=server.serve_forever, kwargs={'poll_interval': 0.05}, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+    thread.join()
+
+
+def port_of(server):
+    return server.server_address[1]
+
+
+def test_token_file_is_private_and_kept(token_file):
+    token = daemon.create_token()
+    assert len(token) == 64
+    assert stat.S_IMODE(os.stat(token_file).st_mode) == 0o600
+    assert daemon.create_token() == token
+    assert daemon.read_token() == token
+
+
+def test_missing_token_reads_blank(token_file):
+    assert daemon.read_token() == ''
+
+
+def test_daemon_running(server):
+    assert daemon_running(port_of(server))
+
+
+def test_nothing_listening(token_file):
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        port = sock.getsockname()[1]
+    assert not daemon_running(port)
+
+
+def test_wrong_token_is_rejected(server, token_file):
+    with open(token_file, 'w', encoding='ascii') as f:
+        f.write('0' * 64)
+    assert not daemon_running(port_of(server))
+    with pytest.raises(ConnectionError, match='Wrong daemon token'):
+        connect(port_of(server))
+
+
+def test_other_protocol_version_is_rejected(server):
+    with socket.create_connection(('127.0.0.1', port_of(server)), timeout=5) as sock:
+        hello = {'hello': daemon.PROTOCOL_VERSION + 1, 'token': server.token}
+        sock.sendall(json.dumps(hello).encode('utf-8') + b'\n')
+        with sock.makefile('r', encoding='utf-8') as reader:
+            reply = json.loads(reader.readline())
+            assert 'Unsupported protocol version' in reply['error']
+            assert reader.readline() == ''
+
+
+@pytest.mark.parametrize('cities, options, error', [
+    ([], {}, "non-empty list"),
+    (['Roseville', ' '], {}, "non-empty list"),
+    (['Roseville'], {'driver': 'x'}, "cannot set: driver"),
+    (['Roseville', 'Davis'], {'resume': True}, "single city"),
+    (['Roseville'], {'resume': True, 'output_format': 'parquet'}, "Parquet"),
+    (['Roseville'], {'delta': True}, "--db"),
+])
+def test_refused_jobs_are_answered_with_an_error(server, tmp_path, cities, options, error):
+    logged = []
+    summary = run_in_daemon(cities, str(tmp_path), options, port=port_of(server), log=logged.append)
+    assert error in summary['error']
+    assert summary['facilities'] == 0
+    assert not summary['completed']
+    assert logged == []
+
+
+def test_job_shape():
+    assert job_error({'cities': 'Roseville'})
+    assert job_error({'cities': ['Roseville'], 'output_dir': 3})
+    assert job_error({'cities': ['Roseville'], 'options': ['resume']})
+    assert job_error({'cities': ['Roseville'], 'output_dir': None, 'options': {'rate': 2.0}}) is None
+
+
+def test_job_events_forward_facilities_and_logs():
+    sent = []
+    events = JobEvents(sent.append)
+    facility_data = FacilityRecord(Name='SUNNY HOME')
+    facility_data['History'] = {'visits': []}
+    events.put({'log': 'Searching...'})
+    events.put({'progress': 'Page 1'})
+    events.put({'facility': facility_data})
+    assert sent[0] == {'log': 'Searching...'}
+    assert list(sent[1]['facility']) == FIELDNAMES
+    assert sent[1]['facility']['Name'] == 'SUNNY HOME'
+    assert len(sent) == 2
+    json.dumps(sent)
@@ -0,0 +1,69 @@
+from delta import listing_changed, merge_listing, plan_delta, summarize_plan
+from extraction import FacilityRecord
+
+NOW = 1_000_000.0
+HOUR = 3600
+
+
+def listing(facility_id, name='CARE HOME', status='Licensed', address='100 MAIN ST, CA 95661'):
+    return FacilityRecord({'Facility Number': facility_id, 'Name': name, 'Status': status, 'Address': address})
+
+
+def detail(facility_id, **values):
+    record = listing(facility_id, address='100 MAIN ST, ROSEVILLE, CA 95661')
+    record.update({'Phone Number': '(916) 555-0100', 'Facility Capacity': '6', 'Licensee Name': 'LICENSEE'})
+    record.update(values)
+    return record
+
+
+def test_listing_compares_street_only():
+    stored = detail('1')
+    assert not listing_changed(listing('1'), stored)
+    assert not listing_changed(listing('1', name='', status=''), stored)
+    assert listing_changed(listing('1', status='Closed'), stored)
+    assert listing_changed(listing('1', address='200 OAK AVE, CA 95661'), stored)
+
+
+def test_plan_delta_reasons():
+    listings = [(f'/FacDetail/{facility_id}', listing(facility_id)) for facility_id in '123456']
+    stored = {
+        '2': (detail('2'), NOW - HOUR, False),
+        '3': (detail('3', Status='Pending'), NOW - HOUR, False),
+        '4': (detail('4'), NOW - HOUR, True),
+        '5': (detail('5'), NOW - 100 * HOUR, False),
+        '6': (listing('6'), NOW - HOUR, False),
+    }
+    plan = plan_delta(listings, stored, stale_after_hours=24, now=NOW)
+
+    assert plan.reasons == {'1': 'new', '3': 'changed', '4': 'reappeared', '5': 'stale', '6': 'incomplete'}
+    assert [record['Facility Number'] for record in plan.reused] == ['2']
+    assert 'fetching 5 of 6' in summarize_plan(plan)
+
+
+def test_plan_delta_fetches_stalest_first():
+    listings = [(f'/FacDetail/{facility_id}', listing(facility_id)) for facility_id in '123']
+    stored = {
+        '1': (detail('1'), NOW - 50 * HOUR, False),
+        '2': (detail('2'), NOW - 90 * HOUR, False),
+        '3': (listing('3'), None, False),
+    }
+    plan = plan_delta(listings, stored, stale_after_hours=24, now=NOW)
+    # Never fetched before anything fetched long ago
+    assert plan.urls == ['/FacDetail/3', '/FacDetail/2', '/FacDetail/1']
+
+
+def test_record_missing_some_detail_fields_is_reused():
+    stored = {'1': (detail('1', **{'Phone Number': ''}), NOW - HOUR, False)}
+    plan = plan_delta([('/FacDetail/1', listing('1'))], stored, stale_after_hours=24, now=NOW)
+    assert plan.urls == []
+
+
+def test_merge_listing_prefers_detail_values():
+    fetched = detail('1', **{'Name': ''})
+    fetched['History'] = {'visits': []}
+    merged = merge_listing(listing('1', name='LISTED NAME'), fetched)
+
+    assert merged['Address'] == '100 MAIN ST, ROSEVILLE, CA 95661'
+    assert merged['Name'] == 'LISTED NAME'
+    assert merged['Facility Capacity'] == '6'
+    assert merged['History'] == {'visits': []}
@@ -0,0 +1,71 @@
+import os
+
+from extraction import (
+    detail_only_columns, extract_facility_fields, facility_id_from_url, html_to_text,
+    normalize_facility_url, parse_facility_html, parse_results_table,
+)
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def read_page(name):
+    with open(os.path.join(REPO, name), encoding='utf-8') as f:
+        return f.read()
+
+
+def test_detail_page_fields():
+    record = parse_facility_html(read_page('facility_detail.html'))
+    assert dict(record) == {
+        'Name': '7184LUDLOW HOME CARE',
+        'Status': 'Pending',
+        'Address': '7184 LUDLOW DR, ROSEVILLE, CA 95747',
+        'Phone Number': '(916) 707-8149',
+        'Facility Capacity': '6',
+        'Facility Number': '315920367',
+        'Licensee Name': 'LVN 7184 LUDLOW',
+        'Facility Type': 'RESIDENTIAL CARE ELDERLY',
+        'License Date': 'Not licensed yet.',
+    }
+
+
+def test_missing_fields_are_blank():
+    record = extract_facility_fields("Facility Detail\nSUNNY HOME\nStatus: Licensed\nFacility Number: 123")
+    assert record['Name'] == 'SUNNY HOME'
+    assert record['Status'] == 'Licensed'
+    assert record['Facility Number'] == '123'
+    assert record['Phone Number'] == ''
+    assert record['Address'] == ''
+
+
+def test_hidden_elements_are_not_text():
+    html = ('<html><head><title>t</title><script>x()</script></head><body>'
+            '<div>Phone:</div><div class="ng-hide">(000) 000-0000</div>'
+            '<div style="display: none">hidden</div><div>(916) 555-0100</div></body></html>')
+    assert html_to_text(html) == 'Phone:\n(916) 555-0100'
+
+
+def test_results_table_rows():
+    listings = parse_results_table(read_page('results_page_source.html'))
+    assert len(listings) == 10
+    url, record = listings[0]
+    assert url == '/FacDetail/315920367'
+    assert record['Name'] == '7184LUDLOW HOME CARE'
+    assert record['Status'] == 'Pending'
+    assert record['Facility Number'] == '315920367'
+    assert record['Address'] == '7184 LUDLOW DR, CA 95747'
+    assert all(record[column] == '' for column in detail_only_columns())
+
+
+def test_detail_only_columns():
+    assert detail_only_columns() == [
+        'Phone Number', 'Facility Capacity', 'Licensee Name', 'Facility Type', 'License Date']
+
+
+def test_facility_urls():
+    base_url = 'https://www.ccld.dss.ca.gov'
+    assert normalize_facility_url('/FacDetail/315920367', base_url) == \
+        f'{base_url}/carefacilitysearch/FacDetail/315920367'
+    assert normalize_facility_url(f'{base_url}/FacDetail/315920367', base_url) == \
+        f'{base_url}/carefacilitysearch/FacDetail/315920367'
+    assert facility_id_from_url(f'{base_url}/carefacilitysearch/FacDetail/315920367') == '315920367'
+    assert facility_id_from_url(None) is None
@@ -0,0 +1,89 @@
+import pickle
+
+import pytest
+
+import extraction
+from extraction import FIELDNAMES, FacilityRecord, extract_facility_fields, register_field
+
+
+@pytest.fixture
+def restore_fields():
+    """Undo fields a test registers, so the other tests see the module's own columns."""
+    saved = (list(extraction.FIELDS), list(FIELDNAMES), FacilityRecord.columns,
+             FacilityRecord._extra_columns, FacilityRecord._repeated)
+    yield
+    fields, fieldnames, columns, extra_columns, repeated = saved
+    extraction.FIELDS[:] = fields
+    FIELDNAMES[:] = fieldnames
+    FacilityRecord.columns = columns
+    FacilityRecord._extra_columns = extra_columns
+    FacilityRecord._repeated = repeated
+    extraction._patterns = None
+
+
+def test_reads_and_writes_like_a_dict():
+    record = FacilityRecord({'Name': 'SUNNY HOME', 'Status': 'Licensed'})
+    assert record['Name'] == 'SUNNY HOME'
+    assert record['Phone Number'] == ''
+    assert record.get('Missing', 'default') == 'default'
+    assert list(record) == FIELDNAMES
+    assert len(record) == len(FIELDNAMES)
+    assert record.row() == tuple(record[column] for column in FIELDNAMES)
+    with pytest.raises(KeyError):
+        record['Missing'] = 'value'
+
+
+def test_history_is_present_only_once_set():
+    record = FacilityRecord()
+    assert 'History' not in record
+    record['History'] = {'visits': []}
+    assert 'History' in record
+    assert list(record)[-1] == 'History'
+    del record['History']
+    assert 'History' not in record
+    with pytest.raises(KeyError):
+        del record['History']
+
+
+def test_repeated_columns_are_interned():
+    status = ''.join(['Lic', 'ensed'])
+    first = FacilityRecord(Status=status)
+    second = FacilityRecord(Status='Licensed')
+    assert first['Status'] is second['Status']
+
+
+def test_pickles_with_history():
+    record = FacilityRecord(Name='SUNNY HOME', Status='Licensed')
+    record['History'] = {'visits': [{'Date': '01/02/2024'}]}
+    copy = pickle.loads(pickle.dumps(record))
+    assert dict(copy) == dict(record)
+    assert copy['Status'] is record['Status']
+
+
+def test_from_dict_drops_unknown_keys():
+    record = FacilityRecord.from_dict({'Name': 'SUNNY HOME', 'Retired Column': 'x'})
+    assert record['Name'] == 'SUNNY HOME'
+    assert 'Retired Column' not in record
+
+
+def test_register_field_after_the_class(restore_fields):
+    register_field('Email', 'Email:', r'\s*([^\n]+)')
+    register_field('County', 'County:', r'\s*([^\n]+)', repeated=True)
+    assert FIELDNAMES[-2:] == ['Email', 'County']
+
+    record = extract_facility_fields("Facility Number: 123\nEmail: home@example.com\nCounty: PLACER")
+    assert record['Email'] == 'home@example.com'
+    assert record['County'] == 'PLACER'
+    assert list(record) == FIELDNAMES
+    assert record.row()[-2:] == ('home@example.com', 'PLACER')
+    assert FacilityRecord(County=''.join(['PLA', 'CER']))['County'] is record['County']
+    assert dict(pickle.loads(pickle.dumps(record))) == dict(record)
+
+    blank = FacilityRecord()
+    assert blank['Email'] == ''
+    assert blank.extra is None
+
+
+def test_duplicate_column_is_rejected(restore_fields):
+    with pytest.raises(ValueError):
+        register_field('Name', 'Name:', r'\s*([^\n]+)')
@@ -0,0 +1,126 @@
+import json
+
+import pytest
+
+from extraction import FacilityRecord
+from facility_store import FacilityStore
+
+
+def record(facility_id, status='Licensed', capacity='6', **values):
+    facility_data = FacilityRecord({
+        'Facility Number': facility_id, 'Name': f'CARE HOME {facility_id}', 'Status': status,
+        'Address': '100 MAIN ST, ROSEVILLE, CA 95661', 'Phone Number': '(916) 555-0100',
+        'Facility Capacity': capacity, 'Licensee Name': 'LICENSEE',
+    })
+    facility_data.update(values)
+    return facility_data
+
+
+def listing(facility_id, status='Licensed'):
+    """A record as --listing-only reads it from the results table."""
+    return FacilityRecord({'Facility Number': facility_id, 'Name': f'CARE HOME {facility_id}',
+                           'Status': status, 'Address': '100 MAIN ST, CA 95661'})
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = FacilityStore(str(tmp_path / 'facilities.sqlite3'))
+    yield store
+    store.close()
+
+
+def changes(store, run_id):
+    return sorted(store.conn.execute(
+        "SELECT facility_id, change, old_value, new_value FROM changes WHERE run_id = ?", (run_id,)
+    ).fetchall())
+
+
+def stored_row(store, facility_id):
+    return store.conn.execute(
+        "SELECT status, capacity, record, fetched_at FROM facilities WHERE facility_id = ?", (facility_id,)
+    ).fetchone()
+
+
+def test_new_facilities(store):
+    run = store.start_run('Roseville')
+    store.upsert(run, 'Roseville', [record('1'), record('2'), record('')])
+    assert changes(store, run) == [('1', 'new', None, 'Licensed'), ('2', 'new', None, 'Licensed')]
+
+
+def test_status_and_capacity_changes(store):
+    first = store.start_run('Roseville')
+    store.upsert(first, 'Roseville', [record('1'), record('2'), record('3')])
+    store.finish_run(first, 'Roseville')
+
+    second = store.start_run('Roseville')
+    store.upsert(second, 'Roseville', [record('1', status='Closed'), record('2', capacity='12'),
+                                       record('3', status='Pending')])
+    assert changes(store, second) == [
+        ('1', 'closed', 'Licensed', 'Closed'),
+        ('2', 'capacity_changed', '6', '12'),
+        ('3', 'status_changed', 'Licensed', 'Pending'),
+    ]
+    assert stored_row(store, '2')[1] == 12
+
+
+def test_unlisted_facility_closes_and_reappears(store):
+    first = store.start_run('Roseville')
+    store.upsert(first, 'Roseville', [record('1'), record('2')])
+    store.finish_run(first, 'Roseville')
+
+    second = store.start_run('Roseville')
+    store.upsert(second, 'Roseville', [record('1')])
+    store.finish_run(second, 'Roseville')
+    assert changes(store, second) == [('2', 'closed', 'Licensed', 'no longer listed')]
+    assert store.stored_facilities(['2'])['2'][2]
+
+    third = store.start_run('Roseville')
+    store.upsert(third, 'Roseville', [record('1'), record('2')])
+    assert changes(store, third) == [('2', 'reappeared', None, 'Licensed')]
+    assert not store.stored_facilities(['2'])['2'][2]
+
+
+def test_listing_only_upsert_keeps_stored_details(store):
+    first = store.start_run('Roseville')
+    store.upsert(first, 'Roseville', [record('1')])
+    fetched_at = stored_row(store, '1')[3]
+
+    second = store.start_run('Roseville')
+    store.upsert(second, 'Roseville', [listing('1', status='Pending')], fetched=set())
+
+    status, capacity, stored, second_fetched_at = stored_row(store, '1')
+    stored = json.loads(stored)
+    assert status == 'Pending' and stored['Status'] == 'Pending'
+    assert capacity == 6 and stored['Facility Capacity'] == '6'
+    assert stored['Phone Number'] == '(916) 555-0100'
+    assert stored['Licensee Name'] == 'LICENSEE'
+    assert stored['Address'] == '100 MAIN ST, ROSEVILLE, CA 95661'
+    assert second_fetched_at == fetched_at
+    # The blank capacity is not a change
+    assert changes(store, second) == [('1', 'status_changed', 'Licensed', 'Pending')]
+
+
+def test_listing_only_upsert_of_new_facility(store):
+    run = store.start_run('Roseville')
+    store.upsert(run, 'Roseville', [listing('1')], fetched=set())
+    status, capacity, stored, fetched_at = stored_row(store, '1')
+    assert capacity is None and fetched_at is None
+    assert json.loads(stored)['Address'] == '100 MAIN ST, CA 95661'
+
+
+def test_fetched_record_replaces_stored_one(store):
+    first = store.start_run('Roseville')
+    store.upsert(first, 'Roseville', [record('1')])
+    second = store.start_run('Roseville')
+    store.upsert(second, 'Roseville', [record('1', **{'Phone Number': '(916) 555-0199'})], fetched={'1'})
+
+    stored, fetched_at, missing = store.stored_facilities(['1'])['1']
+    assert stored['Phone Number'] == '(916) 555-0199'
+    assert fetched_at is not None and not missing
+
+
+def test_resumed_run_continues(store):
+    run = store.start_run('Roseville')
+    assert store.start_run('Roseville', resume=True) == run
+    store.finish_run(run, 'Roseville')
+    assert store.start_run('Roseville', resume=True) != run
@@ -0,0 +1,91 @@
+import json
+
+import pytest
+
+import fetch_cache
+from fetch_cache import FacilityCache
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(fetch_cache.time, 'time', clock.time)
+    return clock
+
+
+def record(facility_id, padding=0):
+    return {'Facility Number': facility_id, 'Name': 'CARE HOME', 'Notes': 'x' * padding}
+
+
+def test_hit_and_miss(tmp_path, clock):
+    cache = FacilityCache(str(tmp_path))
+    cache.put('1', record('1'))
+    assert cache.get('1') == record('1')
+    assert cache.get('2') is None
+    assert cache.get(None) is None
+    assert (cache.hits, cache.misses) == (1, 1)
+    cache.close()
+
+
+def test_entries_expire_after_the_ttl(tmp_path, clock):
+    cache = FacilityCache(str(tmp_path), ttl_hours=1)
+    cache.put('1', record('1'))
+    clock.now += 3599
+    assert cache.get('1') is not None
+    clock.now += 2
+    assert cache.get('1') is None
+    cache.close()
+
+
+def test_expired_entries_are_dropped_on_open(tmp_path, clock):
+    cache = FacilityCache(str(tmp_path), ttl_hours=1)
+    cache.put('1', record('1'))
+    cache.close()
+    clock.now += 7200
+    cache = FacilityCache(str(tmp_path), ttl_hours=1)
+    assert cache.total_bytes == 0
+    cache.close()
+
+
+def test_persists_between_runs(tmp_path, clock):
+    cache = FacilityCache(str(tmp_path))
+    cache.put('1', record('1'))
+    cache.close()
+    cache = FacilityCache(str(tmp_path))
+    assert cache.get('1') == record('1')
+    cache.close()
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path, clock):
+    # Room for about four records of 1 kB
+    cache = FacilityCache(str(tmp_path), max_mb=4.5 / 1024)
+    for facility_id in '1234':
+        clock.now += 1
+        cache.put(facility_id, record(facility_id, 1000))
+    clock.now += 1
+    assert cache.get('1') is not None
+    clock.now += 1
+    cache.put('5', record('5', 1000))
+
+    # Evicted down to 90% of the cap, oldest access first
+    assert cache.get('2') is None
+    assert cache.get('3') is None
+    assert [facility_id for facility_id in '145' if cache.get(facility_id)] == ['1', '4', '5']
+    assert cache.total_bytes <= cache.max_bytes
+    cache.close()
+
+
+def test_replacing_an_entry_keeps_the_size_right(tmp_path, clock):
+    cache = FacilityCache(str(tmp_path))
+    cache.put('1', record('1', 1000))
+    cache.put('1', record('1', 10))
+    assert cache.total_bytes == len(json.dumps(record('1', 10)))
+    cache.close()
@@ -0,0 +1,63 @@
+from extraction import FacilityRecord
+from history import HISTORY_TABLES, history_filename, history_rows, normalize_history
+
+HISTORY = {
+    'inspections': [{'date': '03/14/2023', 'report': True}, {'date': 'No Visit Information', 'report': False}],
+    'other_visits': [{'date': '11/02/2022', 'report': False}],
+    'complaints': [{
+        'completed': '05/01/2023', 'substantiated': 1, 'inconclusive': -1, 'unsubstantiated': 0,
+        'unfounded': None, 'type_a': '2 ', 'type_b': 0,
+        'visits': [{'date': '04/20/2023', 'report': True}, {'date': '04/27/2023', 'report': False}],
+    }],
+    'citations': {'Inspections': [0, 1], 'Total': [-1, None]},
+}
+
+
+def test_empty_history_has_every_table():
+    assert normalize_history('123', None) == {table: [] for table in HISTORY_TABLES}
+
+
+def test_visits_skip_placeholders():
+    visits = normalize_history('123', HISTORY)['visits']
+    assert [(row['Visit Type'], row['Visit Date'], row['Complaint Completed'], row['Report Available'])
+            for row in visits] == [
+        ('Inspection', '03/14/2023', '', 'Yes'),
+        ('Other', '11/02/2022', '', 'No'),
+        ('Complaint', '04/20/2023', '05/01/2023', 'Yes'),
+        ('Complaint', '04/27/2023', '05/01/2023', 'No'),
+    ]
+    assert all(row['Facility Number'] == '123' for row in visits)
+
+
+def test_complaints_and_citations():
+    tables = normalize_history('123', HISTORY)
+    assert tables['complaints'] == [{
+        'Facility Number': '123', 'Complaint Completed': '05/01/2023',
+        'Allegations Substantiated': '1', 'Allegations Inconclusive': '',
+        'Allegations Unsubstantiated': '0', 'Allegations Unfounded': '',
+        'Type A Citations': '2', 'Type B Citations': '0', 'Visits': 2,
+    }]
+    assert tables['citations'] == [
+        {'Facility Number': '123', 'Source': 'Inspections', 'Type A Citations': '0', 'Type B Citations': '1'},
+        {'Facility Number': '123', 'Source': 'Total', 'Type A Citations': '', 'Type B Citations': ''},
+    ]
+
+
+def test_rows_use_the_table_columns():
+    for table, rows in normalize_history('123', HISTORY).items():
+        for row in rows:
+            assert list(row) == HISTORY_TABLES[table]
+
+
+def test_history_rows_skip_facilities_without_history():
+    with_history = FacilityRecord({'Facility Number': '123'})
+    with_history['History'] = normalize_history('123', HISTORY)
+    without_history = FacilityRecord({'Facility Number': '456'})
+    assert len(history_rows([with_history, without_history], 'visits')) == 4
+    assert history_rows([without_history], 'citations') == []
+
+
+def test_history_filename():
+    assert history_filename('roseville-elderly-facilities.csv', 'visits') == \
+        'roseville-elderly-facilities-visits.csv'
+    assert history_filename('roseville.csv.gz', 'complaints') == 'roseville-complaints.csv.gz'
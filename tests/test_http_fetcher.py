@@ -0,0 +1,103 @@
+import queue
+
+import pytest
+
+from http_fetcher import DetailFetchError, HttpDetailFetcher
+from mock_ccld import MockCCLDServer
+
+FIRST_FACILITY = '300000000'
+
+
+@pytest.fixture(scope='module')
+def server():
+    server = MockCCLDServer(0, facilities=20)
+    server.start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def site(server):
+    server.error_rate = 0.0
+    server.stats.clear()
+    return server
+
+
+def detail_url(site, facility_id=FIRST_FACILITY):
+    return f"{site.base_url}/carefacilitysearch/FacDetail/{facility_id}"
+
+
+@pytest.fixture
+def fetcher():
+    errors = []
+    messages = []
+    # One retry, which urllib3 makes without a backoff sleep
+    fetcher = HttpDetailFetcher(retries=1, on_error=errors.append, log=messages.append)
+    fetcher.errors = errors
+    fetcher.messages = messages
+    yield fetcher
+    fetcher.close()
+
+
+def test_detail_page(site, fetcher):
+    facility_data = fetcher.fetch_facility(detail_url(site))
+    assert facility_data['Facility Number'] == FIRST_FACILITY
+    assert facility_data['Name'] and facility_data['Status'] and facility_data['Facility Capacity']
+    assert fetcher.errors == [] and fetcher.messages == []
+
+
+def test_error_responses_are_retried_then_raised(site, fetcher):
+    site.error_rate = 1.0
+    url = detail_url(site)
+    with pytest.raises(DetailFetchError):
+        fetcher.fetch_facility(url)
+    assert site.stats['errors'] == 2
+    assert fetcher.errors == [url]
+    assert len(fetcher.messages) == 1 and url in fetcher.messages[0]
+
+
+def test_missing_page_is_a_failed_fetch(site, fetcher):
+    with pytest.raises(DetailFetchError):
+        fetcher.fetch_facility(detail_url(site, '399999999'))
+    assert 'returned 404' in fetcher.messages[0]
+
+
+def test_page_without_fields(site, fetcher):
+    # A page that loads but has no facility fields, like one that renders them with JavaScript
+    assert fetcher.fetch_facility(f"{site.base_url}/carefacilitysearch") is None
+    assert fetcher.errors == []
+
+
+def http_scraper(tmp_path, site):
+    from scraper import ElderlyFacilityScraper
+
+    return ElderlyFacilityScraper('Roseville', str(tmp_path), engine='http', base_url=site.base_url,
+                                  use_cache=False, parse_workers=0, events=queue.SimpleQueue())
+
+
+def test_failed_fetch_does_not_fall_back_to_the_browser(tmp_path, site, monkeypatch):
+    site.error_rate = 1.0
+    scraper = http_scraper(tmp_path, site)
+    monkeypatch.setattr(scraper.http_fetcher, 'http', HttpDetailFetcher(retries=0).http)
+    monkeypatch.setattr(scraper, 'load_facility_page', lambda *args: pytest.fail('fell back to the browser'))
+    try:
+        facility_data = scraper.download_facility_details(detail_url(site))
+        assert not facility_data['Name']
+        assert scraper.metrics.counters['detail_failures'] == 1
+        assert scraper.metrics.counters['browser_fallbacks'] == 0
+        assert scraper.detail_ids == set()
+    finally:
+        scraper.close()
+
+
+def test_page_without_fields_falls_back_to_the_browser(tmp_path, site, monkeypatch):
+    scraper = http_scraper(tmp_path, site)
+    loaded = []
+    monkeypatch.setattr(scraper.http_fetcher, 'fetch_facility', lambda url: None)
+    monkeypatch.setattr(scraper, 'load_facility_page', lambda url, driver=None: loaded.append(url) or (None, None))
+    try:
+        scraper.download_facility_details(detail_url(site))
+        assert loaded == [detail_url(site)]
+        assert scraper.metrics.counters['browser_fallbacks'] == 1
+    finally:
+        scraper.close()
@@ -0,0 +1,103 @@
+import json
+import threading
+
+import pytest
+
+from metrics import Metrics, MetricsExporter, quantile
+
+
+def metrics_with_details():
+    metrics = Metrics()
+    for milliseconds in range(1, 101):
+        metrics.observe('detail', milliseconds / 1000)
+    metrics.observe('search', 2.0)
+    metrics.count('facilities', 100)
+    metrics.count('cache_hits')
+    return metrics
+
+
+def test_quantile_nearest_rank():
+    ordered = list(range(1, 101))
+    assert quantile(ordered, 0.5) == 51
+    assert quantile(ordered, 0.99) == 100
+    assert quantile([7], 0.95) == 7
+
+
+def test_summaries():
+    summary = metrics_with_details().summaries()['detail']
+    assert summary['count'] == 100
+    assert summary['total'] == pytest.approx(5.05)
+    assert summary['mean'] == pytest.approx(0.0505)
+    assert (summary['p50'], summary['p95'], summary['p99'], summary['max']) == (0.051, 0.096, 0.1, 0.1)
+
+
+def test_span_records_on_error():
+    metrics = Metrics()
+    with pytest.raises(ValueError):
+        with metrics.span('search'):
+            raise ValueError
+    assert metrics.summaries()['search']['count'] == 1
+
+
+def test_updates_from_threads():
+    metrics = Metrics()
+
+    def work():
+        for _ in range(1000):
+            metrics.observe('detail', 0.001)
+            metrics.count('facilities')
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert metrics.summaries()['detail']['count'] == 4000
+    assert metrics.counters['facilities'] == 4000
+
+
+def test_profile_lists_the_largest_total_first():
+    lines = metrics_with_details().format_profile().splitlines()
+    assert lines[0].startswith('Profile (')
+    assert lines[2].split()[:2] == ['detail', '100']
+    assert lines[3].split()[:2] == ['search', '1']
+    assert lines[-1] == '  cache_hits=1, facilities=100'
+
+
+def test_prometheus_format():
+    text = metrics_with_details().to_prometheus()
+    lines = text.splitlines()
+    assert 'scraper_phase_seconds{phase="detail",quantile="0.95"} 0.096000' in lines
+    assert 'scraper_phase_seconds_sum{phase="detail"} 5.050000' in lines
+    assert 'scraper_phase_seconds_count{phase="search"} 1' in lines
+    assert 'scraper_facilities_total 100' in lines
+    assert text.endswith('\n')
+
+
+@pytest.mark.parametrize('name', ['metrics.json', 'metrics.prom'])
+def test_exporter_writes_on_close(tmp_path, name):
+    path = tmp_path / name
+    exporter = MetricsExporter(metrics_with_details(), str(path), interval=60)
+    exporter.close()
+    content = path.read_text()
+    if name.endswith('.json'):
+        assert json.loads(content)['counters'] == {'facilities': 100, 'cache_hits': 1}
+    else:
+        assert 'scraper_cache_hits_total 1' in content
+    assert not (tmp_path / f'{name}.tmp').exists()
+
+
+def test_exporter_rewrites_periodically(tmp_path):
+    path = tmp_path / 'metrics.json'
+    metrics = Metrics()
+    exporter = MetricsExporter(metrics, str(path), interval=0.01)
+    metrics.count('facilities', 5)
+    try:
+        for _ in range(200):
+            if path.exists() and json.loads(path.read_text())['counters'].get('facilities') == 5:
+                break
+            threading.Event().wait(0.01)
+        else:
+            pytest.fail('metrics file was not rewritten')
+    finally:
+        exporter.close()
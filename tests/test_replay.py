@@ -0,0 +1,82 @@
+import csv
+import queue
+
+import pytest
+
+from mock_ccld import MockSite
+from replay import ReplayScraper
+from session_archive import SessionArchive, SessionRecorder
+
+BASE_URL = 'https://www.ccld.dss.ca.gov/carefacilitysearch'
+
+
+def detail_url(facility_number):
+    return f"{BASE_URL}/FacDetail/{facility_number}"
+
+
+@pytest.fixture
+def archive_dir(tmp_path):
+    """A recorded Roseville crawl of the stand-in site: 15 facilities over two results pages."""
+    site = MockSite(facilities=15, page_size=10)
+    recorder = SessionRecorder(str(tmp_path / 'session'))
+    recorder.record('search', BASE_URL, site.search, 1.0)
+    for page in (1, 2):
+        numbers = [str(300000000 + index) for index in range((page - 1) * 10, min(page * 10, 15))]
+        recorder.record('results', f"{BASE_URL}/results?page={page}", site.results_page('Roseville', page), 0.5,
+                        city='Roseville', page=page, facility_urls=[detail_url(number) for number in numbers])
+        for number in numbers:
+            recorder.record('detail', detail_url(number), site.detail_page(number), 0.2, engine='http')
+    recorder.close()
+    return str(tmp_path / 'session')
+
+
+def test_archive_reads_back_documents(archive_dir):
+    archive = SessionArchive(archive_dir)
+    try:
+        assert [entry['kind'] for entry in archive.entries[:3]] == ['search', 'results', 'detail']
+        assert len(archive.details) == 15
+        assert 'MOCK CARE HOME 14' in archive.document(archive.details['300000014'])
+        assert [[entry['page'] for entry in search] for search in archive.searches('Roseville')] == [[1, 2]]
+        assert archive.searches('Sacramento') == []
+    finally:
+        archive.close()
+
+
+def test_interrupted_recording_still_reads(archive_dir):
+    # Stopped after the first results page and its details
+    manifest = f"{archive_dir}/manifest.jsonl"
+    with open(manifest, encoding='utf-8') as f:
+        lines = f.readlines()
+    with open(manifest, 'w', encoding='utf-8') as f:
+        f.writelines(lines[:12])
+    archive = SessionArchive(archive_dir)
+    try:
+        assert len(archive.details) == 10
+        assert 'MOCK CARE HOME 9' in archive.document(archive.details['300000009'])
+    finally:
+        archive.close()
+
+
+def test_missing_recording_is_an_error(tmp_path):
+    with pytest.raises(ValueError):
+        SessionArchive(str(tmp_path))
+
+
+def test_replay_writes_every_recorded_facility(archive_dir, tmp_path):
+    events = queue.SimpleQueue()
+    scraper = ReplayScraper('Roseville', archive_dir, str(tmp_path / 'out'), parse_workers=0, events=events)
+    scraper.run()
+    assert scraper.scraping_completed
+    with open(scraper.filename, newline='', encoding='utf-8') as f:
+        rows = list(csv.DictReader(f))
+    assert [row['Facility Number'] for row in rows] == [str(300000000 + index) for index in range(15)]
+    assert rows[14]['Name'] == 'MOCK CARE HOME 14'
+    assert rows[14]['Phone Number'] == '(916) 555-0014'
+
+
+def test_replay_never_starts_a_browser(archive_dir, tmp_path):
+    scraper = ReplayScraper('Roseville', archive_dir, str(tmp_path / 'out'), parse_workers=0,
+                            events=queue.SimpleQueue())
+    with pytest.raises(RuntimeError):
+        scraper.create_driver()
+    scraper.close()
@@ -0,0 +1,78 @@
+import itertools
+import random
+
+import pytest
+
+from results_grid import NO_CAPACITY, ResultStore, ResultView
+
+STATUSES = ['Licensed', 'Pending', 'Closed']
+
+
+def records(count, seed=7):
+    rng = random.Random(seed)
+    return [{'Facility Number': str(number), 'Name': f'HOME {number}', 'Status': rng.choice(STATUSES),
+             'Facility Capacity': '' if rng.random() < 0.1 else str(rng.randint(1, 30))}
+            for number in range(count)]
+
+
+def expected_rows(store, status, min_capacity, max_capacity, sort, descending):
+    """The rows a view should show, by filtering and sorting every row."""
+    rows = []
+    for row in range(len(store)):
+        capacity = store.capacities[row]
+        if status is not None and store.statuses[row] != status:
+            continue
+        if min_capacity is not None or max_capacity is not None:
+            if capacity == NO_CAPACITY:
+                continue
+            if min_capacity is not None and capacity < min_capacity:
+                continue
+            if max_capacity is not None and capacity > max_capacity:
+                continue
+        rows.append(row)
+    if sort == 'capacity':
+        rows.sort(key=lambda row: (store.capacities[row], row))
+    elif sort == 'status':
+        rows.sort(key=lambda row: (store.statuses[row], row))
+    return rows[::-1] if descending else rows
+
+
+def shown_rows(view):
+    return [view.row_at(index) for index in range(len(view))]
+
+
+SETTINGS = list(itertools.product([None, 'Pending', 'Unknown'], [None, 10], [None, 20],
+                                  [None, 'status', 'capacity'], [False, True]))
+
+
+@pytest.mark.parametrize('status, min_capacity, max_capacity, sort, descending', SETTINGS)
+def test_add_keeps_order_under_sort_and_filter(status, min_capacity, max_capacity, sort, descending):
+    store = ResultStore()
+    view = ResultView(store)
+    view.configure(status=status, min_capacity=min_capacity, max_capacity=max_capacity,
+                   sort=sort, descending=descending)
+    for facility_data in records(300):
+        view.add(store.add(facility_data))
+
+    expected = expected_rows(store, status, min_capacity, max_capacity, sort, descending)
+    assert shown_rows(view) == expected
+    # Streaming in and rebuilding from the indexes agree
+    view.rebuild()
+    assert shown_rows(view) == expected
+
+
+def test_equal_keys_keep_arrival_order():
+    store = ResultStore()
+    view = ResultView(store)
+    view.configure(sort='capacity')
+    for number in range(5):
+        view.add(store.add({'Facility Number': str(number), 'Status': 'Licensed', 'Facility Capacity': '6'}))
+    assert shown_rows(view) == [0, 1, 2, 3, 4]
+
+
+def test_configure_rejects_unknown_settings():
+    view = ResultView(ResultStore())
+    with pytest.raises(TypeError):
+        view.configure(colour='red')
+    with pytest.raises(ValueError):
+        view.configure(sort='name')
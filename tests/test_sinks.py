@@ -0,0 +1,100 @@
+import csv
+import gzip
+import io
+
+import pytest
+
+from extraction import FIELDNAMES, FacilityRecord
+from sinks import CsvSink, GzipCsvSink, open_sink, row_values, split_extension
+
+
+def read_csv(text):
+    return list(csv.reader(io.StringIO(text)))
+
+
+def record(name):
+    facility_data = FacilityRecord(Name=name, Status='Licensed')
+    facility_data['History'] = {'visits': []}
+    return facility_data
+
+
+def test_row_values():
+    assert row_values(record('SUNNY HOME'), tuple(FIELDNAMES)) == record('SUNNY HOME').row()
+    assert row_values({'Date': '01/02/2024'}, ('Facility Number', 'Date')) == ['', '01/02/2024']
+
+
+def test_csv_rows_are_written_on_flush(tmp_path):
+    path = tmp_path / 'out.csv'
+    sink = CsvSink(str(path), FIELDNAMES)
+    sink.write([record('SUNNY HOME')])
+    assert read_csv(path.read_text()) == []
+    sink.flush()
+    sink.write([record('SHADY HOME')])
+    sink.close()
+    rows = read_csv(path.read_text())
+    assert rows[0] == FIELDNAMES
+    assert [row[0] for row in rows[1:]] == ['SUNNY HOME', 'SHADY HOME']
+
+
+def test_csv_append_keeps_one_header(tmp_path):
+    path = tmp_path / 'out.csv'
+    sink = CsvSink(str(path), FIELDNAMES)
+    sink.write([record('SUNNY HOME')])
+    sink.close()
+    sink = CsvSink(str(path), FIELDNAMES, append=True)
+    sink.write([record('SHADY HOME')])
+    sink.close()
+    rows = read_csv(path.read_text())
+    assert rows.count(FIELDNAMES) == 1
+    assert [row[0] for row in rows[1:]] == ['SUNNY HOME', 'SHADY HOME']
+
+
+def test_gzip_members_read_as_one_file(tmp_path):
+    path = tmp_path / 'out.csv.gz'
+    sink = open_sink('csv.gz', str(path), FIELDNAMES)
+    assert isinstance(sink, GzipCsvSink)
+    for name in ('SUNNY HOME', 'SHADY HOME'):
+        sink.write([record(name)])
+        sink.flush()
+    sink.close()
+    rows = read_csv(gzip.decompress(path.read_bytes()).decode('utf-8'))
+    assert [row[0] for row in rows[1:]] == ['SUNNY HOME', 'SHADY HOME']
+
+
+def test_zstd_frames_read_as_one_file(tmp_path):
+    zstandard = pytest.importorskip('zstandard')
+    path = tmp_path / 'out.csv.zst'
+    sink = open_sink('csv.zst', str(path), FIELDNAMES)
+    for name in ('SUNNY HOME', 'SHADY HOME'):
+        sink.write([record(name)])
+        sink.flush()
+    sink.close()
+    with open(path, 'rb') as f:
+        text = zstandard.ZstdDecompressor().stream_reader(f, read_across_frames=True).read().decode('utf-8')
+    assert [row[0] for row in read_csv(text)[1:]] == ['SUNNY HOME', 'SHADY HOME']
+
+
+def test_parquet_row_groups(tmp_path):
+    pytest.importorskip('pyarrow')
+    import pyarrow.parquet
+    path = tmp_path / 'out.parquet'
+    sink = open_sink('parquet', str(path), FIELDNAMES)
+    sink.row_group_size = 2
+    for name in ('A', 'B', 'C'):
+        sink.write([record(name)])
+    sink.close()
+    parquet_file = pyarrow.parquet.ParquetFile(str(path))
+    assert parquet_file.metadata.num_row_groups == 2
+    assert parquet_file.read().column('Name').to_pylist() == ['A', 'B', 'C']
+
+
+def test_parquet_cannot_append(tmp_path):
+    pytest.importorskip('pyarrow')
+    with pytest.raises(RuntimeError):
+        open_sink('parquet', str(tmp_path / 'out.parquet'), FIELDNAMES, append=True)
+
+
+def test_split_extension():
+    assert split_extension('roseville.csv.gz') == ('roseville', '.csv.gz')
+    assert split_extension('roseville.parquet') == ('roseville', '.parquet')
+    assert split_extension('roseville.txt') == ('roseville', '.txt')
@@ -0,0 +1,121 @@
+"""
+Condition-driven readiness waits for the CCLD search site.
+Each page state has a predicate usable with WebDriverWait, and PageWaits records
+how long every wait actually took so the remaining idle time is visible.
+"""
+
+import threading
+import time
+from collections import defaultdict
+
+from selenium.common.exceptions import StaleElementReferenceException, TimeoutException
+from selenium.webdriver.common.by import By
+
+
+FACILITY_LINKS = (By.CSS_SELECTOR, "a[href*='FacDetail']")
+
+# True once the document has loaded and AngularJS has no $http requests pending
+ANGULAR_IDLE_SCRIPT = """
+if (document.readyState !== 'complete') { return false; }
+if (!window.angular) { return true; }
+try {
+    var root = document.querySelector('[ng-app]') || document.body;
+    var injector = window.angular.element(root).injector();
+    if (!injector) { return false; }
+    return injector.get('$http').pendingRequests.length === 0;
+} catch (e) {
+    return true;
+}
+"""
+
+# True once the detail page has rendered the facility name and its Status: block
+DETAIL_RENDERED_SCRIPT = """
+var text = document.body ? document.body.innerText : '';
+return /Facility Detail\\s+\\S[^\\n]*?\\s+Status:\\s*\\S/.test(text);
+"""
+
+
+def angular_idle(driver):
+    """Predicate: the page is loaded and Angular has finished its HTTP requests."""
+    return driver.execute_script(ANGULAR_IDLE_SCRIPT)
+
+
+def detail_rendered(driver):
+    """Predicate: a facility detail page shows the facility name and status."""
+    return driver.execute_script(DETAIL_RENDERED_SCRIPT)
+
+
+def first_facility_href(driver):
+    """Return the href of the first facility link on a results page, or None."""
+    links = driver.find_elements(*FACILITY_LINKS)
+    if not links:
+        return None
+    try:
+        return links[0].get_attribute('href')
+    except StaleElementReferenceException:
+        return None
+
+
+def results_ready(driver):
+    """Predicate: the search has finished and the results table has rows (or none exist)."""
+    return angular_idle(driver) and (
+        bool(driver.find_elements(*FACILITY_LINKS)) or bool(driver.find_elements(By.CSS_SELECTOR, "table.footable"))
+    )
+
+
+def results_changed(previous_href):
+    """Predicate factory: the results table shows different rows than before clicking Next."""
+    def predicate(driver):
+        current = first_facility_href(driver)
+        return current is not None and current != previous_href and angular_idle(driver)
+    return predicate
+
+
+class PageWaits:
+    """Runs readiness waits and records how long each named wait took."""
+
+    def __init__(self, driver, timeout=10, poll_frequency=0.1):
+        # driver may be None until the browser is launched; until() also takes one
+        self.driver = driver
+        self.timeout = timeout
+        self.poll_frequency = poll_frequency
+        self.timings = defaultdict(list)
+        self.timeouts = defaultdict(int)
+        self.lock = threading.Lock()
+
+    def until(self, name, condition, driver=None, timeout=None):
+        """Wait until condition(driver) is truthy and return its value.
+
+        Raises TimeoutException like WebDriverWait; the elapsed time is
+        recorded either way.
+        """
+        # Imported here: it pulls in the whole WebDriver, which only a running browser needs
+        from selenium.webdriver.support.ui import WebDriverWait
+
+        wait = WebDriverWait(driver or self.driver, timeout or self.timeout,
+                             poll_frequency=self.poll_frequency)
+        start = time.perf_counter()
+        try:
+            return wait.until(condition)
+        except TimeoutException:
+            with self.lock:
+                self.timeouts[name] += 1
+            raise
+        finally:
+            with self.lock:
+                self.timings[name].append(time.perf_counter() - start)
+
+    def format_summary(self):
+        """Return a table of wait counts and durations per page state, or '' if nothing was waited for."""
+        lines = ["Readiness waits:"]
+        with self.lock:
+            if not self.timings:
+                return ''
+            for name, durations in self.timings.items():
+                total = sum(durations)
+                lines.append(
+                    f"  {name:<16} n={len(durations):<5} total={total:.1f}s "
+                    f"mean={total / len(durations):.2f}s max={max(durations):.2f}s "
+                    f"timeouts={self.timeouts[name]}"
+                )
+        return '\n'.join(lines)